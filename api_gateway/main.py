@@ -14,6 +14,7 @@ from src.infrastructure.http.http_client import HTTPClient
 from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
 from src.infrastructure.cache.redis_client import RedisClient
 from src.infrastructure.messaging.cache_invalidation_consumer import CacheInvalidationConsumer
+from src.infrastructure.logger.service_logger import configure_logging, shutdown_logging
 from src.presentation.middleware.gateway_middleware import GatewayMiddleware
 from src.presentation.routes.gateway_routes import router
 from src.presentation.routes.gateway_routes import router as ws_router
@@ -27,6 +28,7 @@ cache_consumer = None
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global cache_consumer
+    configure_logging()
     print("API Gateway iniciado")
     cache_consumer = CacheInvalidationConsumer()
     cache_consumer.start()
@@ -34,6 +36,7 @@ async def lifespan(app: FastAPI):
     await http_client.close()
     rabbitmq_client.close()
     redis_client.close()
+    shutdown_logging()
     print("API Gateway detenido")
 
 
@@ -15,4 +15,14 @@ AMQP_URL = os.getenv("AMQP_URL")
 LOG_SERVICE_QUEUE = os.getenv("LOG_SERVICE_QUEUE", "logs")
 REDIS_URL = os.getenv("REDIS_URL")
 REDIS_TOKEN = os.getenv("REDIS_TOKEN")
-PAYMENT_SERVICE_URL = os.getenv("PAYMENT_SERVICE_URL")
\ No newline at end of file
+PAYMENT_SERVICE_URL = os.getenv("PAYMENT_SERVICE_URL")
+
+# Logging por cola (QueueHandler/QueueListener); DEBUG desactivado por defecto y limitado por componente
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_DEBUG_RATE_PER_SECOND = float(os.getenv("LOG_DEBUG_RATE_PER_SECOND", 10))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+# Workers de Monitoring (URLs WS separadas por comas); cada activity_uuid va siempre al
+# mismo worker por hash consistente. Vacio: solo MONITORING_SERVICE_WS_URL
+MONITORING_WORKER_URLS = [url.strip() for url in os.getenv("MONITORING_WORKER_URLS", "").split(",") if url.strip()]
+MONITORING_HASH_REPLICAS = int(os.getenv("MONITORING_HASH_REPLICAS", 512))
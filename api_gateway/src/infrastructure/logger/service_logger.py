@@ -0,0 +1,113 @@
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+from src.infrastructure.config.settings import LOG_LEVEL, LOG_DEBUG_RATE_PER_SECOND, LOG_QUEUE_SIZE
+
+ROOT_LOGGER = "service"
+
+
+class ComponentFormatter(logging.Formatter):
+    # Mismo formato que los print existentes: [COMPONENTE] [NIVEL] mensaje
+    def format(self, record: logging.LogRecord) -> str:
+        record.component = record.name.rsplit(".", 1)[-1]
+        return super().format(record)
+
+
+class DebugRateLimitFilter(logging.Filter):
+    # Token bucket por componente solo para DEBUG: con el nivel activo bajo carga se
+    # emiten como mucho rate_per_second lineas por componente y el resto se cuenta
+    def __init__(self, rate_per_second: float):
+        super().__init__()
+        self.rate_per_second = rate_per_second
+        self._buckets: Dict[str, Tuple[float, float, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate_per_second <= 0:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, suppressed = self._buckets.get(record.name, (self.rate_per_second, now, 0))
+            tokens = min(self.rate_per_second, tokens + (now - updated_at) * self.rate_per_second)
+            if tokens < 1.0:
+                self._buckets[record.name] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[record.name] = (tokens - 1.0, now, 0)
+
+        if suppressed:
+            record.msg = f"{record.msg} (+{suppressed} suprimidos)"
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    # Nunca bloquea al llamador: con la cola llena el registro se descarta y se cuenta
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+_lock = threading.Lock()
+
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    # El formateo y la escritura a stdout ocurren en el thread del QueueListener;
+    # el event loop y los workers solo encolan el registro
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(ComponentFormatter("[%(component)s] [%(levelname)s] %(message)s"))
+
+        _handler = NonBlockingQueueHandler(log_queue)
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level.upper())
+        root.propagate = False
+        root.addHandler(_handler)
+
+        _listener = QueueListener(log_queue, stream_handler)
+        _listener.start()
+        # El thread del listener es daemon: sin esto se pierde lo encolado si el proceso
+        # sale sin pasar por el lifespan (p. ej. sys.exit al fallar el arranque)
+        atexit.register(shutdown_logging)
+
+
+def get_logger(component: str) -> logging.Logger:
+    # Se configura en el primer uso; el filtro va en el logger para que un DEBUG
+    # suprimido no llegue a crear trabajo en la cola
+    configure_logging()
+    logger = logging.getLogger(f"{ROOT_LOGGER}.{component}")
+    if not logger.filters:
+        logger.addFilter(DebugRateLimitFilter(LOG_DEBUG_RATE_PER_SECOND))
+    return logger
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+
+def shutdown_logging() -> None:
+    # Vacia lo pendiente; se llama al final del lifespan
+    global _listener, _handler
+    with _lock:
+        listener, _listener = _listener, None
+        handler, _handler = _handler, None
+    if listener is not None:
+        listener.stop()
+    if handler is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(handler)
@@ -5,6 +5,8 @@ from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect, status,
 from fastapi.responses import JSONResponse
 import websockets
 import httpx
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.routing.hash_ring import HashRing
 from src.infrastructure.config.settings import (
     AUTH_SERVICE_URL,
     SESSION_SERVICE_URL,
@@ -12,11 +14,15 @@ from src.infrastructure.config.settings import (
     MONITORING_SERVICE_URL,
     MONITORING_SERVICE_WS_URL,
     LOG_SERVICE_URL,
-    PAYMENT_SERVICE_URL
+    PAYMENT_SERVICE_URL,
+    MONITORING_WORKER_URLS,
+    MONITORING_HASH_REPLICAS
 )
 
 router = APIRouter()
 
+logger = get_logger("GATEWAY_WS")
+
 http_client = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
 
 
@@ -180,12 +186,11 @@ async def validate_api_key(api_key: str) -> dict:
             return response.json()
         return {"valid": False, "reason": "API key invalida"}
     except Exception as e:
-        print(f"[GATEWAY WS] Error validando API key: {e}")
+        logger.error("Error validando API key: %s", e)
         return {"valid": False, "reason": str(e)}
 
 
-def build_monitoring_ws_url(session_id: str, activity_uuid: str) -> str:
-    base_url = MONITORING_SERVICE_WS_URL
+def normalize_ws_url(base_url: Optional[str]) -> str:
     if not base_url:
         base_url = "ws://localhost:3008"
 
@@ -196,7 +201,22 @@ def build_monitoring_ws_url(session_id: str, activity_uuid: str) -> str:
     elif not base_url.startswith("ws://") and not base_url.startswith("wss://"):
         base_url = f"ws://{base_url}"
 
-    return f"{base_url}/ws/{session_id}/{activity_uuid}"
+    return base_url.rstrip("/")
+
+
+# Cada worker de Monitoring tiene su propio ConnectionManager: todos los mensajes de una
+# actividad deben llegar al mismo worker, asi que se elige por hash de activity_uuid
+monitoring_ring = HashRing(
+    [normalize_ws_url(url) for url in MONITORING_WORKER_URLS] or [normalize_ws_url(MONITORING_SERVICE_WS_URL)],
+    MONITORING_HASH_REPLICAS
+)
+
+
+def build_monitoring_ws_url(session_id: str, activity_uuid: str, attempt: int = 0) -> str:
+    # attempt > 0 recorre el anillo: si el worker dueno no responde la actividad pasa al
+    # siguiente, que recupera el cooldown desde Redis al conectar
+    workers = monitoring_ring.get_nodes(activity_uuid)
+    return f"{workers[attempt % len(workers)]}/ws/{session_id}/{activity_uuid}"
 
 
 async def connect_to_monitoring(monitoring_url: str, max_retries: int = 3, retry_delay: float = 1.0):
@@ -212,7 +232,7 @@ async def connect_to_monitoring(monitoring_url: str, max_retries: int = 3, retry
             return monitoring_ws
         except Exception as e:
             last_exception = e
-            print(f"[GATEWAY WS] Intento {attempt + 1}/{max_retries} fallido conectando a Monitoring: {e}")
+            logger.warning("Intento %s/%s fallido conectando a Monitoring: %s", attempt + 1, max_retries, e)
             if attempt < max_retries - 1:
                 await asyncio.sleep(retry_delay * (attempt + 1))
     
@@ -228,7 +248,7 @@ async def send_buffered_messages(monitoring_ws, buffer: deque) -> int:
             sent_count += 1
         except Exception as e:
             buffer.appendleft(message)
-            print(f"[GATEWAY WS] Error enviando mensaje del buffer: {e}")
+            logger.error("Error enviando mensaje del buffer: %s", e)
             break
     return sent_count
 
@@ -256,9 +276,8 @@ async def websocket_proxy(websocket: WebSocket, session_id: str, activity_uuid:
     company_id = auth_result.get("company_id")
 
     await websocket.accept()
-    print(f"[GATEWAY WS] Conexion aceptada: session={session_id}, activity={activity_uuid}, company={company_id}")
+    logger.info("Conexion aceptada: session=%s, activity=%s, company=%s", session_id, activity_uuid, company_id)
 
-    monitoring_url = build_monitoring_ws_url(session_id, activity_uuid)
     proxy_state = WebSocketProxyState()
     
     client_connected = True
@@ -275,7 +294,8 @@ async def websocket_proxy(websocket: WebSocket, session_id: str, activity_uuid:
         try:
             if proxy_state.reconnect_attempts > 0:
                 await notify_client_status("reconnecting", f"Reconectando al servicio (intento {proxy_state.reconnect_attempts})")
-            
+
+            monitoring_url = build_monitoring_ws_url(session_id, activity_uuid, proxy_state.reconnect_attempts)
             monitoring_ws = await connect_to_monitoring(
                 monitoring_url,
                 max_retries=proxy_state.max_reconnect_attempts,
@@ -284,11 +304,11 @@ async def websocket_proxy(websocket: WebSocket, session_id: str, activity_uuid:
             
             proxy_state.is_connected = True
             proxy_state.reconnect_attempts = 0
-            print(f"[GATEWAY WS] Conectado a Monitoring: {monitoring_url}")
+            logger.info("Conectado a Monitoring: %s", monitoring_url)
 
             if proxy_state.pending_messages:
                 sent = await send_buffered_messages(monitoring_ws, proxy_state.pending_messages)
-                print(f"[GATEWAY WS] Enviados {sent} mensajes del buffer")
+                logger.info("Enviados %s mensajes del buffer", sent)
 
             await notify_client_status("connected", "Conectado al servicio de monitoreo")
 
@@ -315,14 +335,14 @@ async def websocket_proxy(websocket: WebSocket, session_id: str, activity_uuid:
                 exception = task.exception()
                 if exception:
                     if isinstance(exception, WebSocketDisconnect):
-                        print(f"[GATEWAY WS] Cliente desconectado: {activity_uuid}")
+                        logger.info("Cliente desconectado: %s", activity_uuid)
                         client_connected = False
                         should_reconnect = False
                     else:
-                        print(f"[GATEWAY WS] Error en tarea: {exception}")
+                        logger.error("Error en tarea: %s", exception)
 
         except websockets.exceptions.ConnectionClosedError as e:
-            print(f"[GATEWAY WS] Conexion con Monitoring cerrada: {e}")
+            logger.info("Conexion con Monitoring cerrada: %s", e)
             proxy_state.is_connected = False
             proxy_state.reconnect_attempts += 1
             
@@ -333,7 +353,7 @@ async def websocket_proxy(websocket: WebSocket, session_id: str, activity_uuid:
                 await asyncio.sleep(proxy_state.reconnect_delay * proxy_state.reconnect_attempts)
 
         except Exception as e:
-            print(f"[GATEWAY WS] Error conectando a Monitoring: {e}")
+            logger.error("Error conectando a Monitoring: %s", e)
             proxy_state.reconnect_attempts += 1
             
             if proxy_state.reconnect_attempts >= proxy_state.max_reconnect_attempts:
@@ -353,31 +373,38 @@ async def websocket_proxy(websocket: WebSocket, session_id: str, activity_uuid:
         await websocket.close()
     except Exception:
         pass
-    print(f"[GATEWAY WS] Conexion cerrada: {activity_uuid}")
+    logger.info("Conexion cerrada: %s", activity_uuid)
 
 
 async def forward_to_monitoring(client_ws: WebSocket, monitoring_ws, proxy_state: WebSocketProxyState):
     try:
         while True:
-            data = await client_ws.receive_text()
-            
+            message = await client_ws.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            # Los frames binarios negociados en el handshake se reenvian tal cual
+            data = message["bytes"] if message.get("bytes") is not None else message.get("text")
+            if data is None:
+                continue
+
             if proxy_state.is_connected:
                 try:
                     await monitoring_ws.send(data)
                 except Exception as e:
-                    print(f"[GATEWAY WS] Error enviando a Monitoring, guardando en buffer: {e}")
+                    logger.warning("Error enviando a Monitoring, guardando en buffer: %s", e)
                     proxy_state.pending_messages.append(data)
                     proxy_state.is_connected = False
                     raise
             else:
                 proxy_state.pending_messages.append(data)
-                print(f"[GATEWAY WS] Mensaje agregado al buffer (tamano: {len(proxy_state.pending_messages)})")
+                logger.debug("Mensaje agregado al buffer (tamano: %s)", len(proxy_state.pending_messages))
                 
     except WebSocketDisconnect:
-        print(f"[GATEWAY WS] Cliente desconectado")
+        logger.info("Cliente desconectado")
         raise
     except Exception as e:
-        print(f"[GATEWAY WS] Error recibiendo del cliente: {e}")
+        logger.error("Error recibiendo del cliente: %s", e)
         raise
 
 
@@ -385,12 +412,15 @@ async def forward_to_client(client_ws: WebSocket, monitoring_ws, activity_uuid:
     try:
         async for message in monitoring_ws:
             # DEBUG: Log de mensajes recibidos del monitoring
-            print(f"[GATEWAY WS] Mensaje de Monitoring para {activity_uuid}: {message[:200] if len(str(message)) > 200 else message}")
-            await client_ws.send_text(message)
-            print(f"[GATEWAY WS] Mensaje reenviado a cliente: {activity_uuid}")
+            logger.debug("Mensaje de Monitoring para %s: %s bytes", activity_uuid, len(message))
+            if isinstance(message, bytes):
+                await client_ws.send_bytes(message)
+            else:
+                await client_ws.send_text(message)
+            logger.debug("Mensaje reenviado a cliente: %s", activity_uuid)
     except websockets.exceptions.ConnectionClosed as e:
-        print(f"[GATEWAY WS] Conexion de Monitoring cerrada: {e}")
+        logger.info("Conexion de Monitoring cerrada: %s", e)
         raise
     except Exception as e:
-        print(f"[GATEWAY WS] Error recibiendo de Monitoring: {e}")
+        logger.error("Error recibiendo de Monitoring: %s", e)
         raise
\ No newline at end of file
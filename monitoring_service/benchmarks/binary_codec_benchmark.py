@@ -0,0 +1,44 @@
+import argparse
+import json
+import timeit
+import numpy as np
+from benchmarks.frames import make_frame, raw_values
+from src.infrastructure.ml.feature_extractor import FeatureExtractor
+from src.infrastructure.websocket.binary_frame_codec import decode_frame, decode_frames, encode_frames
+
+
+def best_of(statement, number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(statement, number=1, repeat=repeat)) / number * 1e6
+
+
+def main(frame_count: int) -> None:
+    rng = np.random.default_rng(5)
+    frames = [make_frame(rng, attentive=bool(rng.random() > 0.5)) for _ in range(frame_count)]
+    extractor = FeatureExtractor()
+
+    json_messages = [json.dumps(frame) for frame in frames]
+    binary_messages = [encode_frames([1.7e12 + index], raw_values(frame)) for index, frame in enumerate(frames)]
+
+    from_json = extractor.extract_batch(frames)
+    from_binary = np.stack([extractor.normalize_raw_row(decode_frame(message)[1]) for message in binary_messages])
+    from_block = extractor.normalize_raw(decode_frames(b"".join(binary_messages))[1])
+    print(f"[INFO] Paridad JSON vs binario: max_diff={float(np.max(np.abs(from_json - from_binary))):.2e}, lote={float(np.max(np.abs(from_json - from_block))):.2e}")
+
+    json_bytes = np.mean([len(message.encode("utf-8")) for message in json_messages])
+    binary_bytes = np.mean([len(message) for message in binary_messages])
+    json_us = best_of(lambda: [extractor.extract_dict(json.loads(message)) for message in json_messages], frame_count)
+    binary_us = best_of(lambda: [extractor.normalize_raw_row(decode_frame(message)[1]) for message in binary_messages], frame_count)
+    block = b"".join(binary_messages)
+    block_us = best_of(lambda: extractor.normalize_raw(decode_frames(block)[1]), frame_count)
+
+    print(f"{'codificacion':<14}{'bytes/frame':>14}{'us/frame':>12}")
+    print(f"{'json':<14}{json_bytes:>14.0f}{json_us:>12.2f}")
+    print(f"{'binario':<14}{binary_bytes:>14.0f}{binary_us:>12.2f}")
+    print(f"{'binario lote':<14}{binary_bytes:>14.0f}{block_us:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tamano y coste de decodificacion: JSON vs frame binario")
+    parser.add_argument("--frames", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.frames)
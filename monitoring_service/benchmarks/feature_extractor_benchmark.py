@@ -0,0 +1,66 @@
+import argparse
+import timeit
+import numpy as np
+from benchmarks.frames import make_frame
+from src.application.dtos.biometric_frame_dto import BiometricFrameDTO
+from src.domain.value_objects.cognitive_state import CognitiveState
+from src.infrastructure.ml.feature_extractor import FeatureExtractor
+
+
+def legacy_extract(frame: BiometricFrameDTO) -> np.ndarray:
+    # Implementacion anterior: ocho recorridos del desglose y lower() por emocion
+    features = np.zeros(16, dtype=np.float32)
+    for index, name in enumerate(["happiness", "neutral", "surprise", "anger", "contempt", "disgust", "fear", "sadness"]):
+        features[index] = frame.get_emotion_value(name)
+
+    features[8] = 1.0 if frame.atencion.get("mirando_pantalla", False) else 0.0
+    orientacion = frame.atencion.get("orientacion_cabeza", {})
+    features[9] = np.clip(orientacion.get("pitch", 0.0) / FeatureExtractor.PITCH_MAX, -1.0, 1.0)
+    features[10] = np.clip(orientacion.get("yaw", 0.0) / FeatureExtractor.YAW_MAX, -1.0, 1.0)
+    features[11] = 1.0 if frame.somnolencia.get("esta_durmiendo", False) else 0.0
+    features[12] = frame.somnolencia.get("apertura_ojos_ear", 0.3)
+    features[13] = 1.0 if frame.rostro_detectado else 0.0
+    features[14] = CognitiveState.from_string(frame.emocion_principal.get("estado_cognitivo", "neutral")).to_float()
+    features[15] = frame.emocion_principal.get("confianza", 0.5)
+    return features
+
+
+def best_of(statement, number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(statement, number=1, repeat=repeat)) / number * 1e6
+
+
+def main(frame_count: int) -> None:
+    rng = np.random.default_rng(11)
+    frames = [make_frame(rng, attentive=bool(rng.random() > 0.5)) for _ in range(frame_count)]
+    extractor = FeatureExtractor()
+
+    legacy = np.stack([legacy_extract(BiometricFrameDTO.from_dict(data)) for data in frames])
+    batched = extractor.extract_batch(frames)
+    max_diff = float(np.max(np.abs(legacy - batched)))
+    print(f"[INFO] Paridad con la implementacion anterior: max_diff={max_diff:.2e}")
+
+    results = {
+        "anterior (DTO + extract)": best_of(
+            lambda: [legacy_extract(BiometricFrameDTO.from_dict(data)) for data in frames], frame_count
+        ),
+        "extract (DTO)": best_of(
+            lambda: [extractor.extract(BiometricFrameDTO.from_dict(data)) for data in frames], frame_count
+        ),
+        "extract_dict": best_of(
+            lambda: [extractor.extract_dict(data) for data in frames], frame_count
+        ),
+        "extract_batch": best_of(
+            lambda: extractor.extract_batch(frames), frame_count
+        )
+    }
+
+    print(f"{'variante':<28}{'us/frame':>10}")
+    for name, us_per_frame in results.items():
+        print(f"{name:<28}{us_per_frame:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark de extraccion de features")
+    parser.add_argument("--frames", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.frames)
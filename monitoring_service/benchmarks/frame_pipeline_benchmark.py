@@ -0,0 +1,127 @@
+import os
+
+# El camino medido es el de "sin intervencion": sin muestras negativas ni
+# ventana de batching para aislar el coste de construir el grafo de objetos
+os.environ.setdefault("INFERENCE_BACKEND", "synthetic")
+os.environ.setdefault("INFERENCE_BATCH_WINDOW_MS", "0")
+os.environ.setdefault("NEGATIVE_SAMPLE_RATE", "0")
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+import uuid
+import numpy as np
+from benchmarks.frames import make_frame
+from src.application.dtos.biometric_frame_dto import BiometricFrameDTO
+from src.application.use_cases.process_biometric_frame import ProcessBiometricFrameUseCase
+from src.infrastructure.ml.inference_scheduler import InferenceScheduler
+from src.infrastructure.websocket.connection_manager import ConnectionState
+from src.infrastructure.websocket.frame_pipeline import FramePipeline
+
+
+def build_state() -> ConnectionState:
+    state = ConnectionState(None, str(uuid.uuid4()), str(uuid.uuid4()))
+    state.set_metadata(user_id=1, external_activity_id=1)
+    return state
+
+
+def per_frame_processor(state: ConnectionState):
+    # Comportamiento anterior: el grafo completo se construye en cada frame
+    async def process(data) -> None:
+        correlation_id = str(uuid.uuid4())
+        use_case = ProcessBiometricFrameUseCase(
+            buffer=state.buffer,
+            context=state.context,
+            activity_uuid=state.activity_uuid,
+            session_id=state.session_id,
+            user_id=state.metadata.user_id,
+            external_activity_id=state.metadata.external_activity_id,
+            stream_state=state.stream_state
+        )
+        await use_case.execute(BiometricFrameDTO.from_dict(data), correlation_id)
+    return process
+
+
+def pipeline_processor(state: ConnectionState):
+    pipeline = FramePipeline(state)
+
+    async def process(data) -> None:
+        correlation_id = str(uuid.uuid4())
+        await pipeline.process_frame_use_case.execute(BiometricFrameDTO.from_dict(data), correlation_id)
+    return process
+
+
+def measure_construction(state: ConnectionState, iterations: int = 2000) -> float:
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        ProcessBiometricFrameUseCase(
+            buffer=state.buffer,
+            context=state.context,
+            activity_uuid=state.activity_uuid,
+            session_id=state.session_id,
+            user_id=state.metadata.user_id,
+            external_activity_id=state.metadata.external_activity_id,
+            stream_state=state.stream_state
+        )
+    return (time.perf_counter() - started_at) / iterations * 1e6
+
+
+async def measure(name: str, factory, frames, repeats: int) -> dict:
+    process = factory(build_state())
+    for data in frames[:60]:
+        await process(data)
+
+    # El salto al executor de inferencia mete ruido; se toma la mejor de varias pasadas
+    elapsed = float("inf")
+    for _ in range(repeats):
+        process = factory(build_state())
+        started_at = time.perf_counter()
+        for data in frames:
+            await process(data)
+        elapsed = min(elapsed, time.perf_counter() - started_at)
+
+    # Memoria transitoria por frame: pico durante el frame sobre lo vivo al empezar
+    process = factory(build_state())
+    tracemalloc.start()
+    transient = []
+    for data in frames:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await process(data)
+        _, peak = tracemalloc.get_traced_memory()
+        transient.append(peak - current)
+    tracemalloc.stop()
+
+    return {
+        "name": name,
+        "us_per_frame": elapsed / len(frames) * 1e6,
+        "transient_kb": float(np.mean(transient)) / 1024.0,
+        "transient_p99_kb": float(np.percentile(transient, 99)) / 1024.0
+    }
+
+
+async def main(frame_count: int, repeats: int) -> None:
+    rng = np.random.default_rng(7)
+    frames = [make_frame(rng) for _ in range(frame_count)]
+
+    # Sin publicador iniciado los mensajes solo se encolan en el outbox; no hace falta broker
+    results = [
+        await measure("por_frame", per_frame_processor, frames, repeats),
+        await measure("pipeline", pipeline_processor, frames, repeats)
+    ]
+
+    print(f"{'modo':<12}{'us/frame':>12}{'KB/frame':>12}{'KB/frame p99':>14}")
+    for result in results:
+        print(f"{result['name']:<12}{result['us_per_frame']:>12.1f}{result['transient_kb']:>12.2f}{result['transient_p99_kb']:>14.2f}")
+    print(f"Construccion del grafo por frame (evitada con pipeline): {measure_construction(build_state()):.1f} us")
+
+    InferenceScheduler().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coste por frame: grafo por frame vs pipeline por conexion")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.frames, args.repeats))
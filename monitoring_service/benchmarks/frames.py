@@ -0,0 +1,108 @@
+from typing import Dict, Any
+import numpy as np
+
+EMOTIONS = ["Happiness", "Neutral", "Surprise", "Anger", "Contempt", "Disgust", "Fear", "Sadness"]
+
+
+def make_frame(rng: np.random.Generator, attentive: bool = True) -> Dict[str, Any]:
+    # Frame con la misma forma que envia el cliente; con attentive=True las
+    # heuristicas sinteticas no disparan intervenciones
+    scores = rng.random(len(EMOTIONS))
+    if attentive:
+        scores[3:] *= 0.1
+    scores = scores / scores.sum() * 100.0
+
+    return {
+        "type": "frame",
+        "metadata": {"timestamp": "2024-01-01T00:00:00Z"},
+        "analisis_sentimiento": {
+            "emocion_principal": {
+                "nombre": EMOTIONS[int(np.argmax(scores))],
+                "confianza": float(scores.max() / 100.0),
+                "estado_cognitivo": "entendiendo"
+            },
+            "desglose_emociones": [
+                {"emocion": name, "confianza": float(score)}
+                for name, score in zip(EMOTIONS, scores)
+            ]
+        },
+        "datos_biometricos": {
+            "atencion": {
+                "mirando_pantalla": bool(attentive or rng.random() > 0.5),
+                "orientacion_cabeza": {
+                    "pitch": float(rng.uniform(-20, 20)),
+                    "yaw": float(rng.uniform(-20, 20))
+                }
+            },
+            "somnolencia": {
+                "esta_durmiendo": False,
+                "apertura_ojos_ear": float(rng.uniform(0.7, 0.9)) if attentive else float(rng.uniform(0.1, 0.4))
+            },
+            "rostro_detectado": True
+        }
+    }
+
+
+COGNITIVE_STATE_CODES = {"confundido": 0.0, "neutral": 1.0, "entendiendo": 2.0}
+
+
+def raw_values(frame: Dict[str, Any]) -> np.ndarray:
+    # Los 16 valores crudos del protocolo binario a partir de un frame JSON
+    analisis = frame["analisis_sentimiento"]
+    biometricos = frame["datos_biometricos"]
+    emotions = {e["emocion"].lower(): e["confianza"] for e in analisis["desglose_emociones"]}
+    orientacion = biometricos["atencion"]["orientacion_cabeza"]
+
+    values = [emotions.get(name.lower(), 0.0) for name in EMOTIONS]
+    values += [
+        1.0 if biometricos["atencion"]["mirando_pantalla"] else 0.0,
+        orientacion["pitch"],
+        orientacion["yaw"],
+        1.0 if biometricos["somnolencia"]["esta_durmiendo"] else 0.0,
+        biometricos["somnolencia"]["apertura_ojos_ear"],
+        1.0 if biometricos["rostro_detectado"] else 0.0,
+        COGNITIVE_STATE_CODES.get(analisis["emocion_principal"]["estado_cognitivo"], 1.0),
+        analisis["emocion_principal"]["confianza"]
+    ]
+    return np.array(values, dtype=np.float32)
+
+
+COGNITIVE_STATES = ["confundido", "neutral", "entendiendo"]
+
+
+def frame_from_features(features: np.ndarray) -> Dict[str, Any]:
+    # Inverso de FeatureExtractor: una fila normalizada (16,) del DatasetGenerator
+    # al frame JSON que la produce, para cargar el servicio con sus distribuciones
+    scores = [float(value) * 100.0 for value in features[:8]]
+    principal = int(np.argmax(scores))
+    estado = COGNITIVE_STATES[min(2, max(0, int(round(float(features[14]) * 2.0))))]
+
+    return {
+        "type": "frame",
+        "metadata": {"timestamp": "2024-01-01T00:00:00Z"},
+        "analisis_sentimiento": {
+            "emocion_principal": {
+                "nombre": EMOTIONS[principal],
+                "confianza": float(features[15]),
+                "estado_cognitivo": estado
+            },
+            "desglose_emociones": [
+                {"emocion": name, "confianza": score}
+                for name, score in zip(EMOTIONS, scores)
+            ]
+        },
+        "datos_biometricos": {
+            "atencion": {
+                "mirando_pantalla": bool(features[8] >= 0.5),
+                "orientacion_cabeza": {
+                    "pitch": float(features[9]) * 45.0,
+                    "yaw": float(features[10]) * 45.0
+                }
+            },
+            "somnolencia": {
+                "esta_durmiendo": bool(features[11] >= 0.5),
+                "apertura_ojos_ear": float(features[12])
+            },
+            "rostro_detectado": bool(features[13] >= 0.5)
+        }
+    }
@@ -0,0 +1,425 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from benchmarks.frames import frame_from_features
+
+# Carga de extremo a extremo sobre /ws/{session_id}/{activity_uuid}: el servicio corre
+# en un proceso aparte (uvicorn) con SQLite, Redis en memoria y un broker en memoria, y
+# este proceso simula N clientes que hacen handshake y envian frames a un fps fijo.
+# Uso: PYTHONPATH=. python -m benchmarks.load_generator --clients 10,50,100 --fps 10
+
+
+class InMemoryChannel:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.default_exchange = self
+        self._broker = broker
+
+    async def publish(self, message: Any, routing_key: str) -> None:
+        self._broker.messages[routing_key] += 1
+        self._broker.bytes_published += len(message.body)
+
+
+class InMemoryBroker:
+    # Sustituye al pool de canales de aio-pika: cuenta lo publicado por cola, sin red
+    def __init__(self):
+        self.messages: Dict[str, int] = defaultdict(int)
+        self.bytes_published = 0
+        self._channel = InMemoryChannel(self)
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self._channel
+
+    async def close(self) -> None:
+        pass
+
+
+def process_stats() -> Dict[str, float]:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    try:
+        with open("/proc/self/statm") as f:
+            rss_bytes = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        rss_bytes = usage.ru_maxrss * 1024
+    return {
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "rss_mb": rss_bytes / (1024 * 1024),
+        "max_rss_mb": usage.ru_maxrss / 1024
+    }
+
+
+def serve(port: int) -> None:
+    # Mismo arranque que main.lifespan sin validar RabbitMQ ni consumir recomendaciones
+    import uvicorn
+    from fastapi import FastAPI
+    from src.infrastructure.persistence.database import create_tables
+    from src.infrastructure.logger.service_logger import shutdown_logging
+    from src.infrastructure.messaging.async_publisher import AsyncRabbitMQPublisher
+    from src.infrastructure.messaging.recommendation_router import RecommendationRouter
+    from src.infrastructure.cache.redis_client import RedisClient
+    from src.infrastructure.cache.cooldown_cache import CooldownStateCache
+    from src.infrastructure.websocket.connection_manager import ConnectionManager
+    from src.infrastructure.ml.model_loader import ModelLoader
+    from src.infrastructure.ml.inference_scheduler import InferenceScheduler
+    from src.infrastructure.workers.persistence_dispatcher import PersistenceDispatcher
+    from src.infrastructure.workers.training_sample_sink import TrainingSampleSink
+    from src.infrastructure.workers.evaluation_scheduler import InterventionEvaluationScheduler
+    from src.presentation.routes.health_routes import router as health_router
+    from src.presentation.routes.ws_routes import router as ws_router
+
+    broker = InMemoryBroker()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        create_tables()
+        model_loader = ModelLoader()
+        if not model_loader.load_registry() and not model_loader.load():
+            raise RuntimeError("No se pudo cargar el modelo del backend configurado")
+        redis_client = RedisClient()
+        await redis_client.connect()
+        ConnectionManager().start_heartbeat()
+        RecommendationRouter().start()
+        inference_scheduler = InferenceScheduler()
+        persistence_dispatcher = PersistenceDispatcher()
+        persistence_dispatcher.start()
+        training_sample_sink = TrainingSampleSink()
+        training_sample_sink.start()
+        InterventionEvaluationScheduler().start()
+        async_publisher = AsyncRabbitMQPublisher()
+        await async_publisher.start(channel_pool=broker)
+        print(f"[LOAD_GENERATOR] [INFO] Servicio de prueba listo en puerto {port}", flush=True)
+        yield
+
+        inference_scheduler.close()
+        InterventionEvaluationScheduler().close()
+        # Primero el dispatcher: sus trabajos en curso anaden muestras al sink. Ambos
+        # hacen join de threads, asi que se cierran fuera del event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, persistence_dispatcher.close)
+        await loop.run_in_executor(None, training_sample_sink.close)
+        await async_publisher.close()
+        await ConnectionManager().stop_heartbeat()
+        await CooldownStateCache().close()
+        await redis_client.close()
+        shutdown_logging()
+
+    app = FastAPI(title="Monitoring Service (load test)", lifespan=lifespan)
+    app.include_router(health_router)
+    app.include_router(ws_router)
+
+    @app.get("/bench/stats")
+    def bench_stats():
+        stats = process_stats()
+        stats["connections"] = ConnectionManager().connection_count
+        stats["broker_messages"] = dict(broker.messages)
+        stats["publisher"] = AsyncRabbitMQPublisher().get_metrics()
+        stats["training_samples"] = TrainingSampleSink().get_metrics()
+        stats["inference"] = InferenceScheduler().get_metrics()
+        stats["cooldown_cache"] = CooldownStateCache().get_metrics()
+        return stats
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", ws_max_size=16 * 1024 * 1024)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def fetch_stats(base_url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(f"{base_url}/bench/stats", timeout=10) as response:
+        return json.loads(response.read())
+
+
+def start_server(args: argparse.Namespace, workdir: str, port: int, name: str = "bench") -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, f'{name}.db')}",
+        "REDIS_DSN": "",
+        "REDIS_URL": "",
+        "REDIS_LOCAL_FALLBACK": "true",
+        "AMQP_URL": "amqp://in-memory/",
+        "MODEL_REGISTRY_DIR": "",
+        "INFERENCE_BACKEND": args.backend,
+        "INSTANCE_ID": name
+    })
+    log = open(os.path.join(workdir, f"{name}.log"), "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load_generator", "--serve", "--port", str(port)],
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT
+    )
+    log.close()
+    return process
+
+
+def wait_for_server(process: subprocess.Popen, base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"El servicio termino al arrancar (codigo {process.returncode})")
+        try:
+            fetch_stats(base_url)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"El servicio no respondio en {timeout}s")
+
+
+def build_frames(windows: int, seed: int, workdir: str) -> List[str]:
+    # Secuencias de las cuatro clases del DatasetGenerator, ya serializadas: el cliente
+    # solo concatena texto y no compite por CPU con el servicio
+    from training.dataset_generator import DatasetGenerator
+
+    generator = DatasetGenerator(output_dir=os.path.join(workdir, "dataset"))
+    sequences, _, _ = generator.generate(samples_per_class=max(1, windows // 4), seed=seed)
+    return [json.dumps(frame_from_features(row)) for row in sequences.reshape(-1, sequences.shape[-1])]
+
+
+class ClientStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.messages_sent = 0
+        self.frames_sent = 0
+        self.frames_accepted = 0
+        self.frames_dropped = 0
+        self.interventions = 0
+        self.errors = 0
+        self.unanswered = 0
+
+
+class SimulatedClient:
+    def __init__(self, index: int, ws_url: str, frames: List[str], args: argparse.Namespace, stats: ClientStats, activity_uuid: Optional[str] = None):
+        self.index = index
+        self.url = f"{ws_url}/ws/{uuid.uuid4()}/{activity_uuid or uuid.uuid4()}"
+        self.frames = frames
+        self.fps = args.fps
+        self.frames_per_message = args.frames_per_message
+        self.drain_seconds = args.drain_seconds
+        self.stats = stats
+        # Cada cliente empieza en una ventana distinta del dataset
+        self.offset = (index * 30) % len(frames)
+        self._pending: Dict[str, float] = {}
+
+    async def run(self, ready: asyncio.Event, go: asyncio.Event, end_at: List[float]) -> None:
+        import websockets
+
+        try:
+            ws = await websockets.connect(self.url, max_size=None, ping_interval=None)
+            await ws.send(json.dumps({"type": "handshake", "user_id": self.index + 1, "external_activity_id": 1}))
+            ack = json.loads(await ws.recv())
+            if ack.get("type") != "handshake_ack":
+                raise RuntimeError(f"Handshake rechazado: {ack}")
+        finally:
+            ready.set()
+
+        await go.wait()
+        receiver = asyncio.create_task(self._receive(ws))
+        try:
+            await self._send(ws, end_at[0])
+            deadline = time.monotonic() + self.drain_seconds
+            while self._pending and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+        finally:
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+            await ws.close()
+        self.stats.unanswered += len(self._pending)
+
+    async def _send(self, ws, end_at: float) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.frames_per_message / self.fps
+        next_send = loop.time()
+        position = self.offset
+        sequence = 0
+
+        while loop.time() < end_at:
+            chunk = [self.frames[(position + i) % len(self.frames)] for i in range(self.frames_per_message)]
+            position += self.frames_per_message
+            correlation_id = f"{self.index}-{sequence}"
+            sequence += 1
+
+            self._pending[correlation_id] = time.perf_counter()
+            await ws.send('{"type":"frames","correlation_id":"%s","frames":[%s]}' % (correlation_id, ",".join(chunk)))
+            self.stats.messages_sent += 1
+            self.stats.frames_sent += self.frames_per_message
+
+            # Cadencia fija: si el envio se retrasa no se acumulan rafagas para recuperar
+            next_send = max(next_send + interval, loop.time())
+            await asyncio.sleep(next_send - loop.time())
+
+    async def _receive(self, ws) -> None:
+        async for raw in ws:
+            received_at = time.perf_counter()
+            data = json.loads(raw)
+            sent_at = self._pending.pop(data.get("correlation_id"), None)
+            if data.get("type") == "frames_ack":
+                accepted = data.get("frames_accepted", 0)
+                self.stats.frames_accepted += accepted
+                self.stats.frames_dropped += data.get("frames_dropped", 0)
+                self.stats.interventions += len(data.get("interventions", []))
+                if sent_at is not None and accepted:
+                    # Cada frame aceptado cuenta con la latencia de su mensaje
+                    self.stats.latencies.extend([received_at - sent_at] * accepted)
+            elif "error" in data:
+                self.stats.errors += 1
+
+
+async def run_level(clients: int, ws_url: str, base_url: str, frames: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    stats = ClientStats()
+    end_at = [0.0]
+    go = asyncio.Event()
+    ready_events = [asyncio.Event() for _ in range(clients)]
+    tasks = [
+        asyncio.create_task(SimulatedClient(index, ws_url, frames, args, stats).run(ready_events[index], go, end_at))
+        for index in range(clients)
+    ]
+
+    # Todos los clientes conectados (o fallidos) antes de empezar a medir
+    await asyncio.gather(*[event.wait() for event in ready_events])
+
+    await asyncio.sleep(args.warmup_seconds)
+    before = await asyncio.to_thread(fetch_stats, base_url)
+    client_cpu_before = process_stats()["cpu_seconds"]
+    started_at = time.monotonic()
+    end_at[0] = asyncio.get_running_loop().time() + args.duration
+    go.set()
+
+    peak_rss = before["rss_mb"]
+    while time.monotonic() - started_at < args.duration:
+        await asyncio.sleep(1.0)
+        peak_rss = max(peak_rss, (await asyncio.to_thread(fetch_stats, base_url))["rss_mb"])
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.monotonic() - started_at
+    after = await asyncio.to_thread(fetch_stats, base_url)
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        print(f"[LOAD_GENERATOR] [WARNING] {len(failures)} clientes fallaron; primero: {failures[0]!r}", flush=True)
+
+    measured = args.duration
+    return {
+        "clients": clients,
+        "fps": args.fps,
+        "frames_per_message": args.frames_per_message,
+        "duration_seconds": round(elapsed, 2),
+        "frames_sent": stats.frames_sent,
+        "frames_accepted": stats.frames_accepted,
+        "frames_dropped": stats.frames_dropped,
+        "unanswered_messages": stats.unanswered,
+        "errors": stats.errors,
+        "client_failures": len(failures),
+        "interventions": stats.interventions,
+        "offered_fps": clients * args.fps,
+        "throughput_fps": round(stats.frames_accepted / measured, 1),
+        **latency_summary(stats.latencies),
+        "server_cpu_percent": round((after["cpu_seconds"] - before["cpu_seconds"]) / elapsed * 100.0, 1),
+        "client_cpu_percent": round((process_stats()["cpu_seconds"] - client_cpu_before) / elapsed * 100.0, 1),
+        "server_rss_mb": round(after["rss_mb"], 1),
+        "server_peak_rss_mb": round(max(peak_rss, after["rss_mb"]), 1),
+        "broker_messages": sum(after["broker_messages"].values()) - sum(before["broker_messages"].values())
+    }
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    latencies_ms = np.array(latencies) * 1000.0
+    if not len(latencies_ms):
+        return {"latency_p50_ms": None, "latency_p99_ms": None, "latency_max_ms": None}
+    return {
+        "latency_p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "latency_p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+        "latency_max_ms": round(float(latencies_ms.max()), 2)
+    }
+
+
+def print_table(results: List[Dict[str, Any]], columns: List[Tuple[str, str, int]]) -> None:
+    print("".join(f"{title:>{width}}" for _, title, width in columns))
+    for result in results:
+        print("".join(f"{str(result[key]):>{width}}" for key, _, width in columns))
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    columns = [
+        ("clients", "clientes", 9),
+        ("throughput_fps", "frames/s", 10),
+        ("frames_dropped", "descartes", 10),
+        ("latency_p50_ms", "p50 ms", 9),
+        ("latency_p99_ms", "p99 ms", 9),
+        ("latency_max_ms", "max ms", 9),
+        ("server_cpu_percent", "CPU %", 8),
+        ("server_peak_rss_mb", "RSS MB", 9),
+        ("interventions", "interv.", 9)
+    ]
+    print_table(results, columns)
+
+
+async def main(args: argparse.Namespace) -> None:
+    workdir = tempfile.mkdtemp(prefix="monitoring-load-")
+    args.port = args.port or free_port()
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(args, workdir, args.port)
+    try:
+        frames = build_frames(args.windows, args.seed, workdir)
+        await asyncio.to_thread(wait_for_server, server, base_url)
+
+        results = []
+        for clients in args.clients:
+            result = await run_level(clients, f"ws://127.0.0.1:{args.port}", base_url, frames, args)
+            results.append(result)
+            print(f"[LOAD_GENERATOR] [INFO] {clients} clientes: {result['throughput_fps']} frames/s, p99 {result['latency_p99_ms']} ms", flush=True)
+
+        print_results(results)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({"backend": args.backend, "results": results}, f, indent=2)
+            print(f"Resultados guardados en {args.output}")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        if args.keep_workdir:
+            print(f"Log y base de datos del servicio en {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generador de carga WebSocket para el pipeline de frames")
+    parser.add_argument("--clients", type=lambda value: [int(n) for n in value.split(",")], default=[10],
+                        help="Clientes simultaneos; lista separada por comas para varios niveles")
+    parser.add_argument("--fps", type=float, default=10.0, help="Frames por segundo por cliente")
+    parser.add_argument("--frames-per-message", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos medidos por nivel")
+    parser.add_argument("--warmup-seconds", type=float, default=1.0)
+    parser.add_argument("--drain-seconds", type=float, default=5.0, help="Espera maxima de acks pendientes al terminar")
+    parser.add_argument("--windows", type=int, default=400, help="Ventanas de 30 frames generadas con DatasetGenerator")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--backend", default=os.getenv("INFERENCE_BACKEND", "synthetic"))
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Fichero JSON con los resultados para comparar entre versiones")
+    parser.add_argument("--keep-workdir", action="store_true")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+    else:
+        asyncio.run(main(args))
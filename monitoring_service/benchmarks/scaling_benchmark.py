@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from benchmarks.load_generator import (
+    ClientStats,
+    SimulatedClient,
+    build_frames,
+    fetch_stats,
+    free_port,
+    latency_summary,
+    print_table,
+    start_server,
+    wait_for_server
+)
+from src.infrastructure.routing.hash_ring import HashRing
+
+# Escalado con workers shared-nothing: para cada N arranca N servicios (uno por puerto,
+# como launcher.py), reparte las actividades con el mismo hash consistente que el gateway
+# y genera la carga desde varios procesos cliente para que el cliente no sea el cuello de
+# botella. La carga crece con N (clients_per_worker * N), asi que con escalado lineal el
+# throughput se multiplica por N y la latencia no cambia.
+# Uso: PYTHONPATH=. python -m benchmarks.scaling_benchmark --workers 1,2,4 --clients-per-worker 100
+
+
+def pin(pid: int, cpus: List[int], index: int) -> Optional[int]:
+    if not cpus:
+        return None
+    cpu = cpus[index % len(cpus)]
+    os.sched_setaffinity(pid, {cpu})
+    return cpu
+
+
+async def drive_clients(
+    clients: List[Tuple[int, str, str]],
+    frames: List[str],
+    args: argparse.Namespace,
+    barrier: Any,
+    start_at: Any
+) -> Dict[str, Any]:
+    stats = ClientStats()
+    end_at = [0.0]
+    go = asyncio.Event()
+    ready_events = [asyncio.Event() for _ in clients]
+    tasks = [
+        asyncio.create_task(
+            SimulatedClient(index, ws_url, frames, args, stats, activity_uuid).run(ready_events[position], go, end_at)
+        )
+        for position, (index, ws_url, activity_uuid) in enumerate(clients)
+    ]
+    await asyncio.gather(*[event.wait() for event in ready_events])
+
+    # Primera barrera: todos los procesos conectados; en la segunda el padre ya fijo start_at
+    await asyncio.to_thread(barrier.wait)
+    await asyncio.to_thread(barrier.wait)
+    await asyncio.sleep(max(0.0, start_at.value - time.time()))
+    end_at[0] = asyncio.get_running_loop().time() + args.duration
+    go.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    failures = [result for result in results if isinstance(result, Exception)]
+    summary = dict(vars(stats))
+    summary["client_failures"] = len(failures)
+    summary["first_failure"] = repr(failures[0]) if failures else None
+    return summary
+
+
+def client_process(clients, frames, args, barrier, start_at, results) -> None:
+    try:
+        results.put(asyncio.run(drive_clients(clients, frames, args, barrier, start_at)))
+    except Exception as e:
+        # Si un proceso falla antes de las barreras, se rompen para no bloquear al resto
+        barrier.abort()
+        results.put({"error": repr(e)})
+
+
+def run_level(workers: int, frames: List[str], args: argparse.Namespace, workdir: str, cpus: List[int]) -> Dict[str, Any]:
+    ports = [free_port() for _ in range(workers)]
+    servers = [start_server(args, workdir, port, f"worker-{index}-of-{workers}") for index, port in enumerate(ports)]
+    base_urls = [f"http://127.0.0.1:{port}" for port in ports]
+    ring = HashRing([f"ws://127.0.0.1:{port}" for port in ports])
+    # Los workers ocupan los primeros cores y los clientes los siguientes, si hay
+    server_cpus = [pin(server.pid, cpus, index) for index, server in enumerate(servers)]
+    client_cpus = cpus[workers:]
+
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    try:
+        for server, base_url in zip(servers, base_urls):
+            wait_for_server(server, base_url)
+
+        total_clients = args.clients_per_worker * workers
+        activities = [str(uuid.uuid4()) for _ in range(total_clients)]
+        assignments = [(index, ring.get_node(activity), activity) for index, activity in enumerate(activities)]
+        per_worker = {url: sum(1 for _, node, _ in assignments if node == url) for url in ring.nodes}
+
+        client_processes = max(1, min(args.client_processes or workers, total_clients))
+        barrier = context.Barrier(client_processes + 1)
+        start_at = context.Value("d", 0.0)
+        results = context.Queue()
+        for index in range(client_processes):
+            process = context.Process(
+                target=client_process,
+                args=(assignments[index::client_processes], frames, args, barrier, start_at, results),
+                daemon=True
+            )
+            process.start()
+            pin(process.pid, client_cpus, index)
+            processes.append(process)
+
+        barrier.wait(timeout=args.connect_timeout)
+        time.sleep(args.warmup_seconds)
+        before = [fetch_stats(base_url) for base_url in base_urls]
+        start_at.value = time.time() + 0.2
+        barrier.wait(timeout=args.connect_timeout)
+        time.sleep(max(0.0, start_at.value - time.time()))
+        started_at = time.monotonic()
+
+        peak_rss = [stats["rss_mb"] for stats in before]
+        while time.monotonic() - started_at < args.duration:
+            time.sleep(1.0)
+            peak_rss = [max(peak, fetch_stats(base_url)["rss_mb"]) for peak, base_url in zip(peak_rss, base_urls)]
+        after = [fetch_stats(base_url) for base_url in base_urls]
+        elapsed = time.monotonic() - started_at
+
+        summaries = [results.get(timeout=args.duration + args.drain_seconds + 60) for _ in processes]
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+        for server in servers:
+            server.terminate()
+        for server in servers:
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    errors = [summary["error"] for summary in summaries if "error" in summary]
+    if errors:
+        raise RuntimeError(f"Proceso cliente fallido: {errors[0]}")
+    failures = [summary["first_failure"] for summary in summaries if summary["first_failure"]]
+    if failures:
+        print(f"[SCALING] [WARNING] {sum(s['client_failures'] for s in summaries)} clientes fallaron; primero: {failures[0]}", flush=True)
+
+    latencies = [latency for summary in summaries for latency in summary["latencies"]]
+    frames_accepted = sum(summary["frames_accepted"] for summary in summaries)
+    worker_cpu = [
+        round((end["cpu_seconds"] - start["cpu_seconds"]) / elapsed * 100.0, 1)
+        for start, end in zip(before, after)
+    ]
+    return {
+        "workers": workers,
+        "clients": total_clients,
+        "client_processes": client_processes,
+        "clients_per_worker_actual": sorted(per_worker.values()),
+        "server_cpus": server_cpus,
+        "offered_fps": total_clients * args.fps,
+        "frames_sent": sum(summary["frames_sent"] for summary in summaries),
+        "frames_accepted": frames_accepted,
+        "frames_dropped": sum(summary["frames_dropped"] for summary in summaries),
+        "unanswered_messages": sum(summary["unanswered"] for summary in summaries),
+        "errors": sum(summary["errors"] for summary in summaries),
+        "client_failures": sum(summary["client_failures"] for summary in summaries),
+        "throughput_fps": round(frames_accepted / args.duration, 1),
+        **latency_summary(latencies),
+        "worker_cpu_percent": worker_cpu,
+        "server_cpu_percent": round(sum(worker_cpu), 1),
+        "server_peak_rss_mb": round(sum(peak_rss), 1)
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    cpus = sorted(os.sched_getaffinity(0)) if args.pin_cpus and hasattr(os, "sched_getaffinity") else []
+    available = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    if max(args.workers) * 2 > available:
+        print(f"[SCALING] [WARNING] {available} cores para hasta {max(args.workers)} workers y sus procesos cliente: "
+              "por encima de la mitad de los cores el escalado lo limita la maquina, no el servicio", flush=True)
+
+    workdir = tempfile.mkdtemp(prefix="monitoring-scaling-")
+    try:
+        frames = build_frames(args.windows, args.seed, workdir)
+        results = []
+        for workers in args.workers:
+            result = run_level(workers, frames, args, workdir, cpus)
+            baseline = results[0] if results else result
+            # Escalado respecto al primer nivel, normalizado por el numero de workers
+            result["speedup"] = round(result["throughput_fps"] / baseline["throughput_fps"], 2) if baseline["throughput_fps"] else None
+            result["efficiency"] = round(result["speedup"] * baseline["workers"] / workers, 2) if result["speedup"] else None
+            results.append(result)
+            print(f"[SCALING] [INFO] {workers} workers: {result['throughput_fps']} frames/s, p99 {result['latency_p99_ms']} ms, "
+                  f"CPU por worker {result['worker_cpu_percent']}", flush=True)
+
+        print_table(results, [
+            ("workers", "workers", 9),
+            ("clients", "clientes", 10),
+            ("offered_fps", "ofrecido", 10),
+            ("throughput_fps", "frames/s", 10),
+            ("speedup", "speedup", 9),
+            ("efficiency", "eficiencia", 12),
+            ("frames_dropped", "descartes", 11),
+            ("latency_p50_ms", "p50 ms", 9),
+            ("latency_p99_ms", "p99 ms", 9),
+            ("server_cpu_percent", "CPU %", 8),
+            ("server_peak_rss_mb", "RSS MB", 9)
+        ])
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({"backend": args.backend, "cores": available, "results": results}, f, indent=2)
+            print(f"Resultados guardados en {args.output}")
+    finally:
+        if args.keep_workdir:
+            print(f"Logs y bases de datos de los workers en {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escalado del pipeline de frames con N workers shared-nothing")
+    parser.add_argument("--workers", type=lambda value: [int(n) for n in value.split(",")], default=[1, 2, 4],
+                        help="Numero de workers por nivel, separado por comas")
+    parser.add_argument("--clients-per-worker", type=int, default=100,
+                        help="Clientes por worker; conviene que un solo worker quede saturado")
+    parser.add_argument("--client-processes", type=int, default=0, help="Procesos cliente (0: uno por worker)")
+    parser.add_argument("--fps", type=float, default=10.0, help="Frames por segundo por cliente")
+    parser.add_argument("--frames-per-message", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos medidos por nivel")
+    parser.add_argument("--warmup-seconds", type=float, default=1.0)
+    parser.add_argument("--drain-seconds", type=float, default=5.0)
+    parser.add_argument("--connect-timeout", type=float, default=120.0)
+    parser.add_argument("--windows", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--backend", default=os.getenv("INFERENCE_BACKEND", "synthetic"))
+    parser.add_argument("--pin-cpus", action="store_true", help="Fija workers y procesos cliente a cores distintos (Linux)")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--keep-workdir", action="store_true")
+    args = parser.parse_args()
+
+    # Un hilo de BLAS por proceso, igual que launcher.py
+    for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(name, "1")
+    main(args)
@@ -0,0 +1,79 @@
+import argparse
+import time
+import tracemalloc
+from collections import deque
+import numpy as np
+from src.infrastructure.ml.sequence_buffer import SequenceBuffer
+
+
+class LegacySequenceBuffer:
+    # Implementacion anterior: deque de arrays + deque de frames crudos
+    def __init__(self, max_length: int = 30):
+        self.max_length = max_length
+        self.buffer = deque(maxlen=max_length)
+        self.raw_frames = deque(maxlen=max_length)
+
+    def add(self, features, raw_frame) -> None:
+        self.buffer.append(features)
+        self.raw_frames.append(raw_frame)
+
+    def is_ready(self) -> bool:
+        return len(self.buffer) >= self.max_length
+
+    def get_sequence(self):
+        return np.array(list(self.buffer), dtype=np.float32)
+
+    def get_recent_frames(self, count: int):
+        frames = list(self.buffer)
+        return frames[-count:] if len(frames) >= count else frames
+
+
+def run(buffer, features, raw_frame, evaluate_every: int) -> None:
+    for index, row in enumerate(features):
+        buffer.add(row, raw_frame)
+        if buffer.is_ready():
+            buffer.get_sequence()
+        if index % evaluate_every == 0:
+            np.array(buffer.get_recent_frames(15))
+
+
+def measure(name: str, factory, features, raw_frame, evaluate_every: int) -> None:
+    run(factory(), features[:100], raw_frame, evaluate_every)
+
+    started_at = time.perf_counter()
+    run(factory(), features, raw_frame, evaluate_every)
+    elapsed = time.perf_counter() - started_at
+
+    buffer = factory()
+    tracemalloc.start()
+    transient = []
+    for row in features[:2000]:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        buffer.add(row, raw_frame)
+        if buffer.is_ready():
+            buffer.get_sequence()
+        _, peak = tracemalloc.get_traced_memory()
+        transient.append(peak - current)
+    tracemalloc.stop()
+
+    print(f"{name:<10}{elapsed / len(features) * 1e6:>12.2f}{np.mean(transient):>14.0f}")
+
+
+def main(frame_count: int, evaluate_every: int) -> None:
+    rng = np.random.default_rng(3)
+    # Filas independientes como las que produce el extractor por frame
+    features = list(rng.random((frame_count, 16), dtype=np.float32))
+    raw_frame = {"timestamp": "2024-01-01T00:00:00Z"}
+
+    print(f"{'buffer':<10}{'us/frame':>12}{'bytes/frame':>14}")
+    measure("deque", LegacySequenceBuffer, features, raw_frame, evaluate_every)
+    measure("ring", SequenceBuffer, features, raw_frame, evaluate_every)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buffer de secuencia: deque vs ring buffer espejado")
+    parser.add_argument("--frames", type=int, default=50000)
+    parser.add_argument("--evaluate-every", type=int, default=30)
+    args = parser.parse_args()
+    main(args.frames, args.evaluate_every)
@@ -0,0 +1,127 @@
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import List, Optional
+from src.infrastructure.config.settings import SERVICE_PORT, MONITORING_WORKERS, REDIS_DSN
+
+# Arranca N procesos uvicorn independientes (shared-nothing), cada uno en su puerto, y
+# los reinicia si terminan. No se usa `uvicorn --workers`: ahi todos comparten puerto y el
+# kernel reparte conexiones al azar, y el gateway necesita elegir el worker de cada actividad.
+# Uso: python launcher.py --workers 4 --base-port 3008
+
+
+class Worker:
+    def __init__(self, index: int, host: str, port: int, cpu: Optional[int]):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.cpu = cpu
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self.started_at = 0.0
+        self.restart_at: Optional[float] = None
+
+    def start(self) -> None:
+        env = dict(os.environ)
+        env["SERVICE_PORT"] = str(self.port)
+        env["INSTANCE_ID"] = f"worker-{self.index}"
+        # Un hilo de BLAS por worker: N workers con un pool de hilos cada uno compiten por los mismos cores
+        for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+            env.setdefault(name, "1")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", self.host, "--port", str(self.port)],
+            env=env
+        )
+        self.started_at = time.monotonic()
+        self.restart_at = None
+        if self.cpu is not None:
+            os.sched_setaffinity(self.process.pid, {self.cpu})
+        print(f"[LAUNCHER] [INFO] Worker {self.index} (pid={self.process.pid}) en puerto {self.port}" + (f", cpu {self.cpu}" if self.cpu is not None else ""))
+
+    def terminate(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+    def wait(self, timeout: float) -> None:
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            print(f"[LAUNCHER] [WARN] Worker {self.index} no termino en {timeout}s, se fuerza")
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerLauncher:
+    def __init__(self, workers: int, host: str, base_port: int, pin_cpus: bool, restart_delay: float, stop_timeout: float):
+        cpus = sorted(os.sched_getaffinity(0)) if pin_cpus and hasattr(os, "sched_getaffinity") else []
+        self.workers: List[Worker] = [
+            Worker(index, host, base_port + index, cpus[index % len(cpus)] if cpus else None)
+            for index in range(workers)
+        ]
+        self.restart_delay = restart_delay
+        self.stop_timeout = stop_timeout
+        self._running = True
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+        if len(self.workers) > 1 and not REDIS_DSN:
+            print("[LAUNCHER] [WARN] Sin REDIS_DSN cada worker usa su propio Redis: cooldowns, registro y "
+                  "entrega de recomendaciones entre workers no funcionan")
+        for worker in self.workers:
+            worker.start()
+        urls = ",".join(f"ws://<host>:{worker.port}" for worker in self.workers)
+        print(f"[LAUNCHER] [INFO] Gateway: MONITORING_WORKER_URLS={urls}")
+
+        try:
+            while self._running:
+                time.sleep(0.5)
+                for worker in self.workers:
+                    self._check(worker)
+        finally:
+            print(f"[LAUNCHER] [INFO] Deteniendo {len(self.workers)} workers...")
+            # Se avisa a todos antes de esperar: cierran sus conexiones en paralelo
+            for worker in self.workers:
+                worker.terminate()
+            for worker in self.workers:
+                worker.wait(self.stop_timeout)
+
+    def _check(self, worker: Worker) -> None:
+        if not self._running or worker.process is None:
+            return
+        now = time.monotonic()
+        if worker.restart_at is not None:
+            if now >= worker.restart_at:
+                worker.start()
+            return
+        code = worker.process.poll()
+        if code is None:
+            return
+        # Un worker que cae nada mas arrancar se reinicia con espera creciente para no entrar en bucle
+        crashed_on_start = now - worker.started_at < 10
+        worker.restarts = worker.restarts + 1 if crashed_on_start else 0
+        delay = min(self.restart_delay * 2 ** worker.restarts, 30.0)
+        worker.restart_at = now + delay
+        print(f"[LAUNCHER] [ERROR] Worker {worker.index} termino (codigo {code}), reinicio en {delay:.1f}s")
+
+    def _handle_signal(self, signum, frame) -> None:
+        self._running = False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arranca varios workers de Monitoring, uno por puerto")
+    parser.add_argument("--workers", type=int, default=MONITORING_WORKERS)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--base-port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--pin-cpus", action="store_true", help="Fija cada worker a un core (Linux)")
+    parser.add_argument("--restart-delay", type=float, default=1.0)
+    parser.add_argument("--stop-timeout", type=float, default=15.0)
+    args = parser.parse_args()
+
+    WorkerLauncher(args.workers, args.host, args.base_port, args.pin_cpus, args.restart_delay, args.stop_timeout).run()
@@ -12,12 +12,26 @@ from src.infrastructure.config.settings import (
     RECOMMENDATIONS_QUEUE,
     LOG_SERVICE_QUEUE,
     INTERVENTION_EVALUATIONS_QUEUE,
-    MONITORING_WEBSOCKET_EVENTS_QUEUE
+    MONITORING_WEBSOCKET_EVENTS_QUEUE,
+    INFERENCE_BACKEND,
+    INFERENCE_MODEL_REQUIRED,
+    MODEL_PATH
 )
 from src.infrastructure.persistence.database import create_tables, engine
 from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.infrastructure.messaging.async_publisher import AsyncRabbitMQPublisher
 from src.infrastructure.messaging.recommendation_consumer import RecommendationConsumer
+from src.infrastructure.messaging.recommendation_router import RecommendationRouter
 from src.infrastructure.messaging.queue_validator import validate_service_queues
+from src.infrastructure.cache.redis_client import RedisClient
+from src.infrastructure.cache.cooldown_cache import CooldownStateCache
+from src.infrastructure.websocket.connection_manager import ConnectionManager
+from src.infrastructure.ml.model_loader import ModelLoader
+from src.infrastructure.ml.inference_scheduler import InferenceScheduler
+from src.infrastructure.workers.persistence_dispatcher import PersistenceDispatcher
+from src.infrastructure.workers.training_sample_sink import TrainingSampleSink
+from src.infrastructure.workers.evaluation_scheduler import InterventionEvaluationScheduler
+from src.infrastructure.logger.service_logger import configure_logging, shutdown_logging
 from src.presentation.routes.health_routes import router as health_router
 from src.presentation.routes.ws_routes import router as ws_router
 
@@ -104,6 +118,7 @@ def validate_rabbitmq_and_queues() -> bool:
 async def lifespan(app: FastAPI):
     global recommendation_consumer
 
+    configure_logging()
     print(f"[MAIN] [INFO] Iniciando {SERVICE_NAME}...")
 
     print(f"[MAIN] [INFO] Validando configuracion...")
@@ -123,6 +138,26 @@ async def lifespan(app: FastAPI):
 
     create_tables()
 
+    model_loader = ModelLoader()
+    if not model_loader.load_registry() and not model_loader.load():
+        if INFERENCE_MODEL_REQUIRED:
+            print(f"[MAIN] [ERROR] No se pudo cargar el modelo {MODEL_PATH} (INFERENCE_BACKEND={INFERENCE_BACKEND}), abortando inicio")
+            sys.exit(1)
+        print(f"[MAIN] [WARNING] Sin modelo en {MODEL_PATH}, se usan predicciones sinteticas (fijar INFERENCE_BACKEND para exigir un modelo)")
+    model_loader.start_watcher()
+    redis_client = RedisClient()
+    await redis_client.connect()
+    ConnectionManager().start_heartbeat()
+    RecommendationRouter().start()
+    inference_scheduler = InferenceScheduler()
+    persistence_dispatcher = PersistenceDispatcher()
+    persistence_dispatcher.start()
+    training_sample_sink = TrainingSampleSink()
+    training_sample_sink.start()
+    InterventionEvaluationScheduler().start()
+    async_publisher = AsyncRabbitMQPublisher()
+    await async_publisher.start()
+
     loop = asyncio.get_event_loop()
     recommendation_consumer = RecommendationConsumer()
     recommendation_consumer.set_event_loop(loop)
@@ -133,6 +168,18 @@ async def lifespan(app: FastAPI):
 
     if recommendation_consumer:
         recommendation_consumer.close()
+    inference_scheduler.close()
+    model_loader.stop_watcher()
+    InterventionEvaluationScheduler().close()
+    # Primero el dispatcher: sus trabajos en curso anaden muestras al sink. Ambos
+    # hacen join de threads, asi que se cierran fuera del event loop
+    await loop.run_in_executor(None, persistence_dispatcher.close)
+    await loop.run_in_executor(None, training_sample_sink.close)
+    await async_publisher.close()
+    await ConnectionManager().stop_heartbeat()
+    await CooldownStateCache().close()
+    await redis_client.close()
+    shutdown_logging()
     print(f"[MAIN] [INFO] {SERVICE_NAME} detenido")
 
 
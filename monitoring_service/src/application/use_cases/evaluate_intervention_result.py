@@ -1,15 +1,12 @@
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Dict
 import numpy as np
 from sqlalchemy.orm import Session as DBSession
 from src.domain.entities.intervention import Intervention
 from src.domain.value_objects.intervention_result import InterventionResult
 from src.infrastructure.persistence.repositories.intervention_repository import InterventionRepository
 from src.infrastructure.persistence.repositories.training_sample_repository import TrainingSampleRepository
-from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
 from src.infrastructure.messaging.intervention_evaluation_publisher import InterventionEvaluationPublisher
 from src.infrastructure.ml.sequence_buffer import SequenceBuffer
-from src.infrastructure.config.settings import RESULT_EVALUATION_DELAY_SECONDS
 
 
 class EvaluateInterventionResultUseCase:
@@ -17,35 +14,10 @@ class EvaluateInterventionResultUseCase:
     ATTENTION_INDEX = 8
     FACE_DETECTED_INDEX = 13
 
-    def __init__(self, db: DBSession, rabbitmq_client: Optional[RabbitMQClient] = None):
-        self.db = db
-        self.intervention_repo = InterventionRepository(db)
-        self.training_sample_repo = TrainingSampleRepository(db)
-        self.rabbitmq_client = rabbitmq_client
-        self.evaluation_publisher = None
-        if rabbitmq_client:
-            self.evaluation_publisher = InterventionEvaluationPublisher(rabbitmq_client)
-
-    def execute(self, buffer: SequenceBuffer, session_id: str = None, activity_uuid: str = None) -> List[str]:
-        threshold_time = datetime.utcnow() - timedelta(seconds=RESULT_EVALUATION_DELAY_SECONDS)
-        pending_interventions = self.intervention_repo.get_pending_evaluations(threshold_time)
-
-        evaluated_ids = []
-        for intervention in pending_interventions:
-            result = self._evaluate_single(intervention, buffer)
-            if result:
-                intervention.evaluate_result(result.value)
-                self.intervention_repo.update(intervention)
-                self._update_training_sample_label(intervention, result)
-                
-                if self.evaluation_publisher:
-                    self._publish_evaluation(intervention, result, session_id, activity_uuid)
-                
-                evaluated_ids.append(str(intervention.id))
-
-        return evaluated_ids
-
-    def _evaluate_single(
+    def __init__(self, evaluation_publisher: Optional[InterventionEvaluationPublisher] = None):
+        self.evaluation_publisher = evaluation_publisher
+
+    def evaluate(
         self,
         intervention: Intervention,
         buffer: SequenceBuffer
@@ -53,12 +25,10 @@ class EvaluateInterventionResultUseCase:
         if not buffer.is_ready():
             return None
 
-        recent_frames = buffer.get_recent_frames(15)
-        if len(recent_frames) < 10:
+        recent_array = buffer.get_recent_frames(15)
+        if len(recent_array) < 10:
             return None
 
-        recent_array = np.array(recent_frames)
-
         avg_negative = np.mean(recent_array[:, self.NEGATIVE_EMOTION_INDICES])
         avg_attention = np.mean(recent_array[:, self.ATTENTION_INDEX])
         avg_face_detected = np.mean(recent_array[:, self.FACE_DETECTED_INDEX])
@@ -89,36 +59,54 @@ class EvaluateInterventionResultUseCase:
 
         return InterventionResult.NO_EFFECT
 
-    def _update_training_sample_label(
+    def apply_results(
+        self,
+        db: DBSession,
+        results: List[Tuple[Intervention, InterventionResult]]
+    ) -> List[str]:
+        if not results:
+            return []
+
+        sample_labels: Dict[str, str] = {}
+        for intervention, result in results:
+            intervention.evaluate_result(result.value)
+            label = self._training_label(intervention, result)
+            if label is not None:
+                sample_labels[str(intervention.id)] = label
+
+        InterventionRepository(db).update_results([intervention for intervention, _ in results])
+        if sample_labels:
+            TrainingSampleRepository(db).update_labels_by_intervention(sample_labels)
+
+        if self.evaluation_publisher:
+            for intervention, result in results:
+                self._publish_evaluation(intervention, result)
+
+        return [str(intervention.id) for intervention, _ in results]
+
+    def _training_label(
         self,
         intervention: Intervention,
         result: InterventionResult
-    ) -> None:
-        sample = self.training_sample_repo.get_by_intervention_id(intervention.id)
-        if sample:
-            if result == InterventionResult.POSITIVE:
-                sample.label = intervention.intervention_type
-            elif result == InterventionResult.NEGATIVE:
-                sample.label = "no_intervention"
-            self.training_sample_repo.update(sample)
+    ) -> Optional[str]:
+        if result == InterventionResult.POSITIVE:
+            return intervention.intervention_type
+        elif result == InterventionResult.NEGATIVE:
+            return "no_intervention"
+        return None
 
     def _publish_evaluation(
         self,
         intervention: Intervention,
-        result: InterventionResult,
-        session_id: str,
-        activity_uuid: str
+        result: InterventionResult
     ) -> None:
-        if not self.evaluation_publisher:
-            return
-
         result_str = "positive" if result == InterventionResult.POSITIVE else \
                      "negative" if result == InterventionResult.NEGATIVE else "sin_efecto"
 
         self.evaluation_publisher.publish_evaluation(
             intervention_id=str(intervention.id),
-            session_id=session_id or str(intervention.session_id),
-            activity_uuid=activity_uuid or str(intervention.activity_uuid),
+            session_id=str(intervention.session_id),
+            activity_uuid=str(intervention.activity_uuid),
             cognitive_event=intervention.cognitive_event,
             intervention_type=intervention.intervention_type,
             result=result_str,
@@ -126,4 +114,4 @@ class EvaluateInterventionResultUseCase:
             content_type=intervention.intervention_type,
             precision_before=intervention.precision,
             precision_after=None
-        )
\ No newline at end of file
+        )
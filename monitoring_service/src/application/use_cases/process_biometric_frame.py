@@ -1,8 +1,9 @@
 from typing import Optional, Dict, Any
 from datetime import datetime
+import time
 import uuid
 import random
-from sqlalchemy.orm import Session as DBSession
+import numpy as np
 from src.application.dtos.biometric_frame_dto import BiometricFrameDTO
 from src.application.dtos.monitoring_event_dto import MonitoringEventDTO
 from src.domain.entities.intervention import Intervention
@@ -12,73 +13,175 @@ from src.domain.services.intervention_controller import InterventionController,
 from src.infrastructure.ml.feature_extractor import FeatureExtractor
 from src.infrastructure.ml.sequence_buffer import SequenceBuffer
 from src.infrastructure.ml.intervention_classifier import InterventionClassifier
+from src.infrastructure.ml.numpy_gru import GRUStreamState
+from src.infrastructure.metrics.stage_timer import StageTimer
 from src.infrastructure.messaging.monitoring_publisher import MonitoringPublisher
 from src.infrastructure.persistence.repositories.intervention_repository import InterventionRepository
-from src.infrastructure.persistence.repositories.training_sample_repository import TrainingSampleRepository
-from src.infrastructure.config.settings import NEGATIVE_SAMPLE_RATE
+from src.infrastructure.persistence.database import SessionLocal
+from src.infrastructure.workers.persistence_dispatcher import PersistenceDispatcher
+from src.infrastructure.workers.evaluation_scheduler import InterventionEvaluationScheduler
+from src.infrastructure.workers.training_sample_sink import TrainingSampleSink
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import NEGATIVE_SAMPLE_RATE, FRAMES_INFERENCE_STRIDE
+
+logger = get_logger("PROCESS_FRAME")
 
 
 class ProcessBiometricFrameUseCase:
     def __init__(
         self,
-        db: DBSession,
         buffer: SequenceBuffer,
         context: SessionContext,
         activity_uuid: str,
         session_id: str,
         user_id: int,
         external_activity_id: int,
-        correlation_id: Optional[str] = None
+        stream_state: Optional[GRUStreamState] = None
     ):
-        self.db = db
         self.buffer = buffer
         self.context = context
         self.activity_uuid = activity_uuid
         self.session_id = session_id
         self.user_id = user_id
         self.external_activity_id = external_activity_id
-        self.correlation_id = correlation_id or str(uuid.uuid4())
+        self.stream_state = stream_state
 
         self.feature_extractor = FeatureExtractor()
         self.classifier = InterventionClassifier()
         self.controller = InterventionController()
         self.publisher = MonitoringPublisher()
-        self.intervention_repo = InterventionRepository(db)
-        self.training_sample_repo = TrainingSampleRepository(db)
+        self.dispatcher = PersistenceDispatcher()
+        self.evaluation_scheduler = InterventionEvaluationScheduler()
+        self.sample_sink = TrainingSampleSink()
+        self.stage_timer = StageTimer()
+
+    async def execute(self, frame: BiometricFrameDTO, correlation_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        started_at = time.perf_counter()
+        features = self.feature_extractor.extract(frame)
+        self.stage_timer.observe("extract", time.perf_counter() - started_at)
+        precision = frame.emocion_principal.get("confianza", 0.0) if frame.emocion_principal else 0.0
+        return await self.execute_features(features, precision, correlation_id, raw_frame=frame)
+
+    async def execute_features(
+        self,
+        features: np.ndarray,
+        precision: float,
+        correlation_id: Optional[str] = None,
+        raw_frame: Optional[Any] = None
+    ) -> Optional[Dict[str, Any]]:
+        correlation_id = correlation_id or str(uuid.uuid4())
 
-    def execute(self, frame: BiometricFrameDTO) -> Optional[Dict[str, Any]]:
         if self._activity_changed(self.external_activity_id):
             self._reset_for_new_activity()
 
-        features = self.feature_extractor.extract(frame)
-        self.buffer.add(features, frame.to_dict())
-
+        streaming = self._append(features, raw_frame)
         if not self.buffer.is_ready():
             return None
 
+        return await self._evaluate_window(precision, correlation_id, streaming)
+
+    async def execute_batch(
+        self,
+        features: np.ndarray,
+        precisions: np.ndarray,
+        correlation_id: Optional[str] = None,
+        inference_stride: int = FRAMES_INFERENCE_STRIDE
+    ) -> Dict[str, Any]:
+        correlation_id = correlation_id or str(uuid.uuid4())
+
+        if self._activity_changed(self.external_activity_id):
+            self._reset_for_new_activity()
+
+        # Se infiere sobre la ultima ventana del lote y, si hay stride, cada
+        # k frames; la ventana del buffer se consume antes del siguiente add()
+        interventions = []
+        windows_evaluated = 0
+        last_index = len(features) - 1
+        for index in range(len(features)):
+            streaming = self._append(features[index])
+            if not self.buffer.is_ready():
+                continue
+            if index != last_index and (inference_stride <= 0 or (index + 1) % inference_stride != 0):
+                continue
+
+            windows_evaluated += 1
+            result = await self._evaluate_window(float(precisions[index]), correlation_id, streaming)
+            if result:
+                interventions.append(result)
+
+        return {
+            "windows_evaluated": windows_evaluated,
+            "interventions": interventions
+        }
+
+    def _append(self, features: np.ndarray, raw_frame: Optional[Any] = None) -> bool:
+        started_at = time.perf_counter()
+        self.buffer.add(features, raw_frame)
+
+        streaming = self.stream_state is not None and self.classifier.supports_streaming
+        if streaming:
+            self.classifier.advance_stream(self.stream_state, features)
+        self.stage_timer.observe("buffer", time.perf_counter() - started_at)
+        return streaming
+
+    async def _evaluate_window(
+        self,
+        precision: float,
+        correlation_id: str,
+        streaming: bool
+    ) -> Optional[Dict[str, Any]]:
+        started_at = time.perf_counter()
         sequence = self.buffer.get_sequence()
         context_vector = self.context.get_context_vector()
 
-        intervention_type, confidence = self.classifier.predict(sequence, context_vector)
+        if streaming:
+            intervention_type, confidence = self.classifier.predict_stream(self.stream_state, sequence, context_vector)
+        else:
+            intervention_type, confidence = await self.classifier.predict_async(sequence, context_vector)
+        self.stage_timer.observe("inference", time.perf_counter() - started_at)
 
         if intervention_type == InterventionType.NO_INTERVENTION:
             self._maybe_store_negative_sample(sequence, context_vector)
             return None
 
-        if self.controller.is_cooldown_active(intervention_type, self.context):
+        started_at = time.perf_counter()
+        cooldown_active = self.controller.is_cooldown_active(intervention_type, self.context)
+        self.stage_timer.observe("cooldown", time.perf_counter() - started_at)
+        if cooldown_active:
+            return None
+
+        # En el event loop solo se actualiza el estado en memoria (Redis con write-behind);
+        # BD y RabbitMQ se delegan al dispatcher de persistencia
+        started_at = time.perf_counter()
+        intervention = self._create_intervention(intervention_type, confidence, precision)
+        sample = self._build_training_sample(sequence, context_vector, intervention)
+        event = self._build_event(intervention, correlation_id)
+
+        submitted = self.dispatcher.submit(
+            "persist_intervention",
+            self._persist_intervention,
+            intervention,
+            sample,
+            event,
+            correlation_id
+        )
+        if not submitted:
+            # Con la cola llena la intervencion no se guardaria ni se publicaria: no se envia
+            # al cliente, no se evalua y no cuenta para el cooldown
+            self.stage_timer.observe("dispatch", time.perf_counter() - started_at)
+            logger.warning("Intervencion %s descartada para %s: cola de persistencia llena", intervention_type.value, self.activity_uuid)
             return None
 
-        intervention = self._create_intervention(intervention_type, confidence, frame)
-        self._store_training_sample(sequence, context_vector, intervention)
-        self._publish_event(intervention, frame)
         self.context.record_intervention(intervention_type)
+        self.evaluation_scheduler.schedule(intervention, self.buffer, self.activity_uuid)
+        self.stage_timer.observe("dispatch", time.perf_counter() - started_at)
 
         return {
             "type": "intervention",
             "intervention_id": str(intervention.id),
             "intervention_type": intervention_type.value,
             "confidence": confidence,
-            "correlation_id": self.correlation_id
+            "correlation_id": correlation_id
         }
 
     def _activity_changed(self, external_activity_id: int) -> bool:
@@ -88,21 +191,19 @@ class ProcessBiometricFrameUseCase:
 
     def _reset_for_new_activity(self) -> None:
         self.buffer.clear()
+        if self.stream_state is not None:
+            self.stream_state.reset()
         self.context.reset_for_activity(self.external_activity_id)
-        print(f"[INFO] Contexto reiniciado para nueva actividad: {self.external_activity_id}")
+        logger.info("Contexto reiniciado para nueva actividad: %s", self.external_activity_id)
 
     def _create_intervention(
         self,
         intervention_type: InterventionType,
         confidence: float,
-        frame: BiometricFrameDTO
+        precision: float
     ) -> Intervention:
         cognitive_event = self._map_intervention_to_cognitive_event(intervention_type)
 
-        precision = 0.0
-        if frame.emocion_principal:
-            precision = frame.emocion_principal.get("confianza", 0.0)
-
         intervention = Intervention(
             id=None,
             activity_uuid=uuid.UUID(self.activity_uuid),
@@ -118,7 +219,7 @@ class ProcessBiometricFrameUseCase:
             evaluated_at=None
         )
 
-        return self.intervention_repo.create(intervention)
+        return intervention
 
     def _map_intervention_to_cognitive_event(self, intervention_type: InterventionType) -> str:
         mapping = {
@@ -128,23 +229,22 @@ class ProcessBiometricFrameUseCase:
         }
         return mapping.get(intervention_type, "desconocido")
 
-    def _store_training_sample(
+    def _build_training_sample(
         self,
         sequence,
         context_vector,
         intervention: Intervention
-    ) -> None:
-        sample = TrainingSample(
+    ) -> TrainingSample:
+        return TrainingSample(
             id=None,
             intervention_id=intervention.id,
             external_activity_id=self.external_activity_id,
-            window_data=sequence.tolist(),
+            window_data=np.array(sequence, dtype=np.float32),
             context_data=context_vector.tolist(),
             label=str(intervention.intervention_type),
             source="realtime",
             created_at=datetime.utcnow()
         )
-        self.training_sample_repo.create(sample)
 
     def _maybe_store_negative_sample(self, sequence, context_vector) -> None:
         if random.random() < NEGATIVE_SAMPLE_RATE:
@@ -152,23 +252,23 @@ class ProcessBiometricFrameUseCase:
                 id=None,
                 intervention_id=None,
                 external_activity_id=self.external_activity_id,
-                window_data=sequence.tolist(),
+                window_data=np.array(sequence, dtype=np.float32),
                 context_data=context_vector.tolist(),
                 label="no_intervention",
                 source="realtime",
                 created_at=datetime.utcnow()
             )
-            self.training_sample_repo.create(sample)
+            self.sample_sink.add(sample)
 
-    def _publish_event(self, intervention: Intervention, frame: BiometricFrameDTO) -> None:
+    def _build_event(self, intervention: Intervention, correlation_id: str) -> MonitoringEventDTO:
         context_data = {
             "intentos_previos": self.context.instruction_count,
             "tiempo_en_estado": 0,
-            "correlation_id": self.correlation_id,
+            "correlation_id": correlation_id,
             "precision_cognitiva": intervention.precision
         }
 
-        event = MonitoringEventDTO(
+        return MonitoringEventDTO(
             session_id=self.session_id,
             user_id=self.user_id,
             external_activity_id=self.external_activity_id,
@@ -179,4 +279,23 @@ class ProcessBiometricFrameUseCase:
             timestamp=int(datetime.utcnow().timestamp() * 1000)
         )
 
-        self.publisher.publish(event, self.correlation_id)
\ No newline at end of file
+    def _persist_intervention(
+        self,
+        intervention: Intervention,
+        sample: TrainingSample,
+        event: MonitoringEventDTO,
+        correlation_id: str
+    ) -> None:
+        started_at = time.perf_counter()
+        db = SessionLocal()
+        try:
+            InterventionRepository(db).create(intervention)
+        finally:
+            db.close()
+        self.stage_timer.observe("db_write", time.perf_counter() - started_at)
+
+        # La muestra entra al sink despues del commit de la intervencion que referencia
+        self.sample_sink.add(sample)
+        started_at = time.perf_counter()
+        self.publisher.publish(event, correlation_id)
+        self.stage_timer.observe("publish", time.perf_counter() - started_at)
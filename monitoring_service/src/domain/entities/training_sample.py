@@ -8,7 +8,7 @@ class TrainingSample:
         id: Optional[uuid.UUID],
         intervention_id: Optional[uuid.UUID],
         external_activity_id: int,
-        window_data: Dict[str, Any],
+        window_data: Any,  # (SEQUENCE_LENGTH, 16) float32
         context_data: Dict[str, Any],
         label: str,  # CAMBIADO a str para soportar "no_intervention"
         source: str,
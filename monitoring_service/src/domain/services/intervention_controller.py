@@ -1,14 +1,16 @@
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
-import json
 import numpy as np
 from src.domain.value_objects.intervention_type import InterventionType
+from src.infrastructure.logger.service_logger import get_logger
 from src.infrastructure.config.settings import (
     COOLDOWN_VIBRATION_SECONDS,
     COOLDOWN_INSTRUCTION_SECONDS,
     COOLDOWN_PAUSE_SECONDS
 )
 
+logger = get_logger("SESSION_CONTEXT")
+
 
 class SessionContext:
     def __init__(self):
@@ -21,19 +23,16 @@ class SessionContext:
         self.current_external_activity_id: Optional[int] = None
         self._session_id: Optional[str] = None
         self._activity_uuid: Optional[str] = None
-        self._redis_client = None
+        self._state_store = None
 
-    def set_redis_client(self, redis_client, session_id: str, activity_uuid: str) -> None:
-        self._redis_client = redis_client
+    def set_state_store(self, state_store, session_id: str, activity_uuid: str) -> None:
+        self._state_store = state_store
         self._session_id = session_id
         self._activity_uuid = activity_uuid
 
-    def load_from_redis(self) -> bool:
-        if not self._redis_client or not self._session_id or not self._activity_uuid:
-            return False
-        
+    def restore_state(self, data: Optional[Dict[str, Any]]) -> bool:
+        # El estado se lee de Redis de forma asincrona al conectar y se aplica aqui
         try:
-            data = self._redis_client.get_cooldown_state(self._session_id, self._activity_uuid)
             if data:
                 self.vibration_count = data.get("vibration_count", 0)
                 self.instruction_count = data.get("instruction_count", 0)
@@ -47,17 +46,18 @@ class SessionContext:
                 if data.get("last_pause_at"):
                     self.last_pause_at = datetime.fromisoformat(data["last_pause_at"])
                 
-                print(f"[SESSION_CONTEXT] [INFO] Estado de cooldown cargado desde Redis")
+                logger.info("Estado de cooldown cargado desde Redis")
                 return True
             return False
         except Exception as e:
-            print(f"[SESSION_CONTEXT] [ERROR] Error cargando cooldown desde Redis: {str(e)}")
+            logger.error("Error cargando cooldown desde Redis: %s", e)
             return False
 
-    def save_to_redis(self) -> bool:
-        if not self._redis_client or not self._session_id or not self._activity_uuid:
+    def save_to_redis(self, flush: bool = False) -> bool:
+        # El store agrupa los cambios y los escribe en segundo plano; flush=True al desconectar
+        if not self._state_store or not self._session_id or not self._activity_uuid:
             return False
-        
+
         try:
             data = {
                 "vibration_count": self.vibration_count,
@@ -68,9 +68,9 @@ class SessionContext:
                 "last_instruction_at": self.last_instruction_at.isoformat() if self.last_instruction_at else None,
                 "last_pause_at": self.last_pause_at.isoformat() if self.last_pause_at else None
             }
-            return self._redis_client.save_cooldown_state(self._session_id, self._activity_uuid, data)
+            return self._state_store.save(self._session_id, self._activity_uuid, data, flush)
         except Exception as e:
-            print(f"[SESSION_CONTEXT] [ERROR] Error guardando cooldown en Redis: {str(e)}")
+            logger.error("Error guardando cooldown en Redis: %s", e)
             return False
 
     def reset_for_activity(self, external_activity_id: int) -> None:
@@ -131,7 +131,6 @@ class SessionContext:
         elif intervention_type == InterventionType.PAUSE:
             self.last_pause_at = now
             self.pause_count += 1
-        
         self.save_to_redis()
 
 
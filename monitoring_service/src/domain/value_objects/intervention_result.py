@@ -4,4 +4,5 @@ class InterventionResult(Enum):
     PENDING = "pending"
     POSITIVE = "positive"
     NEGATIVE = "negative"
-    NO_EFFECT = "no_effect"
\ No newline at end of file
+    NO_EFFECT = "no_effect"
+    EXPIRED = "expired"
\ No newline at end of file
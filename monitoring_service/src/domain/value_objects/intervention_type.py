@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Dict
 
 class InterventionType(Enum):
     NO_INTERVENTION = 0
@@ -34,4 +35,14 @@ class InterventionType(Enum):
         return mapping.get(self, "no_intervention")
     
     def get_value(self) -> int:
-        return self.value
\ No newline at end of file
+        return self.value
+
+    @classmethod
+    def label_table(cls) -> Dict[str, int]:
+        # Tabla unica label -> clase para exportar muestras: acepta el nombre
+        # ("vibration") y el indice como texto ("1") de filas antiguas
+        table = {}
+        for intervention_type in cls:
+            table[intervention_type.to_string()] = intervention_type.value
+            table[str(intervention_type.value)] = intervention_type.value
+        return table
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from src.infrastructure.cache.redis_client import RedisClient
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import (
+    COOLDOWN_FLUSH_SECONDS,
+    COOLDOWN_CACHE_TTL_SECONDS,
+    COOLDOWN_CACHE_MAX_ENTRIES,
+    COOLDOWN_LOAD_TIMEOUT_SECONDS
+)
+
+logger = get_logger("COOLDOWN_CACHE")
+
+CooldownKey = Tuple[str, str]
+
+
+class CooldownStateCache:
+    # Write-behind del estado de cooldown: un cambio solo reemplaza la entrada sucia de su
+    # actividad y un pipeline escribe todas las sucias como mucho COOLDOWN_FLUSH_SECONDS
+    # despues del primer cambio. Las lecturas al conectar pasan por una cache local con TTL
+    # y las concurrentes de una misma actividad comparten un GET. Solo se usa desde el loop.
+    _instance: Optional["CooldownStateCache"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.redis_client = RedisClient()
+        self._dirty: Dict[CooldownKey, Dict[str, Any]] = {}
+        self._local: "OrderedDict[CooldownKey, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._loading: Dict[CooldownKey, asyncio.Future] = {}
+        # Serializa las escrituras: una escritura inmediata al desconectar no adelanta a un flush en curso
+        self._write_lock = asyncio.Lock()
+        self._flush_scheduled = False
+        self._closed = False
+        self.saves = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.keys_written = 0
+        self.flush_failures = 0
+        self.loads = 0
+        self.load_hits = 0
+        self.loads_shared = 0
+        self.load_timeouts = 0
+        self._initialized = True
+
+    def save(self, session_id: str, activity_uuid: str, state: Dict[str, Any], flush: bool = False) -> bool:
+        if not self.redis_client._is_available():
+            return False
+        key = (session_id, activity_uuid)
+        self.saves += 1
+        if key in self._dirty:
+            self.coalesced += 1
+        self._dirty[key] = state
+        self._remember(key, state)
+
+        if flush:
+            return self.redis_client.run_nowait(self._write({key: self._dirty.pop(key)}))
+        if not self._flush_scheduled:
+            self._flush_scheduled = self.redis_client.run_nowait(self._flush_later())
+        return True
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(COOLDOWN_FLUSH_SECONDS)
+        await self.flush()
+
+    async def flush(self) -> None:
+        self._flush_scheduled = False
+        dirty, self._dirty = self._dirty, {}
+        if dirty:
+            await self._write(dirty)
+
+    async def _write(self, states: Dict[CooldownKey, Dict[str, Any]]) -> None:
+        async with self._write_lock:
+            self.flushes += 1
+            if await self.redis_client.save_cooldown_states(states):
+                self.keys_written += len(states)
+                return
+
+        self.flush_failures += 1
+        # Se reintenta en el siguiente flush solo si sigue siendo el ultimo estado conocido
+        for key, state in states.items():
+            latest = self._local.get(key)
+            if key not in self._dirty and (latest is None or latest[1] is state):
+                self._dirty[key] = state
+        if self._dirty and not self._closed and not self._flush_scheduled:
+            self._flush_scheduled = self.redis_client.run_nowait(self._flush_later())
+
+    async def load(self, session_id: str, activity_uuid: str) -> Optional[Dict[str, Any]]:
+        key = (session_id, activity_uuid)
+        self.loads += 1
+        cached = self._local.get(key)
+        if cached is not None and time.monotonic() - cached[0] < COOLDOWN_CACHE_TTL_SECONDS:
+            self.load_hits += 1
+            return cached[1]
+
+        pending = self._loading.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self.redis_client.get_cooldown_state(session_id, activity_uuid))
+            self._loading[key] = pending
+            pending.add_done_callback(lambda future: self._loaded(key, future))
+        else:
+            self.loads_shared += 1
+
+        try:
+            # shield: si una conexion deja de esperar, el GET sigue para las demas
+            return await asyncio.wait_for(asyncio.shield(pending), COOLDOWN_LOAD_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.load_timeouts += 1
+            logger.warning("Timeout cargando cooldown de %s, se empieza sin estado", activity_uuid)
+            return None
+
+    def _loaded(self, key: CooldownKey, future: asyncio.Future) -> None:
+        self._loading.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        # Un save durante la lectura es mas reciente que lo leido de Redis
+        cached = self._local.get(key)
+        if cached is None or time.monotonic() - cached[0] >= COOLDOWN_CACHE_TTL_SECONDS:
+            self._remember(key, future.result())
+
+    def _remember(self, key: CooldownKey, state: Optional[Dict[str, Any]]) -> None:
+        self._local[key] = (time.monotonic(), state)
+        self._local.move_to_end(key)
+        while len(self._local) > COOLDOWN_CACHE_MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+    async def close(self) -> None:
+        self._closed = True
+        await self.flush()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "saves": self.saves,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "keys_written": self.keys_written,
+            "flush_failures": self.flush_failures,
+            "dirty": len(self._dirty),
+            "loads": self.loads,
+            "load_hits": self.load_hits,
+            "loads_shared": self.loads_shared,
+            "load_timeouts": self.load_timeouts,
+            "cached": len(self._local)
+        }
@@ -0,0 +1,249 @@
+import asyncio
+import fnmatch
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class InMemoryRedis:
+    # Fallback local en proceso: subconjunto de comandos con la misma API async
+    # que redis.asyncio; no comparte estado entre replicas
+    name = "memory"
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._subscribers: Dict[str, Set["InMemoryPubSub"]] = {}
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            del self._expires[key]
+        return key in self._data
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._data.get(key) if self._alive(key) else None
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self._data[key] = str(value)
+        self._expires.pop(key, None)
+        if ex is not None:
+            await self.expire(key, ex)
+        return True
+
+    async def setex(self, key: str, seconds: int, value: Any) -> bool:
+        return await self.set(key, value, ex=seconds)
+
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            if self._alive(key):
+                del self._data[key]
+                self._expires.pop(key, None)
+                deleted += 1
+        return deleted
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._alive(key))
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(self._data.get(key, 0) if self._alive(key) else 0) + amount
+        self._data[key] = str(value)
+        return value
+
+    async def incr(self, key: str) -> int:
+        return await self.incrby(key, 1)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._expires[key] = time.monotonic() + seconds
+        return True
+
+    async def ttl(self, key: str) -> int:
+        if not self._alive(key):
+            return -2
+        expires_at = self._expires.get(key)
+        return -1 if expires_at is None else int(expires_at - time.monotonic())
+
+    async def keys(self, pattern: str = "*") -> List[str]:
+        return [key for key in list(self._data) if self._alive(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    async def publish(self, channel: str, message: str) -> int:
+        subscribers = self._subscribers.get(channel, ())
+        for subscriber in subscribers:
+            subscriber.deliver(channel, message)
+        return len(subscribers)
+
+    def pubsub(self) -> "InMemoryPubSub":
+        return InMemoryPubSub(self)
+
+    def _container(self, key: str, factory):
+        if not self._alive(key):
+            self._data[key] = factory()
+        return self._data[key]
+
+    async def hset(self, key: str, field: str, value: Any) -> int:
+        container = self._container(key, dict)
+        added = 0 if field in container else 1
+        container[field] = str(value)
+        return added
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        if not self._alive(key):
+            return 0
+        container = self._data[key]
+        deleted = sum(1 for field in fields if container.pop(field, None) is not None)
+        if not container:
+            await self.delete(key)
+        return deleted
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        return dict(self._data[key]) if self._alive(key) else {}
+
+    async def sadd(self, key: str, *members: Any) -> int:
+        container = self._container(key, set)
+        before = len(container)
+        container.update(str(member) for member in members)
+        return len(container) - before
+
+    async def srem(self, key: str, *members: Any) -> int:
+        if not self._alive(key):
+            return 0
+        container = self._data[key]
+        before = len(container)
+        container.difference_update(str(member) for member in members)
+        removed = before - len(container)
+        if not container:
+            await self.delete(key)
+        return removed
+
+    async def smembers(self, key: str) -> Set[str]:
+        return set(self._data[key]) if self._alive(key) else set()
+
+    async def scard(self, key: str) -> int:
+        return len(self._data[key]) if self._alive(key) else 0
+
+    async def rpush(self, key: str, *values: Any) -> int:
+        container = self._container(key, list)
+        container.extend(str(value) for value in values)
+        return len(container)
+
+    async def lrange(self, key: str, start: int, stop: int) -> List[str]:
+        if not self._alive(key):
+            return []
+        container = self._data[key]
+        # stop es inclusivo como en Redis
+        return container[start:] if stop == -1 else container[start:stop + 1]
+
+    async def ltrim(self, key: str, start: int, stop: int) -> bool:
+        if self._alive(key):
+            self._data[key] = await self.lrange(key, start, stop)
+            if not self._data[key]:
+                await self.delete(key)
+        return True
+
+    async def llen(self, key: str) -> int:
+        return len(self._data[key]) if self._alive(key) else 0
+
+    def pipeline(self, transaction: bool = True) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
+
+    async def aclose(self) -> None:
+        self._data.clear()
+        self._expires.clear()
+
+
+class InMemoryPipeline:
+    # Los comandos se ejecutan seguidos sin ceder el loop, asi que el bloque es atomico
+    def __init__(self, client: InMemoryRedis):
+        self._client = client
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs) -> "InMemoryPipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+class InMemoryPubSub:
+    def __init__(self, client: InMemoryRedis):
+        self._client = client
+        self._channels: Set[str] = set()
+        self._messages: asyncio.Queue = asyncio.Queue()
+
+    def deliver(self, channel: str, message: str) -> None:
+        self._messages.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._client._subscribers.setdefault(channel, set()).add(self)
+            self._channels.add(channel)
+
+    async def get_message(self, ignore_subscribe_messages: bool = True, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self._messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self) -> None:
+        for channel in self._channels:
+            self._client._subscribers.get(channel, set()).discard(self)
+        self._channels.clear()
+
+
+class UpstashPipeline:
+    def __init__(self, pipeline):
+        self._pipeline = pipeline
+
+    def __getattr__(self, name: str):
+        command = getattr(self._pipeline, name)
+
+        def queue(*args, **kwargs) -> "UpstashPipeline":
+            command(*args, **kwargs)
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        return await self._pipeline.exec()
+
+
+class UpstashRedis:
+    # Adapta el cliente REST async de Upstash a la interfaz de redis.asyncio;
+    # un pipeline o MULTI es una sola peticion HTTP. La API REST no soporta
+    # SUBSCRIBE, asi que no expone pubsub()
+    name = "upstash"
+
+    def __init__(self, url: str, token: str):
+        from upstash_redis.asyncio import Redis
+        self._client = Redis(url=url, token=token)
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+    def pipeline(self, transaction: bool = True) -> UpstashPipeline:
+        return UpstashPipeline(self._client.multi() if transaction else self._client.pipeline())
+
+    async def aclose(self) -> None:
+        await self._client.close()
+
+
+def create_redis_backend(
+    dsn: Optional[str] = None,
+    url: Optional[str] = None,
+    token: Optional[str] = None,
+    local_fallback: bool = True
+) -> Tuple[str, Optional[Any]]:
+    if dsn:
+        import redis.asyncio as redis_asyncio
+        return "redis", redis_asyncio.from_url(dsn, decode_responses=True)
+    if url and token:
+        return UpstashRedis.name, UpstashRedis(url, token)
+    if local_fallback:
+        return InMemoryRedis.name, InMemoryRedis()
+    return "none", None
@@ -1,9 +1,24 @@
 import json
+import time
 import uuid
-import threading
-from typing import Optional, Dict, Any, List, Callable
-from upstash_redis import Redis
-from src.infrastructure.config.settings import REDIS_URL, REDIS_TOKEN
+import asyncio
+from typing import Optional, Dict, Any, List, Awaitable, Callable, Coroutine, Set, Tuple
+from src.infrastructure.cache.redis_backends import create_redis_backend
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import (
+    REDIS_URL,
+    REDIS_TOKEN,
+    REDIS_DSN,
+    REDIS_LOCAL_FALLBACK,
+    REDIS_METRICS_FLUSH_SECONDS,
+    REGISTRY_TTL_SECONDS,
+    PENDING_RECOMMENDATIONS_MAX,
+    PENDING_RECOMMENDATIONS_TTL_SECONDS,
+    COOLDOWN_STATE_TTL_SECONDS,
+    INSTANCE_ID
+)
+
+logger = get_logger("REDIS_CLIENT")
 
 
 class RedisClient:
@@ -19,284 +34,401 @@ class RedisClient:
         if self._initialized:
             return
         self.client = None
-        self.instance_id = str(uuid.uuid4())[:8]
-        self._pubsub_thread = None
-        self._pubsub_running = False
-        self._subscribers: Dict[str, List[Callable]] = {}
-        if REDIS_URL and REDIS_TOKEN:
-            try:
-                self.client = Redis(url=REDIS_URL, token=REDIS_TOKEN)
-                print(f"[REDIS_CLIENT] [INFO] Conectado a Redis - Instance ID: {self.instance_id}")
-            except Exception as e:
-                print(f"[REDIS_CLIENT] [ERROR] Error conectando a Redis: {str(e)}")
-                self.client = None
+        self.backend = "none"
+        # El sufijo aleatorio evita que un worker reiniciado herede el canal y el registro del anterior
+        self.instance_id = f"{INSTANCE_ID}-{uuid.uuid4().hex[:8]}" if INSTANCE_ID else str(uuid.uuid4())[:8]
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._pending_metrics: Dict[str, int] = {}
+        self._metrics_flush: Optional[asyncio.TimerHandle] = None
+        self._subscriber: Optional[asyncio.Task] = None
         self._initialized = True
 
+    async def connect(self) -> None:
+        # El cliente async se crea dentro del loop que lo va a usar
+        self._loop = asyncio.get_running_loop()
+        if self.client is not None:
+            return
+        try:
+            self.backend, self.client = create_redis_backend(REDIS_DSN, REDIS_URL, REDIS_TOKEN, REDIS_LOCAL_FALLBACK)
+            if self.client is not None:
+                logger.info("Conectado a Redis (%s) - Instance ID: %s", self.backend, self.instance_id)
+        except Exception as e:
+            logger.error("Error conectando a Redis: %s", e)
+            self.backend, self.client = "none", None
+
     def _is_available(self) -> bool:
         return self.client is not None
 
     def get_instance_id(self) -> str:
         return self.instance_id
 
-    def register_connection(self, session_id: str, activity_uuid: str) -> bool:
+    def run_nowait(self, coro: Coroutine) -> bool:
+        # Permite lanzar escrituras desde codigo sincrono, en el loop o en threads del dispatcher
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._is_available():
+            coro.close()
+            return False
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            task = loop.create_task(coro)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, loop)
+        return True
+
+    # Registro de conexiones:
+    #   ws_connection:{session}:{activity}  JSON de la conexion
+    #   ws_session_connections:{session}    SET de activity_uuid
+    #   ws_session_instances:{session}      HASH instance_id -> ultimo registro; cada replica solo toca su campo
+    #   ws_instance_sessions:{instance}     SET de session_id
+    #   ws_activity:{activity}              JSON con instance_id y session_id, para enrutar por actividad
+    # Todas con TTL REGISTRY_TTL_SECONDS, renovado por el heartbeat de la replica
+
+    def _queue_registration(self, pipeline, session_id: str, activity_uuid: str, timestamp: int) -> None:
+        data = {
+            "instance_id": self.instance_id,
+            "activity_uuid": activity_uuid,
+            "session_id": session_id
+        }
+        session_key = f"ws_session_connections:{session_id}"
+        instances_key = f"ws_session_instances:{session_id}"
+        instance_key = f"ws_instance_sessions:{self.instance_id}"
+        pipeline.setex(f"ws_connection:{session_id}:{activity_uuid}", REGISTRY_TTL_SECONDS, json.dumps(data)) \
+            .setex(f"ws_activity:{activity_uuid}", REGISTRY_TTL_SECONDS, json.dumps(data)) \
+            .sadd(session_key, activity_uuid).expire(session_key, REGISTRY_TTL_SECONDS) \
+            .hset(instances_key, self.instance_id, timestamp).expire(instances_key, REGISTRY_TTL_SECONDS) \
+            .sadd(instance_key, session_id).expire(instance_key, REGISTRY_TTL_SECONDS)
+
+    async def register_connection(self, session_id: str, activity_uuid: str) -> bool:
         if not self._is_available():
             return False
         try:
-            key = f"ws_connection:{session_id}:{activity_uuid}"
-            data = {
-                "instance_id": self.instance_id,
-                "activity_uuid": activity_uuid,
-                "session_id": session_id
-            }
-            self.client.setex(key, 3600, json.dumps(data))
-
-            session_key = f"ws_session_connections:{session_id}"
-            existing = self.client.get(session_key)
-            connections = json.loads(existing) if existing else []
-            if activity_uuid not in connections:
-                connections.append(activity_uuid)
-            self.client.setex(session_key, 3600, json.dumps(connections))
-
-            instance_key = f"ws_instance_sessions:{self.instance_id}"
-            existing_sessions = self.client.get(instance_key)
-            sessions = json.loads(existing_sessions) if existing_sessions else []
-            if session_id not in sessions:
-                sessions.append(session_id)
-            self.client.setex(instance_key, 3600, json.dumps(sessions))
-
-            print(f"[REDIS_CLIENT] [INFO] Conexion registrada: session={session_id}, activity={activity_uuid}, instance={self.instance_id}")
+            pipeline = self.client.pipeline(transaction=True)
+            self._queue_registration(pipeline, session_id, activity_uuid, int(time.time()))
+            await pipeline.execute()
+
+            logger.info("Conexion registrada: session=%s, activity=%s, instance=%s", session_id, activity_uuid, self.instance_id)
             return True
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error registrando conexion: {str(e)}")
+            logger.error("Error registrando conexion: %s", e)
             return False
 
-    def unregister_connection(self, session_id: str, activity_uuid: str) -> bool:
+    async def unregister_connection(self, session_id: str, activity_uuid: str, last_for_session: bool = True) -> bool:
+        # last_for_session: esta replica no tiene otras actividades de la sesion, asi que
+        # retira su campo del hash de instancias sin afectar a las demas replicas
         if not self._is_available():
             return False
         try:
-            key = f"ws_connection:{session_id}:{activity_uuid}"
-            self.client.delete(key)
-
-            session_key = f"ws_session_connections:{session_id}"
-            existing = self.client.get(session_key)
-            if existing:
-                connections = json.loads(existing)
-                if activity_uuid in connections:
-                    connections.remove(activity_uuid)
-                if connections:
-                    self.client.setex(session_key, 3600, json.dumps(connections))
-                else:
-                    self.client.delete(session_key)
-
-            print(f"[REDIS_CLIENT] [INFO] Conexion eliminada: session={session_id}, activity={activity_uuid}")
+            pipeline = self.client.pipeline(transaction=True) \
+                .delete(f"ws_connection:{session_id}:{activity_uuid}") \
+                .srem(f"ws_session_connections:{session_id}", activity_uuid)
+            if last_for_session:
+                pipeline.hdel(f"ws_session_instances:{session_id}", self.instance_id) \
+                    .srem(f"ws_instance_sessions:{self.instance_id}", session_id)
+            await pipeline.execute()
+
+            logger.info("Conexion eliminada: session=%s, activity=%s", session_id, activity_uuid)
+            return True
+        except Exception as e:
+            logger.error("Error eliminando conexion: %s", e)
+            return False
+
+    async def refresh_connections(self, connections: List[Tuple[str, str]]) -> bool:
+        # Heartbeat: re-escribe el registro de todas las conexiones locales en un solo pipeline
+        if not self._is_available() or not connections:
+            return False
+        try:
+            timestamp = int(time.time())
+            pipeline = self.client.pipeline(transaction=False)
+            for session_id, activity_uuid in connections:
+                self._queue_registration(pipeline, session_id, activity_uuid, timestamp)
+            await pipeline.execute()
             return True
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error eliminando conexion: {str(e)}")
+            logger.error("Error renovando registro de conexiones: %s", e)
             return False
 
-    def get_connection_instance(self, session_id: str, activity_uuid: str) -> Optional[Dict[str, Any]]:
+    async def get_connection_instance(self, session_id: str, activity_uuid: str) -> Optional[Dict[str, Any]]:
         if not self._is_available():
             return None
         try:
-            key = f"ws_connection:{session_id}:{activity_uuid}"
-            data = self.client.get(key)
+            data = await self.client.get(f"ws_connection:{session_id}:{activity_uuid}")
             if data:
                 return json.loads(data)
             return None
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error obteniendo conexion: {str(e)}")
+            logger.error("Error obteniendo conexion: %s", e)
             return None
 
-    def get_all_connections_for_session(self, session_id: str) -> List[Dict[str, Any]]:
+    async def get_activity_instance(self, activity_uuid: str) -> Optional[Dict[str, Any]]:
+        # ws_activity no se borra al desconectar: si otra replica ya tomo la actividad, borrarla
+        # perderia su registro; una entrada vieja solo hace que el mensaje quede pendiente
+        if not self._is_available():
+            return None
+        try:
+            data = await self.client.get(f"ws_activity:{activity_uuid}")
+            return json.loads(data) if data else None
+        except Exception as e:
+            logger.error("Error obteniendo instancia de actividad: %s", e)
+            return None
+
+    async def get_all_connections_for_session(self, session_id: str) -> List[Dict[str, Any]]:
         if not self._is_available():
             return []
         try:
-            session_key = f"ws_session_connections:{session_id}"
-            existing = self.client.get(session_key)
-            if not existing:
+            activity_uuids = await self.client.smembers(f"ws_session_connections:{session_id}")
+            if not activity_uuids:
                 return []
 
-            connections = json.loads(existing)
-            result = []
-            for activity_uuid in connections:
-                conn_data = self.get_connection_instance(session_id, activity_uuid)
-                if conn_data:
-                    result.append(conn_data)
-            return result
+            # Un solo round-trip para todas las conexiones de la sesion
+            pipeline = self.client.pipeline(transaction=False)
+            for activity_uuid in activity_uuids:
+                pipeline.get(f"ws_connection:{session_id}:{activity_uuid}")
+            return [json.loads(data) for data in await pipeline.execute() if data]
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error obteniendo conexiones de sesion: {str(e)}")
+            logger.error("Error obteniendo conexiones de sesion: %s", e)
             return []
 
-    def get_target_instance_for_session(self, session_id: str) -> Optional[str]:
+    async def get_target_instance_for_session(self, session_id: str) -> Optional[str]:
         if not self._is_available():
             return None
         try:
-            connections = self.get_all_connections_for_session(session_id)
-            if connections:
-                return connections[0].get("instance_id")
-            return None
+            # Un HGETALL sobre las replicas que tienen la sesion (normalmente una); se descartan
+            # campos sin heartbeat reciente de replicas caidas y gana el registro mas nuevo
+            instances = await self.client.hgetall(f"ws_session_instances:{session_id}")
+            cutoff = time.time() - REGISTRY_TTL_SECONDS
+            fresh = [(int(seen_at), instance_id) for instance_id, seen_at in instances.items() if int(seen_at) >= cutoff]
+            return max(fresh)[1] if fresh else None
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error obteniendo instancia destino: {str(e)}")
+            logger.error("Error obteniendo instancia destino: %s", e)
             return None
 
-    def publish_recommendation(self, session_id: str, recommendation: Dict[str, Any]) -> bool:
+    async def publish_recommendation(self, session_id: str, recommendation: Dict[str, Any]) -> bool:
         if not self._is_available():
             return False
         try:
             channel = f"recommendations:{session_id}"
-            message = json.dumps(recommendation)
-            self.client.publish(channel, message)
-            print(f"[REDIS_CLIENT] [INFO] Recomendacion publicada en canal: {channel}")
+            await self.client.publish(channel, json.dumps(recommendation))
+            logger.debug("Recomendacion publicada en canal: %s", channel)
             return True
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error publicando recomendacion: {str(e)}")
+            logger.error("Error publicando recomendacion: %s", e)
             return False
 
-    def publish_to_instance(self, instance_id: str, message: Dict[str, Any]) -> bool:
+    async def publish_to_instance(self, instance_id: str, message: Dict[str, Any]) -> bool:
+        # True solo si la replica destino esta suscrita y recibio el mensaje
         if not self._is_available():
             return False
         try:
-            channel = f"instance:{instance_id}"
-            self.client.publish(channel, json.dumps(message))
-            print(f"[REDIS_CLIENT] [INFO] Mensaje publicado a instancia: {instance_id}")
-            return True
+            receivers = await self.client.publish(f"instance:{instance_id}", json.dumps(message))
+            logger.debug("Mensaje publicado a instancia: %s, receptores: %s", instance_id, receivers)
+            return bool(receivers)
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error publicando a instancia: {str(e)}")
+            logger.error("Error publicando a instancia: %s", e)
+            return False
+
+    def supports_pubsub(self) -> bool:
+        return self._is_available() and hasattr(self.client, "pubsub")
+
+    def subscribe_instance(self, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> bool:
+        if not self.supports_pubsub():
+            logger.warning("Backend %s sin pub/sub; la entrega entre replicas queda deshabilitada", self.backend)
             return False
+        if self._subscriber is None:
+            self._subscriber = asyncio.create_task(self._listen(f"instance:{self.instance_id}", handler))
+        return True
+
+    async def _listen(self, channel: str, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(channel)
+                logger.info("Suscrito a canal: %s", channel)
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    try:
+                        await handler(json.loads(message["data"]))
+                    except Exception as e:
+                        logger.error("Error procesando mensaje de %s: %s", channel, e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Suscripcion a %s interrumpida, reintentando: %s", channel, e)
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
 
-    def store_pending_recommendation(self, session_id: str, recommendation: Dict[str, Any], ttl: int = 300) -> bool:
+    async def store_pending_recommendation(self, session_id: str, recommendation: Dict[str, Any]) -> bool:
+        # Lista por sesion acotada a PENDING_RECOMMENDATIONS_MAX (se descartan las mas antiguas)
         if not self._is_available():
             return False
         try:
-            key = f"pending_recommendation:{session_id}:{uuid.uuid4()}"
-            self.client.setex(key, ttl, json.dumps(recommendation))
+            key = f"pending_recommendations:{session_id}"
+            await self.client.pipeline(transaction=True) \
+                .rpush(key, json.dumps(recommendation)) \
+                .ltrim(key, -PENDING_RECOMMENDATIONS_MAX, -1) \
+                .expire(key, PENDING_RECOMMENDATIONS_TTL_SECONDS) \
+                .execute()
             return True
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error almacenando recomendacion pendiente: {str(e)}")
+            logger.error("Error almacenando recomendacion pendiente: %s", e)
             return False
 
-    def get_pending_recommendations(self, session_id: str) -> List[Dict[str, Any]]:
+    async def get_pending_recommendations(self, session_id: str) -> List[Dict[str, Any]]:
+        # LRANGE + DEL en un MULTI: dos replicas no pueden drenar la misma recomendacion
         if not self._is_available():
             return []
         try:
-            pattern = f"pending_recommendation:{session_id}:*"
-            keys = self.client.keys(pattern)
-            recommendations = []
-            for key in keys:
-                data = self.client.get(key)
-                if data:
-                    recommendations.append(json.loads(data))
-                    self.client.delete(key)
-            return recommendations
+            key = f"pending_recommendations:{session_id}"
+            items, _ = await self.client.pipeline(transaction=True).lrange(key, 0, -1).delete(key).execute()
+            return [json.loads(item) for item in items or []]
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error obteniendo recomendaciones pendientes: {str(e)}")
+            logger.error("Error obteniendo recomendaciones pendientes: %s", e)
             return []
 
-    def save_cooldown_state(self, session_id: str, activity_uuid: str, cooldown_data: Dict[str, Any]) -> bool:
+    async def save_cooldown_states(self, states: Dict[Tuple[str, str], Dict[str, Any]]) -> bool:
+        # Un solo pipeline para todas las actividades de un flush de CooldownStateCache
         if not self._is_available():
             return False
         try:
-            key = f"cooldown_state:{session_id}:{activity_uuid}"
-            self.client.setex(key, 3600, json.dumps(cooldown_data))
+            pipeline = self.client.pipeline(transaction=False)
+            for (session_id, activity_uuid), cooldown_data in states.items():
+                pipeline.setex(f"cooldown_state:{session_id}:{activity_uuid}", COOLDOWN_STATE_TTL_SECONDS, json.dumps(cooldown_data))
+            await pipeline.execute()
             return True
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error guardando cooldown: {str(e)}")
+            logger.error("Error guardando cooldown: %s", e)
             return False
 
-    def get_cooldown_state(self, session_id: str, activity_uuid: str) -> Optional[Dict[str, Any]]:
+    async def get_cooldown_state(self, session_id: str, activity_uuid: str) -> Optional[Dict[str, Any]]:
         if not self._is_available():
             return None
         try:
-            key = f"cooldown_state:{session_id}:{activity_uuid}"
-            data = self.client.get(key)
+            data = await self.client.get(f"cooldown_state:{session_id}:{activity_uuid}")
             if data:
                 return json.loads(data)
             return None
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error obteniendo cooldown: {str(e)}")
+            logger.error("Error obteniendo cooldown: %s", e)
             return None
 
-    def delete_cooldown_state(self, session_id: str, activity_uuid: str) -> bool:
+    async def delete_cooldown_state(self, session_id: str, activity_uuid: str) -> bool:
         if not self._is_available():
             return False
         try:
-            key = f"cooldown_state:{session_id}:{activity_uuid}"
-            self.client.delete(key)
+            await self.client.delete(f"cooldown_state:{session_id}:{activity_uuid}")
             return True
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error eliminando cooldown: {str(e)}")
+            logger.error("Error eliminando cooldown: %s", e)
             return False
 
-    def set_health_status(self, component: str, status: Dict[str, Any]) -> bool:
+    async def set_health_status(self, component: str, status: Dict[str, Any]) -> bool:
         if not self._is_available():
             return False
         try:
             key = f"health:{self.instance_id}:{component}"
-            self.client.setex(key, 60, json.dumps(status))
+            await self.client.setex(key, 60, json.dumps(status))
             return True
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error guardando health status: {str(e)}")
+            logger.error("Error guardando health status: %s", e)
             return False
 
-    def get_health_status(self, component: str) -> Optional[Dict[str, Any]]:
+    async def get_health_status(self, component: str) -> Optional[Dict[str, Any]]:
         if not self._is_available():
             return None
         try:
-            key = f"health:{self.instance_id}:{component}"
-            data = self.client.get(key)
+            data = await self.client.get(f"health:{self.instance_id}:{component}")
             if data:
                 return json.loads(data)
             return None
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error obteniendo health status: {str(e)}")
+            logger.error("Error obteniendo health status: %s", e)
             return None
 
-    def increment_message_retry(self, message_id: str) -> int:
+    async def increment_message_retry(self, message_id: str) -> int:
         if not self._is_available():
             return 0
         try:
             key = f"message_retry:{message_id}"
-            count = self.client.incr(key)
-            if count == 1:
-                self.client.expire(key, 3600)
-            return count
+            count, _ = await self.client.pipeline(transaction=True).incr(key).expire(key, 3600).execute()
+            return int(count)
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error incrementando retry: {str(e)}")
+            logger.error("Error incrementando retry: %s", e)
             return 0
 
-    def get_message_retry_count(self, message_id: str) -> int:
+    async def get_message_retry_count(self, message_id: str) -> int:
         if not self._is_available():
             return 0
         try:
-            count = self.client.get(f"message_retry:{message_id}")
+            count = await self.client.get(f"message_retry:{message_id}")
             return int(count) if count else 0
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error obteniendo retry count: {str(e)}")
+            logger.error("Error obteniendo retry count: %s", e)
             return 0
 
-    def track_websocket_metric(self, metric_type: str, activity_uuid: str) -> None:
+    def track_websocket_metric(self, metric_type: str, activity_uuid: str, count: int = 1) -> None:
+        # Se acumula en memoria y se envia un INCRBY por metrica cada REDIS_METRICS_FLUSH_SECONDS,
+        # en lugar de INCR + EXPIRE por cada frame descartado
         if not self._is_available():
             return
+        self._pending_metrics[metric_type] = self._pending_metrics.get(metric_type, 0) + count
+        if self._metrics_flush is None and self._loop is not None:
+            self._metrics_flush = self._loop.call_later(REDIS_METRICS_FLUSH_SECONDS, self._schedule_metrics_flush)
+
+    def _schedule_metrics_flush(self) -> None:
+        self._metrics_flush = None
+        self.run_nowait(self.flush_websocket_metrics())
+
+    async def flush_websocket_metrics(self) -> None:
+        pending, self._pending_metrics = self._pending_metrics, {}
+        if not pending or not self._is_available():
+            return
         try:
-            key = f"ws_metric:{self.instance_id}:{metric_type}"
-            self.client.incr(key)
-            self.client.expire(key, 3600)
+            pipeline = self.client.pipeline(transaction=False)
+            for metric_type, count in pending.items():
+                key = f"ws_metric:{self.instance_id}:{metric_type}"
+                pipeline.incrby(key, count).expire(key, 3600)
+            await pipeline.execute()
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error tracking metric: {str(e)}")
+            logger.error("Error tracking metric: %s", e)
 
-    def get_websocket_metrics(self) -> Dict[str, int]:
+    async def get_websocket_metrics(self) -> Dict[str, int]:
         if not self._is_available():
             return {}
         try:
-            metrics = {}
-            for metric_type in ["sent", "failed", "dropped"]:
-                key = f"ws_metric:{self.instance_id}:{metric_type}"
-                value = self.client.get(key)
-                metrics[metric_type] = int(value) if value else 0
-            return metrics
+            metric_types = ["sent", "failed", "dropped"]
+            pipeline = self.client.pipeline(transaction=False)
+            for metric_type in metric_types:
+                pipeline.get(f"ws_metric:{self.instance_id}:{metric_type}")
+            values = await pipeline.execute()
+            return {
+                metric_type: int(value) if value else 0
+                for metric_type, value in zip(metric_types, values)
+            }
         except Exception as e:
-            print(f"[REDIS_CLIENT] [ERROR] Error obteniendo metricas: {str(e)}")
+            logger.error("Error obteniendo metricas: %s", e)
             return {}
 
-    def close(self):
-        self._pubsub_running = False
\ No newline at end of file
+    async def close(self) -> None:
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            await asyncio.gather(self._subscriber, return_exceptions=True)
+            self._subscriber = None
+        if self._metrics_flush is not None:
+            self._metrics_flush.cancel()
+            self._metrics_flush = None
+        await self.flush_websocket_metrics()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
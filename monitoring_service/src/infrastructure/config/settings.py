@@ -5,6 +5,11 @@ load_dotenv()
 
 SERVICE_NAME = os.getenv("SERVICE_NAME", "monitoring-service")
 SERVICE_PORT = int(os.getenv("SERVICE_PORT", 3008))
+# Despliegue multi-worker (launcher.py): cada worker escucha en SERVICE_PORT + indice y
+# el gateway reparte las actividades por hash de activity_uuid
+MONITORING_WORKERS = int(os.getenv("MONITORING_WORKERS", 1))
+# Prefijo legible del id de instancia en Redis; launcher.py pone worker-<indice>
+INSTANCE_ID = os.getenv("INSTANCE_ID", "")
 
 MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
 MYSQL_PORT = int(os.getenv("MYSQL_PORT", 3306))
@@ -20,21 +25,102 @@ MONITORING_WEBSOCKET_EVENTS_QUEUE = os.getenv("MONITORING_WEBSOCKET_EVENTS_QUEUE
 RECOMMENDATIONS_QUEUE = os.getenv("RECOMMENDATIONS_QUEUE", "recommendations")
 INTERVENTION_EVALUATIONS_QUEUE = os.getenv("INTERVENTION_EVALUATIONS_QUEUE", "intervention_evaluations")
 
+# Publicador async (aio-pika): pool de canales, confirms y outbox acotado
+RABBITMQ_CHANNEL_POOL_SIZE = int(os.getenv("RABBITMQ_CHANNEL_POOL_SIZE", 4))
+RABBITMQ_PUBLISHER_CONFIRMS = os.getenv("RABBITMQ_PUBLISHER_CONFIRMS", "true").lower() == "true"
+RABBITMQ_OUTBOX_SIZE = int(os.getenv("RABBITMQ_OUTBOX_SIZE", 10000))
+RABBITMQ_BATCH_SIZE = int(os.getenv("RABBITMQ_BATCH_SIZE", 256))
+RABBITMQ_LOG_FLUSH_MS = float(os.getenv("RABBITMQ_LOG_FLUSH_MS", 50))
+RABBITMQ_PUBLISH_RETRIES = int(os.getenv("RABBITMQ_PUBLISH_RETRIES", 3))
+
 REDIS_URL = os.getenv("REDIS_URL")
 REDIS_TOKEN = os.getenv("REDIS_TOKEN")
+# redis://host:port/db de un servidor Redis propio; tiene prioridad sobre Upstash
+REDIS_DSN = os.getenv("REDIS_DSN")
+REDIS_LOCAL_FALLBACK = os.getenv("REDIS_LOCAL_FALLBACK", "true").lower() == "true"
+REDIS_METRICS_FLUSH_SECONDS = float(os.getenv("REDIS_METRICS_FLUSH_SECONDS", 1.0))
+# Las claves del registro de conexiones expiran si la replica deja de renovarlas
+REGISTRY_TTL_SECONDS = int(os.getenv("REGISTRY_TTL_SECONDS", 180))
+REGISTRY_HEARTBEAT_SECONDS = float(os.getenv("REGISTRY_HEARTBEAT_SECONDS", 60))
+PENDING_RECOMMENDATIONS_MAX = int(os.getenv("PENDING_RECOMMENDATIONS_MAX", 50))
+PENDING_RECOMMENDATIONS_TTL_SECONDS = int(os.getenv("PENDING_RECOMMENDATIONS_TTL_SECONDS", 300))
 
 RECOMMENDATION_CONSUMER_WORKERS = int(os.getenv("RECOMMENDATION_CONSUMER_WORKERS", 5))
 RECOMMENDATION_PREFETCH_COUNT = int(os.getenv("RECOMMENDATION_PREFETCH_COUNT", 10))
 
-MODEL_PATH = os.getenv("MODEL_PATH", "models/intervention_model.keras")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "onnxruntime")
+MODEL_PATH = os.getenv("MODEL_PATH", {
+    "keras": "models/intervention_model.keras",
+    "onnxruntime": "models/intervention_model.onnx",
+    "tflite": "models/intervention_model.tflite",
+    "numpy": "models/intervention_model.npz"
+}.get(INFERENCE_BACKEND, "models/intervention_model.onnx"))
+# Sin INFERENCE_BACKEND ni MODEL_PATH explicitos, si falta el artefacto por defecto se sirve
+# el backend sintetico con un aviso; si el operador pidio un modelo, el arranque falla
+INFERENCE_MODEL_REQUIRED = "INFERENCE_BACKEND" in os.environ or "MODEL_PATH" in os.environ
+# Registro de modelos versionados: <dir>/<version>/<artefacto> + punteros ACTIVE y CANDIDATE
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "")
+MODEL_REGISTRY_POLL_SECONDS = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", 5))
+MODEL_SHADOW_SAMPLE_RATE = float(os.getenv("MODEL_SHADOW_SAMPLE_RATE", 0.1))
 SEQUENCE_LENGTH = int(os.getenv("SEQUENCE_LENGTH", 30))
 CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", 0.6))
 
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", 10))
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 64))
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))
+# "streaming" (opcional, solo backend numpy) es una aproximacion: el estado GRU arrastra toda
+# la historia de la sesion, no solo la ventana de SEQUENCE_LENGTH frames con la que se entreno,
+# y solo coincide con la inferencia por ventana al re-sincronizar cada STREAMING_RESYNC_INTERVAL
+# pasos. python -m training.verify_backends mide la deriva y falla si supera el limite
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "window")
+STREAMING_RESYNC_INTERVAL = int(os.getenv("STREAMING_RESYNC_INTERVAL", 30))
+
 COOLDOWN_VIBRATION_SECONDS = int(os.getenv("COOLDOWN_VIBRATION_SECONDS", 30))
 COOLDOWN_INSTRUCTION_SECONDS = int(os.getenv("COOLDOWN_INSTRUCTION_SECONDS", 60))
 COOLDOWN_PAUSE_SECONDS = int(os.getenv("COOLDOWN_PAUSE_SECONDS", 180))
+# Write-behind del estado de cooldown: los cambios de cada actividad se agrupan y se
+# escriben en un pipeline como mucho COOLDOWN_FLUSH_SECONDS despues; al desconectar se
+# escriben ya. Las lecturas al conectar se cachean COOLDOWN_CACHE_TTL_SECONDS por proceso
+COOLDOWN_FLUSH_SECONDS = float(os.getenv("COOLDOWN_FLUSH_SECONDS", 1.0))
+COOLDOWN_CACHE_TTL_SECONDS = float(os.getenv("COOLDOWN_CACHE_TTL_SECONDS", 15))
+COOLDOWN_CACHE_MAX_ENTRIES = int(os.getenv("COOLDOWN_CACHE_MAX_ENTRIES", 10000))
+COOLDOWN_LOAD_TIMEOUT_SECONDS = float(os.getenv("COOLDOWN_LOAD_TIMEOUT_SECONDS", 2.0))
+COOLDOWN_STATE_TTL_SECONDS = int(os.getenv("COOLDOWN_STATE_TTL_SECONDS", 3600))
 
 RESULT_EVALUATION_DELAY_SECONDS = int(os.getenv("RESULT_EVALUATION_DELAY_SECONDS", 45))
+# Las evaluaciones programadas viven en memoria: tras un reinicio o una desconexion se
+# cierran como "expired" las pendientes con mas de delay + gracia
+EVALUATION_SWEEP_INTERVAL_SECONDS = float(os.getenv("EVALUATION_SWEEP_INTERVAL_SECONDS", 300))
+EVALUATION_SWEEP_GRACE_SECONDS = float(os.getenv("EVALUATION_SWEEP_GRACE_SECONDS", 300))
 NEGATIVE_SAMPLE_RATE = float(os.getenv("NEGATIVE_SAMPLE_RATE", 0.05))
 
-DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
\ No newline at end of file
+BACKPRESSURE_MAX_FRAMES_PER_SECOND = float(os.getenv("BACKPRESSURE_MAX_FRAMES_PER_SECOND", 60))
+BACKPRESSURE_BURST = float(os.getenv("BACKPRESSURE_BURST", 60))
+BACKPRESSURE_MAX_QUEUE_SIZE = int(os.getenv("BACKPRESSURE_MAX_QUEUE_SIZE", 300))
+BACKPRESSURE_THROTTLE_THRESHOLD = int(os.getenv("BACKPRESSURE_THROTTLE_THRESHOLD", 250))
+BACKPRESSURE_THROTTLE_SECONDS = float(os.getenv("BACKPRESSURE_THROTTLE_SECONDS", 2))
+BACKPRESSURE_POLICIES = os.getenv("BACKPRESSURE_POLICIES", "")
+
+MAX_FRAMES_PER_MESSAGE = int(os.getenv("MAX_FRAMES_PER_MESSAGE", 60))
+FRAMES_INFERENCE_STRIDE = int(os.getenv("FRAMES_INFERENCE_STRIDE", 0))
+
+PERSISTENCE_WORKERS = int(os.getenv("PERSISTENCE_WORKERS", 4))
+PERSISTENCE_QUEUE_SIZE = int(os.getenv("PERSISTENCE_QUEUE_SIZE", 1000))
+
+TRAINING_SAMPLE_BATCH_SIZE = int(os.getenv("TRAINING_SAMPLE_BATCH_SIZE", 200))
+TRAINING_SAMPLE_FLUSH_SECONDS = float(os.getenv("TRAINING_SAMPLE_FLUSH_SECONDS", 2))
+TRAINING_SAMPLE_BUFFER_SIZE = int(os.getenv("TRAINING_SAMPLE_BUFFER_SIZE", 5000))
+
+# Logging por cola (QueueHandler/QueueListener); DEBUG desactivado por defecto y limitado por componente
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_DEBUG_RATE_PER_SECOND = float(os.getenv("LOG_DEBUG_RATE_PER_SECOND", 10))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+# Histogramas por etapa del camino caliente y perfilado bajo demanda de una conexion
+STAGE_TIMING_ENABLED = os.getenv("STAGE_TIMING_ENABLED", "true").lower() == "true"
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", 60))
+PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", 5))
+
+# DATABASE_URL explicita (p. ej. sqlite:///bench.db en benchmarks) tiene prioridad sobre MYSQL_*
+DATABASE_URL = os.getenv("DATABASE_URL") or f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
\ No newline at end of file
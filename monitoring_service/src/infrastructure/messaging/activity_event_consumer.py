@@ -1,6 +1,7 @@
 import json
 import threading
 from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.infrastructure.messaging.async_publisher import AsyncRabbitMQPublisher
 from src.infrastructure.config.settings import ACTIVITY_EVENTS_QUEUE, LOG_SERVICE_QUEUE
 
 class ActivityStateManager:
@@ -49,6 +50,7 @@ class ActivityStateManager:
 class ActivityEventConsumer:
     def __init__(self):
         self.rabbitmq_client = RabbitMQClient()
+        self.publisher = AsyncRabbitMQPublisher()
         self.state_manager = ActivityStateManager()
 
     def start(self) -> None:
@@ -90,4 +92,4 @@ class ActivityEventConsumer:
             "level": level,
             "message": message
         }
-        self.rabbitmq_client.publish(LOG_SERVICE_QUEUE, log_message)
\ No newline at end of file
+        self.publisher.publish_nowait(LOG_SERVICE_QUEUE, log_message)
\ No newline at end of file
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set
+from src.infrastructure.metrics.histogram import Histogram
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import (
+    AMQP_URL,
+    LOG_SERVICE_QUEUE,
+    RABBITMQ_CHANNEL_POOL_SIZE,
+    RABBITMQ_PUBLISHER_CONFIRMS,
+    RABBITMQ_OUTBOX_SIZE,
+    RABBITMQ_BATCH_SIZE,
+    RABBITMQ_LOG_FLUSH_MS,
+    RABBITMQ_PUBLISH_RETRIES
+)
+
+logger = get_logger("ASYNC_PUBLISHER")
+
+
+@dataclass
+class OutboxMessage:
+    queue_name: str
+    body: bytes
+    correlation_id: Optional[str] = None
+    attempts: int = 0
+
+
+class AsyncRabbitMQPublisher:
+    # Los productores (event loop, workers de persistencia, consumers de pika) solo
+    # encolan con publish_nowait; una tarea del loop vacia el outbox con aio-pika
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.max_outbox_size = RABBITMQ_OUTBOX_SIZE
+        self.batch_size = RABBITMQ_BATCH_SIZE
+        self.log_flush_seconds = RABBITMQ_LOG_FLUSH_MS / 1000.0
+        # deque.append/popleft son atomicos; no hace falta lock para productores en threads
+        self._outbox: Deque[OutboxMessage] = deque()
+        self._log_outbox: Deque[OutboxMessage] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+        self._connection = None
+        self._channel_pool = None
+        self._last_log_flush = time.monotonic()
+
+        # publish_nowait se llama desde threads (dispatcher, consumers): los contadores van con lock
+        self._metrics_lock = threading.Lock()
+        self.enqueued = 0
+        self.published = 0
+        self.failed = 0
+        self.rejected = 0
+        self.retried = 0
+        self.batches_published = 0
+        self.batch_latency_histogram = Histogram("rabbitmq_batch_seconds")
+        self._initialized = True
+
+    async def start(self, channel_pool: Optional[Any] = None) -> None:
+        # channel_pool permite inyectar un broker en memoria (benchmarks); debe ofrecer
+        # acquire() como context manager async y close() como aio_pika.pool.Pool
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._wakeup = asyncio.Event()
+
+        if channel_pool is not None:
+            self._channel_pool = channel_pool
+            self._flusher = asyncio.create_task(self._run())
+            logger.info("Publicador iniciado con pool de canales externo")
+            return
+
+        import aio_pika
+        from aio_pika.pool import Pool
+
+        self._connection = await aio_pika.connect_robust(AMQP_URL)
+
+        async def open_channel():
+            return await self._connection.channel(publisher_confirms=RABBITMQ_PUBLISHER_CONFIRMS)
+
+        self._channel_pool = Pool(open_channel, max_size=RABBITMQ_CHANNEL_POOL_SIZE)
+        self._flusher = asyncio.create_task(self._run())
+        logger.info("Publicador iniciado: canales=%s, confirms=%s", RABBITMQ_CHANNEL_POOL_SIZE, RABBITMQ_PUBLISHER_CONFIRMS)
+
+    def publish_nowait(self, queue_name: str, message: Dict[str, Any], correlation_id: Optional[str] = None) -> bool:
+        # No bloquea nunca: False si el outbox esta lleno
+        if len(self._outbox) + len(self._log_outbox) >= self.max_outbox_size:
+            with self._metrics_lock:
+                self.rejected += 1
+            return False
+
+        item = OutboxMessage(queue_name, json.dumps(message).encode(), correlation_id)
+        with self._metrics_lock:
+            self.enqueued += 1
+        if queue_name == LOG_SERVICE_QUEUE:
+            # Los logs se agrupan y salen cada RABBITMQ_LOG_FLUSH_MS o al llenar un lote
+            self._log_outbox.append(item)
+            if len(self._log_outbox) >= self.batch_size:
+                self._wake()
+        else:
+            self._outbox.append(item)
+            self._wake()
+        return True
+
+    def _wake(self) -> None:
+        wakeup = self._wakeup
+        if wakeup is None or wakeup.is_set():
+            return
+        if threading.get_ident() == self._loop_thread:
+            wakeup.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(wakeup.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.log_flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self._dispatch()
+
+    def _dispatch(self, force_logs: bool = False) -> None:
+        while self._outbox:
+            self._spawn_batch(self._take(self._outbox))
+
+        now = time.monotonic()
+        logs_due = force_logs or now - self._last_log_flush >= self.log_flush_seconds
+        while self._log_outbox and (logs_due or len(self._log_outbox) >= self.batch_size):
+            self._spawn_batch(self._take(self._log_outbox))
+            self._last_log_flush = now
+
+    def _take(self, outbox: Deque[OutboxMessage]) -> List[OutboxMessage]:
+        batch = []
+        while outbox and len(batch) < self.batch_size:
+            batch.append(outbox.popleft())
+        return batch
+
+    def _spawn_batch(self, batch: List[OutboxMessage]) -> None:
+        # Cada lote usa un canal del pool; el pool limita los lotes en vuelo
+        task = asyncio.create_task(self._publish_batch(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _publish_batch(self, batch: List[OutboxMessage]) -> None:
+        import aio_pika
+
+        started_at = time.perf_counter()
+        try:
+            async with self._channel_pool.acquire() as channel:
+                # Se envian todos los mensajes y luego se esperan los confirms juntos
+                results = await asyncio.gather(*[
+                    channel.default_exchange.publish(
+                        aio_pika.Message(
+                            body=item.body,
+                            content_type="application/json",
+                            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                            correlation_id=item.correlation_id
+                        ),
+                        routing_key=item.queue_name
+                    )
+                    for item in batch
+                ], return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        self.batch_latency_histogram.observe(time.perf_counter() - started_at)
+        published = retried = failed = 0
+        for item, result in zip(batch, results):
+            if not isinstance(result, Exception):
+                published += 1
+            elif item.attempts + 1 < RABBITMQ_PUBLISH_RETRIES:
+                item.attempts += 1
+                retried += 1
+                self._outbox.append(item)
+            else:
+                failed += 1
+                logger.error("Mensaje descartado para %s tras %s intentos: %s", item.queue_name, RABBITMQ_PUBLISH_RETRIES, result)
+
+        with self._metrics_lock:
+            self.batches_published += 1
+            self.published += published
+            self.retried += retried
+            self.failed += failed
+
+        if retried:
+            # Los reintentos esperan al siguiente ciclo para no girar en caliente sin broker
+            await asyncio.sleep(self.log_flush_seconds)
+            self._wake()
+
+    def get_outbox_depth(self) -> int:
+        return len(self._outbox) + len(self._log_outbox)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            metrics = {
+                "outbox_depth": self.get_outbox_depth(),
+                "max_outbox_size": self.max_outbox_size,
+                "enqueued": self.enqueued,
+                "published": self.published,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "retried": self.retried,
+                "batches_published": self.batches_published,
+                "batches_in_flight": len(self._batches)
+            }
+        metrics["batch_seconds"] = self.batch_latency_histogram.snapshot()
+        return metrics
+
+    async def close(self, timeout: float = 5.0) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+
+        # Vacia lo pendiente antes de cerrar la conexion
+        if self._channel_pool is not None:
+            self._dispatch(force_logs=True)
+            if self._batches:
+                await asyncio.wait(set(self._batches), timeout=timeout)
+            await self._channel_pool.close()
+            self._channel_pool = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+        self._wakeup = None
+        logger.info("Publicador cerrado; pendientes descartados: %s", self.get_outbox_depth())
@@ -1,13 +1,13 @@
 import json
 from datetime import datetime
 from typing import Dict, Any, Optional
-from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.infrastructure.messaging.async_publisher import AsyncRabbitMQPublisher
 from src.infrastructure.config.settings import INTERVENTION_EVALUATIONS_QUEUE, LOG_SERVICE_QUEUE
 
 
 class InterventionEvaluationPublisher:
-    def __init__(self, rabbitmq_client: RabbitMQClient):
-        self.rabbitmq_client = rabbitmq_client
+    def __init__(self, publisher: Optional[AsyncRabbitMQPublisher] = None):
+        self.publisher = publisher or AsyncRabbitMQPublisher()
 
     def publish_evaluation(
         self,
@@ -37,12 +37,12 @@ class InterventionEvaluationPublisher:
             "evaluated_at": datetime.utcnow().isoformat()
         }
 
-        success = self.rabbitmq_client.publish(INTERVENTION_EVALUATIONS_QUEUE, message)
+        success = self.publisher.publish_nowait(INTERVENTION_EVALUATIONS_QUEUE, message)
         
         if success:
-            self._log(f"Evaluacion de intervencion publicada: {intervention_id} -> {result}")
+            self._log(f"Evaluacion de intervencion encolada: {intervention_id} -> {result}")
         else:
-            self._log(f"Error publicando evaluacion de intervencion: {intervention_id}", "error")
+            self._log(f"Outbox lleno, evaluacion de intervencion descartada: {intervention_id}", "error")
         
         return success
 
@@ -52,4 +52,4 @@ class InterventionEvaluationPublisher:
             "level": level,
             "message": message
         }
-        self.rabbitmq_client.publish(LOG_SERVICE_QUEUE, log_message)
\ No newline at end of file
+        self.publisher.publish_nowait(LOG_SERVICE_QUEUE, log_message)
\ No newline at end of file
@@ -1,19 +1,19 @@
 import json
 from typing import Optional
 from datetime import datetime
-from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.infrastructure.messaging.async_publisher import AsyncRabbitMQPublisher
 from src.infrastructure.config.settings import MONITORING_EVENTS_QUEUE, LOG_SERVICE_QUEUE
 from src.application.dtos.monitoring_event_dto import MonitoringEventDTO
 
 
 class MonitoringPublisher:
     _instance = None
-    _rabbitmq_client = None
+    _publisher = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._rabbitmq_client = RabbitMQClient()
+            cls._publisher = AsyncRabbitMQPublisher()
         return cls._instance
 
     def publish(self, event: MonitoringEventDTO, correlation_id: Optional[str] = None) -> bool:
@@ -36,20 +36,20 @@ class MonitoringPublisher:
             "published_at": datetime.utcnow().isoformat()
         }
 
-        success = self._rabbitmq_client.publish(
-            MONITORING_EVENTS_QUEUE, 
+        success = self._publisher.publish_nowait(
+            MONITORING_EVENTS_QUEUE,
             message, 
             correlation_id=correlation_id
         )
 
         if success:
             self._log(
-                f"Evento publicado: session={event.session_id}, activity={event.activity_uuid}, evento={event.evento_cognitivo}, correlation_id={correlation_id}",
+                f"Evento encolado: session={event.session_id}, activity={event.activity_uuid}, evento={event.evento_cognitivo}, correlation_id={correlation_id}",
                 correlation_id=correlation_id
             )
         else:
             self._log(
-                f"Error publicando evento: session={event.session_id}",
+                f"Outbox lleno, evento descartado: session={event.session_id}",
                 level="error",
                 correlation_id=correlation_id
             )
@@ -64,4 +64,4 @@ class MonitoringPublisher:
             "correlation_id": correlation_id,
             "timestamp": datetime.utcnow().isoformat()
         }
-        self._rabbitmq_client.publish(LOG_SERVICE_QUEUE, log_message, correlation_id=correlation_id)
\ No newline at end of file
+        self._publisher.publish_nowait(LOG_SERVICE_QUEUE, log_message, correlation_id=correlation_id)
\ No newline at end of file
@@ -1,4 +1,5 @@
 import json
+import threading
 import pika
 from typing import Dict, Any, Callable, Optional
 from src.infrastructure.config.settings import AMQP_URL
@@ -8,6 +9,9 @@ class RabbitMQClient:
     def __init__(self):
         self.connection = None
         self.channel = None
+        # BlockingConnection no es thread-safe; los workers de persistencia
+        # y el event loop comparten el mismo cliente
+        self._publish_lock = threading.Lock()
         self._connect()
 
     def _connect(self) -> None:
@@ -36,6 +40,15 @@ class RabbitMQClient:
         queue_name: str, 
         message: Dict[str, Any], 
         correlation_id: Optional[str] = None
+    ) -> bool:
+        with self._publish_lock:
+            return self._publish(queue_name, message, correlation_id)
+
+    def _publish(
+        self,
+        queue_name: str,
+        message: Dict[str, Any],
+        correlation_id: Optional[str] = None
     ) -> bool:
         max_retries = 3
         retry_count = 0
@@ -1,5 +1,6 @@
 import json
 import threading
+import time
 import asyncio
 import pika
 from concurrent.futures import ThreadPoolExecutor
@@ -9,26 +10,34 @@ from src.infrastructure.config.settings import (
     RECOMMENDATION_CONSUMER_WORKERS,
     RECOMMENDATION_PREFETCH_COUNT
 )
-from src.infrastructure.websocket.connection_manager import manager
+from src.infrastructure.messaging.recommendation_router import RecommendationRouter, DROPPED, UNROUTABLE
+from src.infrastructure.logger.service_logger import get_logger
+
+logger = get_logger("RECOMMENDATION_CONSUMER")
 
 
 class RecommendationConsumer:
+    DELIVERY_TIMEOUT_SECONDS = 5
+    # Espera antes de devolver un mensaje a la cola: sin ella un Redis caido lo haria girar en bucle
+    REQUEUE_DELAY_SECONDS = 1.0
+
     def __init__(self):
         self.executor = ThreadPoolExecutor(max_workers=RECOMMENDATION_CONSUMER_WORKERS)
         self._running = False
         self._connection = None
         self._channel = None
         self._loop = None
+        self.router = RecommendationRouter()
 
     def set_event_loop(self, loop):
         self._loop = loop
-        print(f"[RECOMMENDATION_CONSUMER] [INFO] Event loop configurado: {loop}")
+        logger.info("Event loop configurado: %s", loop)
 
     def start(self) -> None:
         self._running = True
         thread = threading.Thread(target=self._consume, daemon=True)
         thread.start()
-        print(f"[RECOMMENDATION_CONSUMER] [INFO] Consumer iniciado con {RECOMMENDATION_CONSUMER_WORKERS} workers")
+        logger.info("Consumer iniciado con %s workers", RECOMMENDATION_CONSUMER_WORKERS)
 
     def _consume(self) -> None:
         while self._running:
@@ -50,12 +59,11 @@ class RecommendationConsumer:
                     auto_ack=False
                 )
                 
-                print(f"[RECOMMENDATION_CONSUMER] [INFO] Escuchando en cola: {RECOMMENDATIONS_QUEUE}")
+                logger.info("Escuchando en cola: %s", RECOMMENDATIONS_QUEUE)
                 self._channel.start_consuming()
             except Exception as e:
-                print(f"[RECOMMENDATION_CONSUMER] [ERROR] Error en consumer: {str(e)}")
+                logger.error("Error en consumer: %s", e)
                 if self._running:
-                    import time
                     time.sleep(5)
 
     def _on_message(self, ch, method, properties, body) -> None:
@@ -64,55 +72,46 @@ class RecommendationConsumer:
     def _process_message(self, ch, method, properties, body) -> None:
         try:
             message = json.loads(body)
-            
-            # Intentar obtener el ID de conexión WS
-            activity_uuid = message.get("contexto", {}).get("activity_uuid")
-            
-            if not activity_uuid:
-                # Fallback: a veces viene en metadata
-                activity_uuid = message.get("metadata", {}).get("activity_uuid")
-
-            print(f"[RECOMMENDATION_CONSUMER] [DEBUG] Mensaje recibido - activity_uuid: {activity_uuid}")
-            print(f"[RECOMMENDATION_CONSUMER] [DEBUG] Loop configurado: {self._loop is not None}")
-            print(f"[RECOMMENDATION_CONSUMER] [DEBUG] Conexiones activas: {list(manager.active_connections.keys())}")
+            activity_uuid = self.router.extract_activity_uuid(message)
 
             if not activity_uuid:
-                print(f"[RECOMMENDATION_CONSUMER] [WARNING] Mensaje sin activity_uuid, ignorando")
+                logger.warning("Mensaje sin activity_uuid, ignorando")
                 self._safe_ack(ch, method.delivery_tag)
                 return
 
-            has_conn = manager.has_connection(activity_uuid)
-            print(f"[RECOMMENDATION_CONSUMER] [DEBUG] has_connection({activity_uuid}): {has_conn}")
-
-            if self._loop and has_conn:
-                print(f"[RECOMMENDATION_CONSUMER] [DEBUG] ANTES - tiene type?: {'type' in message}")
-                message["type"] = "recommendation"
-                print(f"[RECOMMENDATION_CONSUMER] [DEBUG] Keys del mensaje: {list(message.keys())}")
-                print(f"[RECOMMENDATION_CONSUMER] [DEBUG] DESPUES - type es: {message.get('type')}")
-                print(f"[RECOMMENDATION_CONSUMER] [DEBUG] Mensaje a enviar: {json.dumps(message)[:200]}")
-                
-                future = asyncio.run_coroutine_threadsafe(
-                    manager.send_personal_message(message, activity_uuid),
-                    self._loop
-                )
-                try:
-                    result = future.result(timeout=2)
-                    print(f"[RECOMMENDATION_CONSUMER] [INFO] Enviado a WS local: {activity_uuid}, resultado: {result}")
-                except Exception as e:
-                    print(f"[RECOMMENDATION_CONSUMER] [ERROR] Fallo envio WS: {e}")
-            else:
-                if not self._loop:
-                    print(f"[RECOMMENDATION_CONSUMER] [WARNING] No hay event loop configurado")
-                if not has_conn:
-                    print(f"[RECOMMENDATION_CONSUMER] [WARNING] No hay conexion activa para: {activity_uuid}")
-            
-            self._safe_ack(ch, method.delivery_tag)
+            if not self._loop:
+                logger.warning("No hay event loop configurado")
+                self._safe_nack(ch, method.delivery_tag, requeue=True)
+                return
+        except Exception as e:
+            logger.exception("Mensaje invalido, descartando: %s", e)
+            self._safe_nack(ch, method.delivery_tag, requeue=False)
+            return
 
+        # El router decide si se entrega local, se reenvia a la replica con la conexion
+        # o queda pendiente para la sesion; solo se hace ACK cuando alguna de ellas tuvo exito
+        future = asyncio.run_coroutine_threadsafe(self.router.deliver(message), self._loop)
+        try:
+            outcome = future.result(timeout=self.DELIVERY_TIMEOUT_SECONDS)
         except Exception as e:
-            print(f"[RECOMMENDATION_CONSUMER] [ERROR] Error procesando mensaje: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            future.cancel()
+            logger.error("Error entregando recomendacion para %s, se devuelve a la cola: %r", activity_uuid, e)
+            self._requeue(ch, method.delivery_tag)
+            return
+
+        if outcome == DROPPED:
+            logger.warning("No se pudo guardar la recomendacion pendiente de %s, se devuelve a la cola", activity_uuid)
+            self._requeue(ch, method.delivery_tag)
+        elif outcome == UNROUTABLE:
+            # Sin requeue: va a la dead-letter exchange de la cola si esta configurada
+            logger.warning("Recomendacion sin conexion ni sesion para %s, se rechaza", activity_uuid)
             self._safe_nack(ch, method.delivery_tag, requeue=False)
+        else:
+            self._safe_ack(ch, method.delivery_tag)
+
+    def _requeue(self, ch, delivery_tag) -> None:
+        time.sleep(self.REQUEUE_DELAY_SECONDS)
+        self._safe_nack(ch, delivery_tag, requeue=True)
 
     def _safe_ack(self, ch, delivery_tag) -> None:
         try:
@@ -120,7 +119,7 @@ class RecommendationConsumer:
                 lambda: ch.basic_ack(delivery_tag=delivery_tag)
             )
         except Exception as e:
-            print(f"[RECOMMENDATION_CONSUMER] [ERROR] Error en ACK: {str(e)}")
+            logger.error("Error en ACK: %s", e)
 
     def _safe_nack(self, ch, delivery_tag, requeue=True) -> None:
         try:
@@ -128,7 +127,7 @@ class RecommendationConsumer:
                 lambda: ch.basic_nack(delivery_tag=delivery_tag, requeue=requeue)
             )
         except Exception as e:
-            print(f"[RECOMMENDATION_CONSUMER] [ERROR] Error en NACK: {str(e)}")
+            logger.error("Error en NACK: %s", e)
 
     def close(self) -> None:
         self._running = False
@@ -136,6 +135,6 @@ class RecommendationConsumer:
             if self._connection and not self._connection.is_closed:
                 self._connection.close()
         except Exception as e:
-            print(f"[RECOMMENDATION_CONSUMER] [ERROR] Error cerrando consumer: {str(e)}")
+            logger.error("Error cerrando consumer: %s", e)
         self.executor.shutdown(wait=False)
-        print(f"[RECOMMENDATION_CONSUMER] [INFO] Consumer de recomendaciones cerrado")
\ No newline at end of file
+        logger.info("Consumer de recomendaciones cerrado")
@@ -0,0 +1,117 @@
+from typing import Dict, Any, Optional
+from src.infrastructure.cache.redis_client import RedisClient
+from src.infrastructure.websocket.connection_manager import ConnectionManager, ConnectionState
+from src.infrastructure.logger.service_logger import get_logger
+
+LOCAL = "local"
+FORWARDED = "forwarded"
+PENDING = "pending"
+DROPPED = "dropped"
+UNROUTABLE = "unroutable"
+
+logger = get_logger("RECOMMENDATION_ROUTER")
+
+
+class RecommendationRouter:
+    # Entrega una recomendacion en la replica que tiene el WebSocket de la actividad:
+    # local si la conexion esta aqui, por pub/sub a instance:{id} si esta en otra replica,
+    # y como pendiente de la sesion si no esta conectada en ninguna
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.redis_client = RedisClient()
+        self.manager = ConnectionManager()
+        self.outcomes: Dict[str, int] = {LOCAL: 0, FORWARDED: 0, PENDING: 0, DROPPED: 0, UNROUTABLE: 0}
+        self.redelivered = 0
+        self._initialized = True
+
+    def start(self) -> bool:
+        return self.redis_client.subscribe_instance(self.handle_instance_message)
+
+    async def deliver(self, message: Dict[str, Any]) -> str:
+        activity_uuid = self.extract_activity_uuid(message)
+        message["type"] = "recommendation"
+
+        outcome = await self._deliver(message, activity_uuid, message.get("session_id"))
+        self.outcomes[outcome] += 1
+        logger.debug("Recomendacion para %s: %s", activity_uuid, outcome)
+        return outcome
+
+    async def _deliver(
+        self,
+        message: Dict[str, Any],
+        activity_uuid: str,
+        session_id: Optional[str],
+        allow_forward: bool = True
+    ) -> str:
+        if await self.manager.send_personal_message(message, activity_uuid):
+            return LOCAL
+
+        target = await self.redis_client.get_activity_instance(activity_uuid)
+        if target:
+            session_id = session_id or target.get("session_id")
+            instance_id = target.get("instance_id")
+            # Un mensaje ya reenviado no se vuelve a reenviar; evita ciclos entre replicas
+            if allow_forward and instance_id != self.redis_client.get_instance_id():
+                envelope = {
+                    "activity_uuid": activity_uuid,
+                    "session_id": session_id,
+                    "origin_instance": self.redis_client.get_instance_id(),
+                    "message": message
+                }
+                if await self.redis_client.publish_to_instance(instance_id, envelope):
+                    return FORWARDED
+
+        # DROPPED: fallo al guardarla como pendiente (Redis caido), reintentar puede servir;
+        # UNROUTABLE: sin conexion ni sesion conocida, nada puede guardarla
+        if not session_id:
+            return UNROUTABLE
+        if await self.redis_client.store_pending_recommendation(session_id, message):
+            return PENDING
+        return DROPPED
+
+    async def handle_instance_message(self, envelope: Dict[str, Any]) -> None:
+        outcome = await self._deliver(
+            envelope.get("message", {}),
+            envelope.get("activity_uuid"),
+            envelope.get("session_id"),
+            allow_forward=False
+        )
+        self.outcomes[outcome] += 1
+        logger.debug("Recomendacion reenviada por %s para %s: %s", envelope.get('origin_instance'), envelope.get('activity_uuid'), outcome)
+
+    async def redeliver_pending(self, state: ConnectionState) -> int:
+        # Al (re)conectar se envian las recomendaciones que quedaron pendientes para la sesion
+        recommendations = await self.redis_client.get_pending_recommendations(state.session_id)
+        delivered = 0
+        for recommendation in recommendations:
+            if await state.send_personal_message(recommendation, state.activity_uuid):
+                delivered += 1
+            else:
+                await self.redis_client.store_pending_recommendation(state.session_id, recommendation)
+        if recommendations:
+            logger.info("Reentregadas %s/%s recomendaciones pendientes a %s", delivered, len(recommendations), state.activity_uuid)
+        self.redelivered += delivered
+        return delivered
+
+    def extract_activity_uuid(self, message: Dict[str, Any]) -> Optional[str]:
+        activity_uuid = message.get("contexto", {}).get("activity_uuid")
+        if not activity_uuid:
+            # Fallback: a veces viene en metadata
+            activity_uuid = message.get("metadata", {}).get("activity_uuid")
+        return activity_uuid
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.outcomes,
+            "redelivered": self.redelivered,
+            "cross_instance_enabled": self.redis_client.supports_pubsub()
+        }
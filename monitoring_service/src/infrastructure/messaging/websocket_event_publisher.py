@@ -1,11 +1,11 @@
 from datetime import datetime
-from typing import Dict, Any
-from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from typing import Dict, Any, Optional
+from src.infrastructure.messaging.async_publisher import AsyncRabbitMQPublisher
 from src.infrastructure.config.settings import MONITORING_WEBSOCKET_EVENTS_QUEUE, LOG_SERVICE_QUEUE
 
 class WebsocketEventPublisher:
-    def __init__(self, rabbitmq_client: RabbitMQClient):
-        self.rabbitmq_client = rabbitmq_client
+    def __init__(self, publisher: Optional[AsyncRabbitMQPublisher] = None):
+        self.publisher = publisher or AsyncRabbitMQPublisher()
 
     def publish_websocket_disconnected(
         self,
@@ -20,7 +20,7 @@ class WebsocketEventPublisher:
             "reason": reason,
             "disconnected_at": datetime.utcnow().isoformat()
         }
-        success = self.rabbitmq_client.publish(MONITORING_WEBSOCKET_EVENTS_QUEUE, message)
+        success = self.publisher.publish_nowait(MONITORING_WEBSOCKET_EVENTS_QUEUE, message)
         if success:
             self._log(f"Evento websocket_disconnected publicado: {activity_uuid}")
         return success
@@ -31,4 +31,4 @@ class WebsocketEventPublisher:
             "level": level,
             "message": message
         }
-        self.rabbitmq_client.publish(LOG_SERVICE_QUEUE, log_message)
\ No newline at end of file
+        self.publisher.publish_nowait(LOG_SERVICE_QUEUE, log_message)
\ No newline at end of file
@@ -0,0 +1,78 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+from src.infrastructure.config.settings import PROFILING_SAMPLE_INTERVAL_MS
+
+
+class ConnectionProfiler:
+    # Perfila una sola conexion: el consumidor llama a enter()/exit() alrededor de cada
+    # lote que procesa. "cprofile" activa cProfile en esos tramos (incluye lo que el loop
+    # ejecute mientras el lote espera un await); "folded" muestrea la pila del thread del
+    # loop cada PROFILING_SAMPLE_INTERVAL_MS y devuelve pilas plegadas, el formato que
+    # consumen flamegraph.pl, speedscope o py-spy
+    MODES = ("cprofile", "folded")
+
+    def __init__(self, mode: str = "cprofile", interval_seconds: float = PROFILING_SAMPLE_INTERVAL_MS / 1000.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de perfilado no soportado: {mode}")
+        self.mode = mode
+        self.interval_seconds = interval_seconds
+        self.items = 0
+        self.samples = 0
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+        self._stacks: Dict[str, int] = defaultdict(int)
+        self._active_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.mode == "folded":
+            self._sampler = threading.Thread(target=self._sample, name="connection-profiler", daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+            self._sampler = None
+
+    def enter(self) -> None:
+        if self._profile is not None:
+            self._profile.enable()
+        else:
+            self._active_thread = threading.get_ident()
+
+    def exit(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        else:
+            self._active_thread = None
+        self.items += 1
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            thread_id = self._active_thread
+            if thread_id is None:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def report(self, sort: str = "cumulative", limit: int = 40) -> str:
+        if self._profile is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=stream)
+            stats.sort_stats(sort).print_stats(limit)
+            return f"# lotes perfilados: {self.items}\n{stream.getvalue()}"
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self._stacks.items(), key=lambda item: -item[1]))
@@ -0,0 +1,54 @@
+import re
+from typing import Dict, Any, List
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def metric_name(*parts: str) -> str:
+    return _INVALID_CHARS.sub("_", "_".join(part for part in parts if part)).lower()
+
+
+def is_histogram_snapshot(value: Any) -> bool:
+    return isinstance(value, dict) and "buckets" in value and "count" in value and "sum" in value
+
+
+def render_histogram(lines: List[str], name: str, snapshot: Dict[str, Any], labels: str = "") -> None:
+    # Los buckets de Histogram.snapshot() ya son acumulados, como los espera Prometheus
+    separator = "," if labels else ""
+    for bound, count in snapshot["buckets"].items():
+        lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {snapshot['sum']}")
+    lines.append(f"{name}_count{suffix} {snapshot['count']}")
+
+
+def render_metrics(metrics: Dict[str, Any], prefix: str) -> List[str]:
+    # Aplana el JSON de /metrics: numeros y booleanos como gauges, snapshots de
+    # Histogram como histogramas; textos, listas y None se omiten
+    lines: List[str] = []
+    _render(lines, prefix, metrics)
+    return lines
+
+
+def render_labeled_histograms(name: str, label: str, snapshots: Dict[str, Dict[str, Any]]) -> List[str]:
+    lines = [f"# TYPE {name} histogram"]
+    for label_value, snapshot in snapshots.items():
+        render_histogram(lines, name, snapshot, f'{label}="{label_value}"')
+    return lines
+
+
+def _render(lines: List[str], name: str, value: Any) -> None:
+    if isinstance(value, bool):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {int(value)}")
+    elif isinstance(value, (int, float)):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    elif is_histogram_snapshot(value):
+        lines.append(f"# TYPE {name} histogram")
+        render_histogram(lines, name, value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _render(lines, metric_name(name, str(key)), item)
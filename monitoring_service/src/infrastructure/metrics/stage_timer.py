@@ -0,0 +1,52 @@
+import threading
+from typing import Dict, Any
+from src.infrastructure.metrics.histogram import Histogram
+from src.infrastructure.config.settings import STAGE_TIMING_ENABLED
+
+
+class StageTimer:
+    # Un histograma por etapa del camino caliente; observe() es un bisect bajo lock,
+    # sin prints ni objetos nuevos por frame. Los llamadores miden con perf_counter
+    STAGES = (
+        "parse",
+        "queue_wait",
+        "extract",
+        "buffer",
+        "inference",
+        "cooldown",
+        "dispatch",
+        "send",
+        "db_write",
+        "publish",
+        "evaluation"
+    )
+    BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.enabled = STAGE_TIMING_ENABLED
+        self.histograms = {stage: Histogram(f"stage_{stage}_seconds", buckets=self.BUCKETS) for stage in self.STAGES}
+        self._initialized = True
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self.histograms[stage].observe(seconds)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {stage: histogram.snapshot() for stage, histogram in self.histograms.items()}
+
+    def reset(self) -> None:
+        for histogram in self.histograms.values():
+            histogram.reset()
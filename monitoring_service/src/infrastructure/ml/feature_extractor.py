@@ -1,43 +1,127 @@
-from typing import List
+from typing import Any, Dict, List, Sequence, Union
 import numpy as np
 from src.application.dtos.biometric_frame_dto import BiometricFrameDTO
 from src.domain.value_objects.cognitive_state import CognitiveState
 
+EMOTION_NAMES = ["happiness", "neutral", "surprise", "anger", "contempt", "disgust", "fear", "sadness"]
+
+COGNITIVE_STATE_VALUES = {
+    "confundido": CognitiveState.CONFUSED.to_float(),
+    "neutral": CognitiveState.NEUTRAL.to_float(),
+    "entendiendo": CognitiveState.UNDERSTANDING.to_float()
+}
+
+
 class FeatureExtractor:
     PITCH_MAX = 45.0
     YAW_MAX = 45.0
-    
+    NUM_FEATURES = 16
+
+    # Se incluyen las variantes capitalizadas que envia el cliente para
+    # evitar el lower() por emocion en el caso comun
+    EMOTION_INDEX = {
+        **{name: index for index, name in enumerate(EMOTION_NAMES)},
+        **{name.capitalize(): index for index, name in enumerate(EMOTION_NAMES)}
+    }
+
     def extract(self, frame: BiometricFrameDTO) -> np.ndarray:
-        features = np.zeros(16, dtype=np.float32)
-        
-        features[0] = frame.get_emotion_value("happiness")
-        features[1] = frame.get_emotion_value("neutral")
-        features[2] = frame.get_emotion_value("surprise")
-        features[3] = frame.get_emotion_value("anger")
-        features[4] = frame.get_emotion_value("contempt")
-        features[5] = frame.get_emotion_value("disgust")
-        features[6] = frame.get_emotion_value("fear")
-        features[7] = frame.get_emotion_value("sadness")
-        
-        features[8] = 1.0 if frame.atencion.get("mirando_pantalla", False) else 0.0
-        
-        orientacion = frame.atencion.get("orientacion_cabeza", {})
-        pitch = orientacion.get("pitch", 0.0)
-        yaw = orientacion.get("yaw", 0.0)
-        features[9] = np.clip(pitch / self.PITCH_MAX, -1.0, 1.0)
-        features[10] = np.clip(yaw / self.YAW_MAX, -1.0, 1.0)
-        
-        features[11] = 1.0 if frame.somnolencia.get("esta_durmiendo", False) else 0.0
-        features[12] = frame.somnolencia.get("apertura_ojos_ear", 0.3)
-        
-        features[13] = 1.0 if frame.rostro_detectado else 0.0
-        
-        estado = frame.emocion_principal.get("estado_cognitivo", "neutral")
-        features[14] = CognitiveState.from_string(estado).to_float()
-        
-        features[15] = frame.emocion_principal.get("confianza", 0.5)
-        
+        return np.array(self._values(
+            frame.emocion_principal,
+            frame.desglose_emociones,
+            frame.atencion,
+            frame.somnolencia,
+            frame.rostro_detectado
+        ), dtype=np.float32)
+
+    def extract_dict(self, data: Dict[str, Any]) -> np.ndarray:
+        return np.array(self._values_from_dict(data), dtype=np.float32)
+
+    def extract_batch(self, frames: List[Union[Dict[str, Any], BiometricFrameDTO]]) -> np.ndarray:
+        if not frames:
+            return np.empty((0, self.NUM_FEATURES), dtype=np.float32)
+        # Una sola conversion a (N, 16) al final; sin DTOs ni arrays por frame
+        rows = [
+            self._values_from_dict(frame) if isinstance(frame, dict) else self._values(
+                frame.emocion_principal,
+                frame.desglose_emociones,
+                frame.atencion,
+                frame.somnolencia,
+                frame.rostro_detectado
+            )
+            for frame in frames
+        ]
+        return np.array(rows, dtype=np.float32)
+
+    def normalize_raw(self, raw_values: np.ndarray) -> np.ndarray:
+        # Valores crudos del protocolo binario (mismo orden que las features)
+        # a la misma normalizacion que extract(); vectorizado sobre (N, 16)
+        features = np.array(raw_values, dtype=np.float32, ndmin=2)
+        features[:, :8] /= 100.0
+        np.clip(features[:, 9] / self.PITCH_MAX, -1.0, 1.0, out=features[:, 9])
+        np.clip(features[:, 10] / self.YAW_MAX, -1.0, 1.0, out=features[:, 10])
+        features[:, 14] /= 2.0
         return features
 
-    def extract_batch(self, frames: List[BiometricFrameDTO]) -> np.ndarray:
-        return np.array([self.extract(f) for f in frames], dtype=np.float32)
\ No newline at end of file
+    def normalize_raw_row(self, raw_values: Sequence[float]) -> np.ndarray:
+        values = list(raw_values)
+        for index in range(8):
+            values[index] /= 100.0
+        pitch = values[9] / self.PITCH_MAX
+        yaw = values[10] / self.YAW_MAX
+        values[9] = -1.0 if pitch < -1.0 else (1.0 if pitch > 1.0 else pitch)
+        values[10] = -1.0 if yaw < -1.0 else (1.0 if yaw > 1.0 else yaw)
+        values[14] /= 2.0
+        return np.array(values, dtype=np.float32)
+
+    def _values_from_dict(self, data: Dict[str, Any]) -> List[float]:
+        analisis = data.get("analisis_sentimiento", {})
+        biometricos = data.get("datos_biometricos", {})
+        return self._values(
+            analisis.get("emocion_principal", {}),
+            analisis.get("desglose_emociones", []),
+            biometricos.get("atencion", {}),
+            biometricos.get("somnolencia", {}),
+            biometricos.get("rostro_detectado", False)
+        )
+
+    def _values(
+        self,
+        emocion_principal: Dict[str, Any],
+        desglose_emociones: List[Dict[str, Any]],
+        atencion: Dict[str, Any],
+        somnolencia: Dict[str, Any],
+        rostro_detectado: bool
+    ) -> List[float]:
+        values = [0.0] * self.NUM_FEATURES
+        emotion_index = self.EMOTION_INDEX
+
+        # Un solo recorrido del desglose; en orden inverso para que, como
+        # antes, gane la primera aparicion de una emocion repetida
+        for emotion in reversed(desglose_emociones):
+            name = emotion.get("emocion", "")
+            index = emotion_index.get(name)
+            if index is None:
+                index = emotion_index.get(name.lower())
+                if index is None:
+                    continue
+            values[index] = emotion.get("confianza", 0.0) / 100.0
+
+        values[8] = 1.0 if atencion.get("mirando_pantalla", False) else 0.0
+
+        orientacion = atencion.get("orientacion_cabeza", {})
+        pitch = orientacion.get("pitch", 0.0) / self.PITCH_MAX
+        yaw = orientacion.get("yaw", 0.0) / self.YAW_MAX
+        values[9] = -1.0 if pitch < -1.0 else (1.0 if pitch > 1.0 else pitch)
+        values[10] = -1.0 if yaw < -1.0 else (1.0 if yaw > 1.0 else yaw)
+
+        values[11] = 1.0 if somnolencia.get("esta_durmiendo", False) else 0.0
+        values[12] = somnolencia.get("apertura_ojos_ear", 0.3)
+
+        values[13] = 1.0 if rostro_detectado else 0.0
+
+        estado = emocion_principal.get("estado_cognitivo", "neutral")
+        values[14] = COGNITIVE_STATE_VALUES.get(estado, COGNITIVE_STATE_VALUES.get(estado.lower(), COGNITIVE_STATE_VALUES["neutral"]))
+
+        values[15] = emocion_principal.get("confianza", 0.5)
+
+        return values
@@ -0,0 +1,168 @@
+import threading
+from typing import Dict, Type
+import numpy as np
+from src.infrastructure.ml.numpy_gru import NumpyGRUModel
+
+
+class InferenceBackend:
+    name = "base"
+
+    def load(self, model_path: str) -> None:
+        raise NotImplementedError
+
+    def predict_proba(self, sequences: np.ndarray, contexts: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class KerasBackend(InferenceBackend):
+    name = "keras"
+
+    def __init__(self):
+        self._model = None
+
+    def load(self, model_path: str) -> None:
+        from tensorflow import keras
+        self._model = keras.models.load_model(model_path)
+
+    def predict_proba(self, sequences: np.ndarray, contexts: np.ndarray) -> np.ndarray:
+        return np.asarray(self._model([sequences, contexts], training=False))
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    name = "onnxruntime"
+
+    def __init__(self):
+        self._session = None
+        self._sequence_input = None
+        self._context_input = None
+
+    def load(self, model_path: str) -> None:
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+
+        inputs = self._session.get_inputs()
+        self._sequence_input = next((i.name for i in inputs if "sequence" in i.name), inputs[0].name)
+        self._context_input = next((i.name for i in inputs if "context" in i.name), inputs[1].name)
+
+    def predict_proba(self, sequences: np.ndarray, contexts: np.ndarray) -> np.ndarray:
+        outputs = self._session.run(None, {
+            self._sequence_input: sequences.astype(np.float32, copy=False),
+            self._context_input: contexts.astype(np.float32, copy=False)
+        })
+        return outputs[0]
+
+
+class TFLiteBackend(InferenceBackend):
+    name = "tflite"
+
+    def __init__(self):
+        self._interpreter = None
+        self._sequence_input = None
+        self._context_input = None
+        self._output = None
+        self._batch_size = None
+        # El Interpreter no es thread-safe: los hilos del InferenceScheduler comparten una instancia
+        self._lock = threading.Lock()
+
+    def load(self, model_path: str) -> None:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self._interpreter = Interpreter(model_path=model_path)
+
+        inputs = self._interpreter.get_input_details()
+        self._sequence_input = next((i["index"] for i in inputs if "sequence" in i["name"]), inputs[0]["index"])
+        self._context_input = next((i["index"] for i in inputs if "context" in i["name"]), inputs[1]["index"])
+        self._output = self._interpreter.get_output_details()[0]["index"]
+        self._batch_size = None
+
+    def _resize(self, batch_size: int, sequences: np.ndarray, contexts: np.ndarray) -> None:
+        self._interpreter.resize_tensor_input(self._sequence_input, list(sequences.shape))
+        self._interpreter.resize_tensor_input(self._context_input, list(contexts.shape))
+        self._interpreter.allocate_tensors()
+        self._batch_size = batch_size
+
+    def predict_proba(self, sequences: np.ndarray, contexts: np.ndarray) -> np.ndarray:
+        batch_size = len(sequences)
+        with self._lock:
+            if batch_size != self._batch_size:
+                self._resize(batch_size, sequences, contexts)
+
+            self._interpreter.set_tensor(self._sequence_input, sequences.astype(np.float32, copy=False))
+            self._interpreter.set_tensor(self._context_input, contexts.astype(np.float32, copy=False))
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output).copy()
+
+
+class NumpyBackend(InferenceBackend):
+    name = "numpy"
+
+    def __init__(self):
+        self.model: NumpyGRUModel = None
+
+    def load(self, model_path: str) -> None:
+        self.model = NumpyGRUModel.from_file(model_path)
+
+    def predict_proba(self, sequences: np.ndarray, contexts: np.ndarray) -> np.ndarray:
+        return self.model.predict_proba(sequences, contexts)
+
+
+class SyntheticBackend(InferenceBackend):
+    name = "synthetic"
+    NUM_CLASSES = 4
+
+    def load(self, model_path: str) -> None:
+        pass
+
+    def predict_proba(self, sequences: np.ndarray, contexts: np.ndarray) -> np.ndarray:
+        means = sequences.mean(axis=1)
+
+        frustration_score = (means[:, 3] + means[:, 4] + means[:, 5] + means[:, 7]) / 4.0
+        attention_score = (means[:, 8] + means[:, 13] + (1.0 - means[:, 11])) / 3.0
+        drowsiness_score = means[:, 11] + (1.0 - means[:, 12])
+
+        prev_vibrations = contexts[:, 3]
+        prev_instructions = contexts[:, 4]
+
+        conditions = [
+            (frustration_score > 0.4) & (prev_instructions >= 1),
+            ((attention_score < 0.5) | (drowsiness_score > 0.6)) & (prev_vibrations >= 2),
+            frustration_score > 0.35,
+            (attention_score < 0.6) | (drowsiness_score > 0.5)
+        ]
+        classes = np.select(conditions, [3, 3, 2, 1], default=0)
+        confidences = np.select(
+            conditions,
+            [
+                np.minimum(0.7 + frustration_score * 0.2, 0.95),
+                np.minimum(0.65 + (1.0 - attention_score) * 0.2, 0.95),
+                np.minimum(0.6 + frustration_score * 0.3, 0.95),
+                np.minimum(0.6 + (1.0 - attention_score) * 0.3, 0.95)
+            ],
+            default=0.8
+        ).astype(np.float32)
+
+        # La confianza restante se reparte entre las otras clases para
+        # conservar argmax y confianza de las heuristicas originales
+        probabilities = np.repeat(((1.0 - confidences) / (self.NUM_CLASSES - 1))[:, None], self.NUM_CLASSES, axis=1)
+        probabilities[np.arange(len(classes)), classes] = confidences
+        return probabilities
+
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    KerasBackend.name: KerasBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    TFLiteBackend.name: TFLiteBackend,
+    NumpyBackend.name: NumpyBackend,
+    SyntheticBackend.name: SyntheticBackend
+}
+
+
+def create_backend(name: str) -> InferenceBackend:
+    backend_class = BACKENDS.get(name.lower())
+    if backend_class is None:
+        raise ValueError(f"Backend de inferencia no soportado: {name}")
+    return backend_class()
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, List, Tuple, Dict, Any
+import numpy as np
+from src.infrastructure.ml.model_loader import ModelLoader
+from src.infrastructure.metrics.histogram import Histogram
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import (
+    INFERENCE_BATCH_WINDOW_MS,
+    INFERENCE_MAX_BATCH_SIZE,
+    INFERENCE_WORKERS,
+    MODEL_SHADOW_SAMPLE_RATE
+)
+
+logger = get_logger("INFERENCE_SCHEDULER")
+
+
+@dataclass
+class InferenceRequest:
+    sequence: np.ndarray
+    context: np.ndarray
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class InferenceScheduler:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.model_loader = ModelLoader()
+        self.batch_window = INFERENCE_BATCH_WINDOW_MS / 1000.0
+        self.max_batch_size = INFERENCE_MAX_BATCH_SIZE
+        self._executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+        self._pending: List[InferenceRequest] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.batch_size_histogram = Histogram(
+            "inference_batch_size",
+            [1, 2, 4, 8, 16, 32, 64, 128, 256]
+        )
+        self.queue_wait_histogram = Histogram("inference_queue_wait_seconds")
+        self.inference_latency_histogram = Histogram("inference_latency_seconds")
+        self.batches_processed = 0
+        self.batches_failed = 0
+
+        # Shadow: el candidato corre en su propio thread sobre una muestra de ventanas ya
+        # resueltas; nunca retrasa ni cambia la decision del modelo activo
+        self.shadow_sample_rate = MODEL_SHADOW_SAMPLE_RATE
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference-shadow")
+        self._shadow_rng = np.random.default_rng()
+        self._shadow_in_flight = False
+        self._reset_shadow_metrics(None)
+        self._initialized = True
+
+    def _reset_shadow_metrics(self, version: Optional[str]) -> None:
+        # Las metricas de acuerdo son por candidato
+        self.shadow_version = version
+        self.shadow_windows = 0
+        self.shadow_agreements = 0
+        self.shadow_skipped = 0
+        self.shadow_failed = 0
+        self.shadow_confidence_delta = 0.0
+        self.shadow_latency_histogram = Histogram("inference_shadow_latency_seconds")
+
+    async def submit(self, sequence: np.ndarray, context: np.ndarray) -> Tuple[int, float]:
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+
+        future = loop.create_future()
+        self._pending.append(InferenceRequest(
+            sequence=sequence,
+            context=context,
+            future=future,
+            enqueued_at=time.perf_counter()
+        ))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            self._loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[InferenceRequest]) -> None:
+        started_at = time.perf_counter()
+        for request in batch:
+            self.queue_wait_histogram.observe(started_at - request.enqueued_at)
+        self.batch_size_histogram.observe(len(batch))
+
+        try:
+            sequences = np.stack([request.sequence for request in batch]).astype(np.float32, copy=False)
+            contexts = np.stack([request.context for request in batch]).astype(np.float32, copy=False)
+            classes, confidences = await self._loop.run_in_executor(
+                self._executor,
+                self.model_loader.predict_batch,
+                sequences,
+                contexts
+            )
+        except Exception as e:
+            self.batches_failed += 1
+            logger.exception("Error en inferencia por lotes (%s ventanas): %s", len(batch), e)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        self.inference_latency_histogram.observe(time.perf_counter() - started_at)
+        self.batches_processed += 1
+
+        for index, request in enumerate(batch):
+            if not request.future.done():
+                request.future.set_result((int(classes[index]), float(confidences[index])))
+
+        if self.model_loader.candidate_version is not None and self.shadow_sample_rate > 0:
+            self._sample_shadow(sequences, contexts, classes, confidences)
+
+    def _sample_shadow(self, sequences: np.ndarray, contexts: np.ndarray, classes: np.ndarray, confidences: np.ndarray) -> None:
+        if self.model_loader.candidate_version != self.shadow_version:
+            self._reset_shadow_metrics(self.model_loader.candidate_version)
+        selected = np.flatnonzero(self._shadow_rng.random(len(classes)) < self.shadow_sample_rate)
+        if len(selected) == 0:
+            return
+        # Un solo lote shadow en vuelo: si el candidato no da abasto se descarta la muestra
+        if self._shadow_in_flight:
+            self.shadow_skipped += len(selected)
+            return
+        self._shadow_in_flight = True
+        self._loop.create_task(self._run_shadow(sequences[selected], contexts[selected], classes[selected], confidences[selected]))
+
+    async def _run_shadow(self, sequences: np.ndarray, contexts: np.ndarray, classes: np.ndarray, confidences: np.ndarray) -> None:
+        started_at = time.perf_counter()
+        try:
+            result = await self._loop.run_in_executor(
+                self._shadow_executor,
+                self.model_loader.predict_candidate_batch,
+                sequences,
+                contexts
+            )
+            if result is None:
+                return
+            shadow_classes, shadow_confidences = result
+            self.shadow_latency_histogram.observe(time.perf_counter() - started_at)
+            self.shadow_windows += len(classes)
+            self.shadow_agreements += int(np.count_nonzero(shadow_classes == classes))
+            self.shadow_confidence_delta += float(np.sum(np.abs(shadow_confidences - confidences)))
+        except Exception as e:
+            self.shadow_failed += 1
+            logger.exception("Error en inferencia shadow (%s ventanas): %s", len(classes), e)
+        finally:
+            self._shadow_in_flight = False
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "batch_window_ms": self.batch_window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "pending_requests": len(self._pending),
+            "batches_processed": self.batches_processed,
+            "batches_failed": self.batches_failed,
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "queue_wait_seconds": self.queue_wait_histogram.snapshot(),
+            "inference_latency_seconds": self.inference_latency_histogram.snapshot(),
+            "shadow": {
+                "candidate_version": self.shadow_version,
+                "sample_rate": self.shadow_sample_rate,
+                "windows": self.shadow_windows,
+                "agreements": self.shadow_agreements,
+                "agreement_rate": round(self.shadow_agreements / self.shadow_windows, 4) if self.shadow_windows else None,
+                "mean_confidence_delta": round(self.shadow_confidence_delta / self.shadow_windows, 4) if self.shadow_windows else None,
+                "skipped": self.shadow_skipped,
+                "failed": self.shadow_failed,
+                "latency_seconds": self.shadow_latency_histogram.snapshot()
+            }
+        }
+
+    def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._executor.shutdown(wait=False)
+        self._shadow_executor.shutdown(wait=False)
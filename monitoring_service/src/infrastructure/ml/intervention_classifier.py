@@ -1,13 +1,19 @@
-from typing import Tuple, Optional
+from typing import Tuple
 import numpy as np
 from src.infrastructure.ml.model_loader import ModelLoader
-from src.infrastructure.ml.sequence_buffer import SequenceBuffer
-from src.infrastructure.config.settings import CONFIDENCE_THRESHOLD
+from src.infrastructure.ml.inference_scheduler import InferenceScheduler
+from src.infrastructure.ml.numpy_gru import GRUStreamState
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import CONFIDENCE_THRESHOLD, INFERENCE_MODE, STREAMING_RESYNC_INTERVAL
 from src.domain.value_objects.intervention_type import InterventionType
 
+logger = get_logger("CLASSIFIER")
+
+
 class InterventionClassifier:
     def __init__(self):
         self.model_loader = ModelLoader()
+        self.scheduler = InferenceScheduler()
 
     # RENOMBRADO: de classify a predict para coincidir con el caso de uso
     def predict(
@@ -20,10 +26,55 @@ class InterventionClassifier:
             intervention_type = InterventionType.from_prediction(predicted_class)
             return intervention_type, confidence
         except Exception as e:
-            print(f"[CLASSIFIER] [ERROR] Error en prediccion: {e}")
+            logger.exception("Error en prediccion: %s", e)
             # En caso de error, fallar seguro a "no intervención"
             return InterventionType.NO_INTERVENTION, 0.0
 
+    async def predict_async(
+        self,
+        sequence: np.ndarray,
+        context: np.ndarray
+    ) -> Tuple[InterventionType, float]:
+        try:
+            predicted_class, confidence = await self.scheduler.submit(sequence, context)
+            intervention_type = InterventionType.from_prediction(predicted_class)
+            return intervention_type, confidence
+        except Exception as e:
+            logger.exception("Error en prediccion: %s", e)
+            return InterventionType.NO_INTERVENTION, 0.0
+
+    @property
+    def supports_streaming(self) -> bool:
+        return INFERENCE_MODE == "streaming" and self.model_loader.streaming_model is not None
+
+    def advance_stream(self, stream_state: GRUStreamState, features: np.ndarray) -> None:
+        model = self.model_loader.streaming_model
+        if model is not None:
+            model.advance(stream_state, features)
+
+    def predict_stream(
+        self,
+        stream_state: GRUStreamState,
+        sequence: np.ndarray,
+        context: np.ndarray
+    ) -> Tuple[InterventionType, float]:
+        try:
+            model = self.model_loader.streaming_model
+            # El estado acumulado solo es exacto cuando cubre justo la ventana;
+            # se re-sincroniza periodicamente para acotar la deriva, y siempre
+            # tras un hot-swap del modelo
+            if stream_state.model is not model:
+                model.sync(stream_state, sequence)
+            elif stream_state.steps != len(sequence) and stream_state.steps_since_sync >= STREAMING_RESYNC_INTERVAL:
+                model.sync(stream_state, sequence)
+
+            probabilities = model.predict_stream(stream_state, context)
+            predicted_class = int(np.argmax(probabilities))
+            return InterventionType.from_prediction(predicted_class), float(probabilities[predicted_class])
+        except Exception as e:
+            logger.exception("Error en prediccion incremental: %s", e)
+            return InterventionType.NO_INTERVENTION, 0.0
+
     def should_intervene(
         self,
         intervention_type: InterventionType,
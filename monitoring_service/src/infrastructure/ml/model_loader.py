@@ -1,82 +1,219 @@
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Tuple, Dict, Any
 import os
+import threading
+import time
 import numpy as np
-from src.infrastructure.config.settings import MODEL_PATH, SEQUENCE_LENGTH
+from src.infrastructure.ml.inference_backends import InferenceBackend, NumpyBackend, SyntheticBackend, create_backend
+from src.infrastructure.ml.feature_extractor import FeatureExtractor
+from src.infrastructure.ml.model_registry import ModelRegistry
+from src.infrastructure.ml.numpy_gru import NumpyGRUModel
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import (
+    MODEL_PATH,
+    INFERENCE_BACKEND,
+    SEQUENCE_LENGTH,
+    MODEL_REGISTRY_POLL_SECONDS
+)
+
+logger = get_logger("MODEL_LOADER")
+
+
+@dataclass
+class LoadedModel:
+    version: str
+    backend: InferenceBackend
+    path: str
+    loaded_at: float = field(default_factory=time.time)
+
 
 class ModelLoader:
+    # El modelo activo es una sola referencia a LoadedModel: cada lote la lee una vez,
+    # asi que un hot-swap nunca mezcla modelos dentro de un lote
     _instance: Optional["ModelLoader"] = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._model = None
-            cls._instance._is_loaded = False
+            cls._instance._active = None
+            cls._instance._candidate = None
+            cls._instance._synthetic_backend = SyntheticBackend()
+            cls._instance._backend_name = INFERENCE_BACKEND
+            cls._instance.registry = ModelRegistry()
+            cls._instance._failed_versions = set()
+            cls._instance._watcher = None
+            cls._instance._stop_watcher = threading.Event()
+            cls._instance.swaps = 0
+            cls._instance.failed_loads = 0
         return cls._instance
 
     @property
     def is_loaded(self) -> bool:
-        return self._is_loaded
+        return self._active is not None
+
+    @property
+    def backend_name(self) -> str:
+        active = self._active
+        return active.backend.name if active is not None else self._synthetic_backend.name
+
+    @property
+    def version(self) -> Optional[str]:
+        active = self._active
+        return active.version if active is not None else None
+
+    @property
+    def candidate_version(self) -> Optional[str]:
+        candidate = self._candidate
+        return candidate.version if candidate is not None else None
+
+    @property
+    def streaming_model(self) -> Optional[NumpyGRUModel]:
+        active = self._active
+        if active is not None and isinstance(active.backend, NumpyBackend):
+            return active.backend.model
+        return None
 
-    def load(self) -> bool:
+    def load(self, backend_name: str = INFERENCE_BACKEND, model_path: str = MODEL_PATH) -> bool:
+        # False si el backend configurado no es sintetico y su artefacto no se pudo cargar:
+        # servir predicciones sinteticas sin avisar ocultaria un despliegue roto
+        self._backend_name = backend_name
+        self.unload()
         try:
-            if os.path.exists(MODEL_PATH):
-                from tensorflow import keras
-                self._model = keras.models.load_model(MODEL_PATH)
-                self._is_loaded = True
-                print(f"[INFO] Modelo cargado desde {MODEL_PATH}")
+            backend = create_backend(backend_name)
+            if isinstance(backend, SyntheticBackend):
+                logger.info("Backend de inferencia sintetico configurado")
                 return True
-            else:
-                print(f"[WARN] Modelo no encontrado en {MODEL_PATH}, usando modo sintetico")
-                self._is_loaded = False
+
+            if not os.path.exists(model_path):
+                logger.error("Modelo no encontrado en %s (backend=%s)", model_path, backend.name)
                 return False
+            backend.load(model_path)
+            self._active = LoadedModel(os.path.basename(model_path), backend, model_path)
+            logger.info("Modelo cargado desde %s (backend=%s)", model_path, backend.name)
+            return True
         except Exception as e:
-            print(f"[ERROR] Error cargando modelo: {e}")
-            self._is_loaded = False
+            logger.exception("Error cargando modelo: %s", e)
+            return False
+
+    def load_registry(self, backend_name: str = INFERENCE_BACKEND) -> bool:
+        # Carga la version ACTIVE del registro; False si no hay registro o puntero
+        self._backend_name = backend_name
+        if not self.registry.enabled or backend_name == SyntheticBackend.name:
             return False
+        version = self.registry.read_pointer(ModelRegistry.ACTIVE)
+        if version is None:
+            logger.warning("Registro de modelos sin version ACTIVE en %s", self.registry.root)
+            return False
+        loaded = self._load_version(version)
+        if loaded is None:
+            return False
+        self._active = loaded
+        logger.info("Modelo %s cargado desde el registro (backend=%s)", version, loaded.backend.name)
+        return True
+
+    def _load_version(self, version: str) -> Optional[LoadedModel]:
+        # Se carga y valida fuera del camino de inferencia; el modelo anterior sigue sirviendo
+        path = self.registry.artifact_path(version)
+        try:
+            backend = create_backend(self._backend_name)
+            backend.load(path)
+            self._validate(backend)
+            return LoadedModel(version, backend, path)
+        except Exception as e:
+            self.failed_loads += 1
+            self._failed_versions.add(version)
+            logger.error("No se pudo cargar la version %s desde %s: %s", version, path, e)
+            return None
+
+    def _validate(self, backend: InferenceBackend) -> None:
+        probabilities = backend.predict_proba(
+            np.zeros((1, SEQUENCE_LENGTH, FeatureExtractor.NUM_FEATURES), dtype=np.float32),
+            np.zeros((1, 6), dtype=np.float32)
+        )
+        if probabilities.shape != (1, SyntheticBackend.NUM_CLASSES) or not np.all(np.isfinite(probabilities)):
+            raise ValueError(f"Salida invalida del modelo: forma {probabilities.shape}")
+
+    def check_registry(self) -> None:
+        active_version = self.registry.read_pointer(ModelRegistry.ACTIVE)
+        if active_version and active_version != self.version and active_version not in self._failed_versions:
+            loaded = self._load_version(active_version)
+            if loaded is not None:
+                previous = self.version
+                self._active = loaded
+                self.swaps += 1
+                logger.info("Modelo activo cambiado en caliente: %s -> %s", previous, active_version)
+
+        candidate_version = self.registry.read_pointer(ModelRegistry.CANDIDATE)
+        if candidate_version is None:
+            if self._candidate is not None:
+                logger.info("Candidato %s retirado, shadow desactivado", self._candidate.version)
+                self._candidate = None
+        elif candidate_version != self.candidate_version and candidate_version not in self._failed_versions:
+            loaded = self._load_version(candidate_version)
+            if loaded is not None:
+                self._candidate = loaded
+                logger.info("Candidato %s cargado para inferencia shadow", candidate_version)
+
+    def start_watcher(self) -> None:
+        if not self.registry.enabled or self._watcher is not None:
+            return
+        self._stop_watcher.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+        logger.info("Vigilando el registro de modelos %s cada %ss", self.registry.root, MODEL_REGISTRY_POLL_SECONDS)
+
+    def _watch(self) -> None:
+        while not self._stop_watcher.wait(MODEL_REGISTRY_POLL_SECONDS):
+            try:
+                self.check_registry()
+            except Exception as e:
+                logger.exception("Error revisando el registro de modelos: %s", e)
+
+    def stop_watcher(self) -> None:
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            self._stop_watcher.set()
+            watcher.join(timeout=MODEL_REGISTRY_POLL_SECONDS + 1)
 
     def predict(self, sequence: np.ndarray, context: np.ndarray) -> tuple:
-        if self._model is not None and self._is_loaded:
-            sequence_input = np.expand_dims(sequence, axis=0)
-            context_input = np.expand_dims(context, axis=0)
-            predictions = self._model.predict([sequence_input, context_input], verbose=0)
-            predicted_class = int(np.argmax(predictions[0]))
-            confidence = float(predictions[0][predicted_class])
-            return predicted_class, confidence
-        else:
-            return self._synthetic_predict(sequence, context)
-
-    def _synthetic_predict(self, sequence: np.ndarray, context: np.ndarray) -> tuple:
-        avg_anger = np.mean(sequence[:, 3])
-        avg_contempt = np.mean(sequence[:, 4])
-        avg_disgust = np.mean(sequence[:, 5])
-        avg_sadness = np.mean(sequence[:, 7])
-        
-        avg_looking = np.mean(sequence[:, 8])
-        avg_sleeping = np.mean(sequence[:, 11])
-        avg_eye_openness = np.mean(sequence[:, 12])
-        avg_face_detected = np.mean(sequence[:, 13])
-        
-        frustration_score = (avg_anger + avg_contempt + avg_disgust + avg_sadness) / 4.0
-        attention_score = (avg_looking + avg_face_detected + (1.0 - avg_sleeping)) / 3.0
-        drowsiness_score = avg_sleeping + (1.0 - avg_eye_openness)
-        
-        prev_vibrations = context[3]
-        prev_instructions = context[4]
-        
-        if frustration_score > 0.4 and prev_instructions >= 1:
-            return 3, min(0.7 + frustration_score * 0.2, 0.95)
-        
-        if (attention_score < 0.5 or drowsiness_score > 0.6) and prev_vibrations >= 2:
-            return 3, min(0.65 + (1.0 - attention_score) * 0.2, 0.95)
-        
-        if frustration_score > 0.35:
-            return 2, min(0.6 + frustration_score * 0.3, 0.95)
-        
-        if attention_score < 0.6 or drowsiness_score > 0.5:
-            return 1, min(0.6 + (1.0 - attention_score) * 0.3, 0.95)
-        
-        return 0, 0.8
+        classes, confidences = self.predict_batch(
+            np.expand_dims(sequence, axis=0),
+            np.expand_dims(context, axis=0)
+        )
+        return int(classes[0]), float(confidences[0])
+
+    def predict_batch(self, sequences: np.ndarray, contexts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        probabilities = self.predict_proba(sequences, contexts)
+        return self._decide(probabilities)
+
+    def predict_proba(self, sequences: np.ndarray, contexts: np.ndarray) -> np.ndarray:
+        active = self._active
+        backend: InferenceBackend = active.backend if active is not None else self._synthetic_backend
+        return backend.predict_proba(sequences, contexts)
+
+    def predict_candidate_batch(self, sequences: np.ndarray, contexts: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        candidate = self._candidate
+        if candidate is None:
+            return None
+        return self._decide(candidate.backend.predict_proba(sequences, contexts))
+
+    def _decide(self, probabilities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        predicted_classes = np.argmax(probabilities, axis=1)
+        confidences = probabilities[np.arange(len(probabilities)), predicted_classes]
+        return predicted_classes, confidences
+
+    def get_metrics(self) -> Dict[str, Any]:
+        active = self._active
+        return {
+            "backend": self.backend_name,
+            "version": self.version,
+            "loaded_at": active.loaded_at if active is not None else None,
+            "candidate_version": self.candidate_version,
+            "registry": self.registry.root or None,
+            "swaps": self.swaps,
+            "failed_loads": self.failed_loads,
+            "failed_versions": sorted(self._failed_versions)
+        }
 
     def unload(self) -> None:
-        self._model = None
-        self._is_loaded = False
\ No newline at end of file
+        self._active = None
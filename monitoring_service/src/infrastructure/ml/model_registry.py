@@ -0,0 +1,91 @@
+import os
+import shutil
+import sys
+from typing import List, Optional
+from src.infrastructure.config.settings import MODEL_REGISTRY_DIR, MODEL_PATH
+
+
+class ModelRegistry:
+    # Cada version es un directorio inmutable <root>/<version>/<artefacto>; ACTIVE y
+    # CANDIDATE son ficheros de texto con el nombre de la version y se reemplazan con
+    # os.replace, asi que un lector nunca ve un puntero a medio escribir
+    ACTIVE = "ACTIVE"
+    CANDIDATE = "CANDIDATE"
+
+    def __init__(self, root: str = MODEL_REGISTRY_DIR, artifact_name: str = os.path.basename(MODEL_PATH)):
+        self.root = root
+        self.artifact_name = artifact_name
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    def artifact_path(self, version: str) -> str:
+        return os.path.join(self.root, version, self.artifact_name)
+
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            entry for entry in os.listdir(self.root)
+            if os.path.exists(self.artifact_path(entry))
+        )
+
+    def read_pointer(self, pointer: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, pointer)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_pointer(self, pointer: str, version: str) -> None:
+        if not os.path.exists(self.artifact_path(version)):
+            raise ValueError(f"La version {version} no tiene {self.artifact_name}")
+        path = os.path.join(self.root, pointer)
+        with open(path + ".tmp", "w") as f:
+            f.write(version + "\n")
+        os.replace(path + ".tmp", path)
+
+    def clear_pointer(self, pointer: str) -> None:
+        try:
+            os.remove(os.path.join(self.root, pointer))
+        except FileNotFoundError:
+            pass
+
+    def publish(self, version: str, source_path: str) -> str:
+        # Se copia a un directorio temporal y se renombra: la version aparece completa o no aparece
+        target_dir = os.path.join(self.root, version)
+        if os.path.exists(target_dir):
+            raise ValueError(f"La version {version} ya existe; las versiones son inmutables")
+        staging_dir = os.path.join(self.root, f".{version}.tmp")
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+        shutil.copyfile(source_path, os.path.join(staging_dir, self.artifact_name))
+        os.replace(staging_dir, target_dir)
+        return self.artifact_path(version)
+
+
+if __name__ == "__main__":
+    # python -m src.infrastructure.ml.model_registry publish v3 models/intervention_model.onnx
+    # python -m src.infrastructure.ml.model_registry candidate v3 | activate v3 | clear-candidate | list
+    registry = ModelRegistry()
+    if not registry.enabled:
+        sys.exit("MODEL_REGISTRY_DIR no configurado")
+
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("list", [])
+    if command == "publish":
+        print(registry.publish(args[0], args[1]))
+    elif command == "activate":
+        registry.set_pointer(ModelRegistry.ACTIVE, args[0])
+    elif command == "candidate":
+        registry.set_pointer(ModelRegistry.CANDIDATE, args[0])
+    elif command == "clear-candidate":
+        registry.clear_pointer(ModelRegistry.CANDIDATE)
+    elif command == "list":
+        active = registry.read_pointer(ModelRegistry.ACTIVE)
+        candidate = registry.read_pointer(ModelRegistry.CANDIDATE)
+        for version in registry.versions():
+            marks = [name for name, value in (("active", active), ("candidate", candidate)) if value == version]
+            print(f"{version} {' '.join(marks)}".rstrip())
+    else:
+        sys.exit(f"Comando desconocido: {command}")
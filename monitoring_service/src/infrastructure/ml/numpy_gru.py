@@ -0,0 +1,122 @@
+from typing import Tuple
+import numpy as np
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0)
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    shifted = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return shifted / np.sum(shifted, axis=-1, keepdims=True)
+
+
+class GRULayer:
+    # Equivalente a keras.layers.GRU con reset_after=True (default en TF2):
+    # bias[0] se suma a la proyeccion de entrada y bias[1] a la recurrente
+    def __init__(self, kernel: np.ndarray, recurrent_kernel: np.ndarray, bias: np.ndarray):
+        self.units = recurrent_kernel.shape[0]
+        self.kernel = kernel.astype(np.float32)
+        self.recurrent_kernel = recurrent_kernel.astype(np.float32)
+        self.input_bias = bias[0].astype(np.float32)
+        self.recurrent_bias = bias[1].astype(np.float32)
+
+    def project_inputs(self, inputs: np.ndarray) -> np.ndarray:
+        return inputs @ self.kernel + self.input_bias
+
+    def step(self, projected_input: np.ndarray, hidden: np.ndarray) -> np.ndarray:
+        units = self.units
+        recurrent = hidden @ self.recurrent_kernel + self.recurrent_bias
+
+        z = _sigmoid(projected_input[..., :units] + recurrent[..., :units])
+        r = _sigmoid(projected_input[..., units:2 * units] + recurrent[..., units:2 * units])
+        candidate = np.tanh(projected_input[..., 2 * units:] + r * recurrent[..., 2 * units:])
+        return z * hidden + (1.0 - z) * candidate
+
+    def run(self, inputs: np.ndarray, return_sequences: bool = False) -> np.ndarray:
+        batch_size, steps, _ = inputs.shape
+        projected = self.project_inputs(inputs)
+        hidden = np.zeros((batch_size, self.units), dtype=np.float32)
+
+        outputs = np.empty((batch_size, steps, self.units), dtype=np.float32) if return_sequences else None
+        for t in range(steps):
+            hidden = self.step(projected[:, t], hidden)
+            if return_sequences:
+                outputs[:, t] = hidden
+        return outputs if return_sequences else hidden
+
+
+class GRUStreamState:
+    def __init__(self):
+        self.hidden_1 = None
+        self.hidden_2 = None
+        # Modelo que produjo los estados ocultos; tras un hot-swap ya no coincide
+        self.model = None
+        self.steps = 0
+        self.steps_since_sync = 0
+
+    def reset(self) -> None:
+        self.hidden_1 = None
+        self.hidden_2 = None
+        self.model = None
+        self.steps = 0
+        self.steps_since_sync = 0
+
+
+class NumpyGRUModel:
+    def __init__(self, weights: dict):
+        self.gru_1 = GRULayer(weights["gru_1_kernel"], weights["gru_1_recurrent_kernel"], weights["gru_1_bias"])
+        self.gru_2 = GRULayer(weights["gru_2_kernel"], weights["gru_2_recurrent_kernel"], weights["gru_2_bias"])
+        self.context_kernel = weights["context_dense_kernel"].astype(np.float32)
+        self.context_bias = weights["context_dense_bias"].astype(np.float32)
+        self.combined_kernel = weights["combined_dense_kernel"].astype(np.float32)
+        self.combined_bias = weights["combined_dense_bias"].astype(np.float32)
+        self.output_kernel = weights["output_kernel"].astype(np.float32)
+        self.output_bias = weights["output_bias"].astype(np.float32)
+
+    @classmethod
+    def from_file(cls, path: str) -> "NumpyGRUModel":
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def _head(self, sequence_features: np.ndarray, contexts: np.ndarray) -> np.ndarray:
+        context_features = _relu(contexts @ self.context_kernel + self.context_bias)
+        combined = np.concatenate([sequence_features, context_features], axis=-1)
+        combined = _relu(combined @ self.combined_kernel + self.combined_bias)
+        return _softmax(combined @ self.output_kernel + self.output_bias)
+
+    def window_state(self, sequences: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        hidden_sequence = self.gru_1.run(sequences, return_sequences=True)
+        return hidden_sequence[:, -1], self.gru_2.run(hidden_sequence)
+
+    def predict_proba(self, sequences: np.ndarray, contexts: np.ndarray) -> np.ndarray:
+        _, hidden_2 = self.window_state(sequences.astype(np.float32, copy=False))
+        return self._head(hidden_2, contexts.astype(np.float32, copy=False))
+
+    def advance(self, state: GRUStreamState, features: np.ndarray) -> None:
+        if state.hidden_1 is None or state.model is not self:
+            # Estados de otro modelo no sirven (ni tienen por que tener el mismo tamano); se
+            # conserva state.model para que predict_stream fuerce un sync con la ventana
+            state.hidden_1 = np.zeros(self.gru_1.units, dtype=np.float32)
+            state.hidden_2 = np.zeros(self.gru_2.units, dtype=np.float32)
+            if state.model is None:
+                state.model = self
+
+        state.hidden_1 = self.gru_1.step(self.gru_1.project_inputs(features), state.hidden_1)
+        state.hidden_2 = self.gru_2.step(self.gru_2.project_inputs(state.hidden_1), state.hidden_2)
+        state.steps += 1
+        state.steps_since_sync += 1
+
+    def sync(self, state: GRUStreamState, sequence: np.ndarray) -> None:
+        hidden_1, hidden_2 = self.window_state(sequence[None].astype(np.float32, copy=False))
+        state.hidden_1 = hidden_1[0]
+        state.hidden_2 = hidden_2[0]
+        state.model = self
+        state.steps_since_sync = 0
+
+    def predict_stream(self, state: GRUStreamState, context: np.ndarray) -> np.ndarray:
+        return self._head(state.hidden_2[None], context[None].astype(np.float32, copy=False))[0]
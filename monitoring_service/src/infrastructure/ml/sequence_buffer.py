@@ -4,33 +4,67 @@ import numpy as np
 from src.infrastructure.config.settings import SEQUENCE_LENGTH
 
 class SequenceBuffer:
-    def __init__(self, max_length: int = SEQUENCE_LENGTH):
+    NUM_FEATURES = 16
+
+    def __init__(self, max_length: int = SEQUENCE_LENGTH, keep_raw_frames: bool = False):
         self.max_length = max_length
-        self.buffer: deque = deque(maxlen=max_length)
-        self.raw_frames: deque = deque(maxlen=max_length)
+        # Buffer circular espejado: cada frame se escribe en i y en i + max_length,
+        # asi la ventana de los ultimos max_length frames siempre es una vista contigua
+        self._data = np.zeros((2 * max_length, self.NUM_FEATURES), dtype=np.float32)
+        self._index = 0
+        self._count = 0
+        self.keep_raw_frames = keep_raw_frames
+        self._raw_frames: Optional[deque] = deque(maxlen=max_length) if keep_raw_frames else None
+
+    def add(self, features: np.ndarray, raw_frame: Optional[Any] = None) -> None:
+        index = self._index
+        self._data[index] = features
+        self._data[index + self.max_length] = features
+        self._index = (index + 1) % self.max_length
+        if self._count < self.max_length:
+            self._count += 1
 
-    def add(self, features: np.ndarray, raw_frame: Dict[str, Any]) -> None:
-        self.buffer.append(features)
-        self.raw_frames.append(raw_frame)
+        # Se guarda el objeto tal cual; se serializa solo si se pide el snapshot
+        if self._raw_frames is not None and raw_frame is not None:
+            self._raw_frames.append(raw_frame)
 
     def is_ready(self) -> bool:
-        return len(self.buffer) >= self.max_length
+        return self._count >= self.max_length
 
-    def get_sequence(self) -> Optional[np.ndarray]:
+    def _tail(self, count: int) -> np.ndarray:
+        end = self._index + self.max_length
+        return self._data[end - count:end]
+
+    def get_sequence(self, copy: bool = False) -> Optional[np.ndarray]:
+        # La vista es valida hasta el siguiente add(); quien la guarde para
+        # despues debe pedir copy=True
         if not self.is_ready():
             return None
-        return np.array(list(self.buffer), dtype=np.float32)
+        window = self._tail(self.max_length)
+        return window.copy() if copy else window
 
     def get_snapshot(self) -> List[Dict[str, Any]]:
-        return list(self.raw_frames)
+        if self._raw_frames is None:
+            return []
+        return [frame.to_dict() if hasattr(frame, "to_dict") else frame for frame in self._raw_frames]
+
+    def copy(self) -> "SequenceBuffer":
+        snapshot = SequenceBuffer(self.max_length, keep_raw_frames=self.keep_raw_frames)
+        snapshot._data[:] = self._data
+        snapshot._index = self._index
+        snapshot._count = self._count
+        if self._raw_frames is not None:
+            snapshot._raw_frames.extend(self._raw_frames)
+        return snapshot
 
     def clear(self) -> None:
-        self.buffer.clear()
-        self.raw_frames.clear()
+        self._index = 0
+        self._count = 0
+        if self._raw_frames is not None:
+            self._raw_frames.clear()
 
-    def get_recent_frames(self, count: int) -> List[np.ndarray]:
-        frames = list(self.buffer)
-        return frames[-count:] if len(frames) >= count else frames
+    def get_recent_frames(self, count: int) -> np.ndarray:
+        return self._tail(min(count, self._count))
 
     def __len__(self) -> int:
-        return len(self.buffer)
\ No newline at end of file
+        return self._count
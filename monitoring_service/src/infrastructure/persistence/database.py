@@ -2,7 +2,9 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from src.infrastructure.config.settings import DATABASE_URL
 
-engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+# SQLite (benchmarks) se usa desde los workers de persistencia, no solo desde el thread que conecta
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
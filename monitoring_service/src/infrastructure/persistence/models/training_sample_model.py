@@ -1,16 +1,22 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, JSON, ForeignKey, LargeBinary, Index
 from sqlalchemy.dialects.mysql import CHAR
 from datetime import datetime
 import uuid
 from src.infrastructure.persistence.database import Base
 
+# window_blob guarda la ventana como float32 little-endian en orden C: SEQUENCE_LENGTH x WINDOW_FEATURES
+WINDOW_FEATURES = 16
+
 class TrainingSampleModel(Base):
     __tablename__ = "training_samples"
+    # El exportador pagina por id dentro de (source, used_in_training)
+    __table_args__ = (Index("idx_source_unused_id", "source", "used_in_training", "id"),)
 
     id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     intervention_id = Column(CHAR(36), ForeignKey("interventions.id"), nullable=True)
     external_activity_id = Column(String(50), nullable=False)
-    window_data = Column(JSON, nullable=False)
+    window_data = Column(JSON, nullable=True)  # Formato anterior; las filas nuevas usan window_blob
+    window_blob = Column(LargeBinary, nullable=True)
     context_data = Column(JSON, nullable=False)
     label = Column(String(50), nullable=False)  # CAMBIADO de Integer a String
     source = Column(String(20), nullable=False)
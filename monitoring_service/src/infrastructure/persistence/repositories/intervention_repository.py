@@ -48,6 +48,19 @@ class InterventionRepository:
         ).all()
         return [self._to_domain(i) for i in db_interventions]
 
+    def expire_pending(self, before: datetime, evaluated_at: datetime) -> int:
+        # Cierra en un UPDATE las pendientes que ya nadie va a evaluar; una evaluacion
+        # que llegue despues sobrescribe el resultado
+        expired = self.db.query(InterventionModel).filter(
+            InterventionModel.result == "pending",
+            InterventionModel.triggered_at < before
+        ).update({
+            InterventionModel.result: "expired",
+            InterventionModel.result_evaluated_at: evaluated_at
+        }, synchronize_session=False)
+        self.db.commit()
+        return expired
+
     def update(self, intervention: Intervention) -> Intervention:
         db_intervention = self.db.query(InterventionModel).filter(
             InterventionModel.id == str(intervention.id)
@@ -60,6 +73,19 @@ class InterventionRepository:
             return self._to_domain(db_intervention)
         return intervention
 
+    def update_results(self, interventions: List[Intervention]) -> None:
+        if not interventions:
+            return
+        self.db.bulk_update_mappings(InterventionModel, [
+            {
+                "id": str(intervention.id),
+                "result": intervention.result,
+                "result_evaluated_at": intervention.evaluated_at
+            }
+            for intervention in interventions
+        ])
+        self.db.commit()
+
     @staticmethod
     def _to_domain(db_intervention: InterventionModel) -> Intervention:
         return Intervention(
@@ -1,30 +1,30 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session as DBSession
 import uuid
+import numpy as np
 from src.domain.entities.training_sample import TrainingSample
-from src.infrastructure.persistence.models.training_sample_model import TrainingSampleModel
+from src.infrastructure.persistence.models.training_sample_model import TrainingSampleModel, WINDOW_FEATURES
 
 class TrainingSampleRepository:
     def __init__(self, db: DBSession):
         self.db = db
 
     def create(self, sample: TrainingSample) -> TrainingSample:
-        db_sample = TrainingSampleModel(
-            id=str(sample.id),
-            intervention_id=str(sample.intervention_id) if sample.intervention_id else None,
-            external_activity_id=str(sample.external_activity_id),
-            window_data=sample.window_data,
-            context_data=sample.context_data,
-            label=sample.label,
-            source=sample.source,
-            created_at=sample.created_at,
-            used_in_training=sample.used_in_training
-        )
+        db_sample = TrainingSampleModel(**self._to_row(sample))
         self.db.add(db_sample)
         self.db.commit()
         self.db.refresh(db_sample)
         return self._to_domain(db_sample)
 
+    def create_many(self, samples: List[TrainingSample]) -> int:
+        # Un INSERT con executemany y un solo commit; sin refresh por fila
+        if not samples:
+            return 0
+        self.db.execute(insert(TrainingSampleModel), [self._to_row(sample) for sample in samples])
+        self.db.commit()
+        return len(samples)
+
     def get_for_training(self, source: str, limit: int = 1000) -> List[TrainingSample]:
         db_samples = self.db.query(TrainingSampleModel).filter(
             TrainingSampleModel.source == source,
@@ -32,6 +32,29 @@ class TrainingSampleRepository:
         ).limit(limit).all()
         return [self._to_domain(s) for s in db_samples]
 
+    def count_for_training(self, source: str) -> int:
+        return self.db.query(TrainingSampleModel.id).filter(
+            TrainingSampleModel.source == source,
+            TrainingSampleModel.used_in_training == False
+        ).count()
+
+    def get_training_page(self, source: str, after_id: Optional[str], limit: int) -> List[Any]:
+        # Paginacion por clave: cada pagina es un range scan sobre el indice desde after_id,
+        # sin OFFSET y sin materializar entidades
+        query = self.db.query(
+            TrainingSampleModel.id,
+            TrainingSampleModel.window_blob,
+            TrainingSampleModel.window_data,
+            TrainingSampleModel.context_data,
+            TrainingSampleModel.label
+        ).filter(
+            TrainingSampleModel.source == source,
+            TrainingSampleModel.used_in_training == False
+        )
+        if after_id is not None:
+            query = query.filter(TrainingSampleModel.id > after_id)
+        return query.order_by(TrainingSampleModel.id).limit(limit).all()
+
     def mark_as_used(self, sample_ids: List[str]) -> None:
         self.db.query(TrainingSampleModel).filter(
             TrainingSampleModel.id.in_(sample_ids)
@@ -50,13 +73,50 @@ class TrainingSampleRepository:
         ).update({"label": new_label}, synchronize_session=False)
         self.db.commit()
 
+    def update_labels_by_intervention(self, labels: Dict[str, str]) -> None:
+        # Un UPDATE por label distinto en lugar de uno por intervencion
+        intervention_ids_by_label: Dict[str, List[str]] = {}
+        for intervention_id, label in labels.items():
+            intervention_ids_by_label.setdefault(label, []).append(intervention_id)
+
+        for label, intervention_ids in intervention_ids_by_label.items():
+            self.db.query(TrainingSampleModel).filter(
+                TrainingSampleModel.intervention_id.in_(intervention_ids)
+            ).update({"label": label}, synchronize_session=False)
+        self.db.commit()
+
     @staticmethod
-    def _to_domain(db_sample: TrainingSampleModel) -> TrainingSample:
+    def encode_window(window) -> bytes:
+        return np.ascontiguousarray(window, dtype="<f4").tobytes()
+
+    @staticmethod
+    def decode_window(blob: bytes) -> np.ndarray:
+        return np.frombuffer(blob, dtype="<f4").reshape(-1, WINDOW_FEATURES)
+
+    @classmethod
+    def _to_row(cls, sample: TrainingSample) -> Dict[str, Any]:
+        return {
+            "id": str(sample.id),
+            "intervention_id": str(sample.intervention_id) if sample.intervention_id else None,
+            "external_activity_id": str(sample.external_activity_id),
+            "window_data": None,
+            "window_blob": cls.encode_window(sample.window_data),
+            "context_data": np.asarray(sample.context_data, dtype=np.float32).tolist(),
+            "label": sample.label,
+            "source": sample.source,
+            "created_at": sample.created_at,
+            "used_in_training": sample.used_in_training
+        }
+
+    @classmethod
+    def _to_domain(cls, db_sample: TrainingSampleModel) -> TrainingSample:
+        # Las filas anteriores a window_blob siguen leyendose desde el JSON
+        window_data = cls.decode_window(db_sample.window_blob) if db_sample.window_blob is not None else db_sample.window_data
         return TrainingSample(
             id=uuid.UUID(db_sample.id),
             intervention_id=uuid.UUID(db_sample.intervention_id) if db_sample.intervention_id else None,
             external_activity_id=int(db_sample.external_activity_id),
-            window_data=db_sample.window_data,
+            window_data=window_data,
             context_data=db_sample.context_data,
             label=str(db_sample.label), # Asegurar string
             source=db_sample.source,
@@ -0,0 +1,41 @@
+import bisect
+import hashlib
+from typing import List, Optional
+
+
+class HashRing:
+    # Hash consistente con nodos virtuales: una clave siempre cae en el mismo nodo y
+    # anadir o quitar un nodo solo mueve las claves de ese nodo (~1/N del total)
+    def __init__(self, nodes: List[str], replicas: int = 512):
+        self.nodes = list(dict.fromkeys(nodes))
+        self.replicas = replicas
+        points = sorted(
+            (self._hash(f"{node}#{replica}"), node)
+            for node in self.nodes
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def get_node(self, key: str) -> str:
+        return self.get_nodes(key, 1)[0]
+
+    def get_nodes(self, key: str, count: Optional[int] = None) -> List[str]:
+        # Nodos distintos en el orden del anillo: el primero es el dueno de la clave y
+        # los siguientes el orden de failover
+        if not self._owners:
+            raise ValueError("El anillo no tiene nodos")
+        count = len(self.nodes) if count is None else min(count, len(self.nodes))
+        start = bisect.bisect(self._hashes, self._hash(key))
+        nodes: List[str] = []
+        for offset in range(len(self._owners)):
+            node = self._owners[(start + offset) % len(self._owners)]
+            if node not in nodes:
+                nodes.append(node)
+                if len(nodes) == count:
+                    break
+        return nodes
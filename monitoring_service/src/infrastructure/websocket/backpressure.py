@@ -0,0 +1,96 @@
+import json
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, Any, Optional
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import (
+    BACKPRESSURE_MAX_FRAMES_PER_SECOND,
+    BACKPRESSURE_BURST,
+    BACKPRESSURE_MAX_QUEUE_SIZE,
+    BACKPRESSURE_THROTTLE_THRESHOLD,
+    BACKPRESSURE_THROTTLE_SECONDS,
+    BACKPRESSURE_POLICIES
+)
+
+logger = get_logger("BACKPRESSURE")
+
+
+@dataclass(frozen=True)
+class BackpressurePolicy:
+    max_frames_per_second: float = BACKPRESSURE_MAX_FRAMES_PER_SECOND
+    burst: float = BACKPRESSURE_BURST
+    max_queue_size: int = BACKPRESSURE_MAX_QUEUE_SIZE
+    throttle_threshold: int = BACKPRESSURE_THROTTLE_THRESHOLD
+    throttle_duration_seconds: float = BACKPRESSURE_THROTTLE_SECONDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_buffer_size": self.max_queue_size,
+            "max_frames_per_second": self.max_frames_per_second,
+            "burst": self.burst,
+            "throttle_threshold": self.throttle_threshold,
+            "throttle_duration_seconds": self.throttle_duration_seconds
+        }
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def consume(self, count: int = 1, now: Optional[float] = None) -> int:
+        # Devuelve cuantos de los frames pedidos caben; O(1) por llamada
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+        granted = min(count, int(self.tokens))
+        self.tokens -= granted
+        return granted
+
+
+class BackpressurePolicyRegistry:
+    # BACKPRESSURE_POLICIES es un JSON {"<company_id>": {...}, "<company_id>:<application_id>": {...}};
+    # la clave mas especifica gana y los campos ausentes usan los defaults
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.default_policy = BackpressurePolicy()
+        self._policies: Dict[str, BackpressurePolicy] = self._parse(BACKPRESSURE_POLICIES)
+        self._initialized = True
+
+    def _parse(self, raw: str) -> Dict[str, BackpressurePolicy]:
+        if not raw:
+            return {}
+        try:
+            overrides = json.loads(raw)
+            return {
+                str(key): replace(self.default_policy, **values)
+                for key, values in overrides.items()
+            }
+        except (ValueError, TypeError) as e:
+            logger.error("BACKPRESSURE_POLICIES invalido, se usan los defaults: %s", e)
+            return {}
+
+    def resolve(self, company_id: Optional[str] = None, application_id: Optional[str] = None) -> BackpressurePolicy:
+        if company_id is not None and application_id is not None:
+            policy = self._policies.get(f"{company_id}:{application_id}")
+            if policy is not None:
+                return policy
+        if company_id is not None:
+            policy = self._policies.get(str(company_id))
+            if policy is not None:
+                return policy
+        return self.default_policy
@@ -0,0 +1,66 @@
+from typing import Tuple
+import math
+import struct
+import numpy as np
+
+# Layout fijo little-endian por frame (72 bytes): timestamp en ms epoch (float64)
+# seguido de los 16 valores crudos en float32, en el orden del FeatureExtractor:
+#   0-7  confianza de cada emocion (0-100): happiness, neutral, surprise, anger,
+#        contempt, disgust, fear, sadness
+#   8    mirando_pantalla (0/1)
+#   9    pitch (grados)
+#   10   yaw (grados)
+#   11   esta_durmiendo (0/1)
+#   12   apertura_ojos_ear
+#   13   rostro_detectado (0/1)
+#   14   estado_cognitivo (0=confundido, 1=neutral, 2=entendiendo)
+#   15   confianza de la emocion principal (0-1)
+BINARY_ENCODING = "binary"
+JSON_ENCODING = "json"
+SUPPORTED_ENCODINGS = (JSON_ENCODING, BINARY_ENCODING)
+
+NUM_VALUES = 16
+FRAME_FORMAT = "<d16f"
+FRAME_DTYPE = np.dtype([("timestamp", "<f8"), ("values", "<f4", (NUM_VALUES,))])
+FRAME_SIZE = FRAME_DTYPE.itemsize
+FRAME_STRUCT = struct.Struct(FRAME_FORMAT)
+
+
+def decode_frame(data: bytes) -> Tuple[float, Tuple[float, ...]]:
+    # Camino de un solo frame: struct evita el coste fijo de NumPy por llamada
+    if len(data) != FRAME_SIZE:
+        raise ValueError(f"Tamano de frame binario invalido: {len(data)} bytes ({FRAME_SIZE} esperado)")
+
+    unpacked = FRAME_STRUCT.unpack(data)
+    values = unpacked[1:]
+    if not all(map(math.isfinite, values)):
+        raise ValueError("El frame binario contiene valores no finitos")
+    return unpacked[0], values
+
+
+def decode_frames(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    if not data or len(data) % FRAME_SIZE != 0:
+        raise ValueError(f"Tamano de mensaje binario invalido: {len(data)} bytes (multiplo de {FRAME_SIZE} esperado)")
+
+    records = np.frombuffer(data, dtype=FRAME_DTYPE)
+    values = records["values"]
+    if not np.isfinite(values).all():
+        raise ValueError("El frame binario contiene valores no finitos")
+    return records["timestamp"], values
+
+
+def encode_frames(timestamps: np.ndarray, values: np.ndarray) -> bytes:
+    values = np.asarray(values, dtype=np.float32).reshape(-1, NUM_VALUES)
+    records = np.empty(len(values), dtype=FRAME_DTYPE)
+    records["timestamp"] = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+    records["values"] = values
+    return records.tobytes()
+
+
+def layout_description() -> dict:
+    return {
+        "format": FRAME_FORMAT,
+        "frame_size": FRAME_SIZE,
+        "timestamp": "ms epoch float64",
+        "values": NUM_VALUES
+    }
@@ -1,12 +1,23 @@
 import json
+import logging
+import time
 import asyncio
-from typing import Dict, Optional, List
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from collections import deque
+from typing import Any, Deque, Dict, Optional, List, Set
+from dataclasses import dataclass
 from fastapi import WebSocket
 from src.infrastructure.ml.sequence_buffer import SequenceBuffer
+from src.infrastructure.ml.numpy_gru import GRUStreamState
 from src.domain.services.intervention_controller import SessionContext
 from src.infrastructure.cache.redis_client import RedisClient
+from src.infrastructure.cache.cooldown_cache import CooldownStateCache
+from src.infrastructure.workers.evaluation_scheduler import InterventionEvaluationScheduler
+from src.infrastructure.websocket.backpressure import BackpressurePolicy, BackpressurePolicyRegistry, TokenBucket
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import REGISTRY_HEARTBEAT_SECONDS
+
+logger = get_logger("CONNECTION_MANAGER")
+backpressure_logger = get_logger("BACKPRESSURE")
 
 
 @dataclass
@@ -22,36 +33,69 @@ class BackpressureMetrics:
     frames_processed: int = 0
     frames_dropped: int = 0
     throttle_events: int = 0
-    last_throttle_at: Optional[datetime] = None
+    last_throttle_at: Optional[float] = None
     is_throttled: bool = False
-    throttle_until: Optional[datetime] = None
+    throttle_until: Optional[float] = None
 
 
-class ConnectionState:
-    MAX_BUFFER_SIZE = 300
-    THROTTLE_THRESHOLD = 250
-    THROTTLE_DURATION_SECONDS = 2
-    MAX_FRAMES_PER_SECOND = 60
+@dataclass
+class QueuedFrames:
+    kind: str
+    payload: Any
+    count: int
+    correlation_id: str
+    received: int = 0
+    backpressure: Optional[Dict[str, Any]] = None
+    enqueued_at: float = 0.0
+
 
+class ConnectionState:
     def __init__(self, websocket: WebSocket, session_id: str, activity_uuid: str):
         self.websocket = websocket
         self.session_id = session_id
         self.activity_uuid = activity_uuid
         self.buffer = SequenceBuffer()
+        self.stream_state = GRUStreamState()
         self.context = SessionContext()
         self.metadata: Optional[ActivityMetadata] = None
         self.is_ready = False
+        self.encoding = "json"
+        self.pipeline = None
+        # ConnectionProfiler activo mientras dura una sesion de /debug/profile
+        self.profiler = None
         self._redis_client: Optional[RedisClient] = None
-        
-        self._frame_buffer: List[Dict] = []
+        self._context_loaded: Optional[asyncio.Future] = None
+
+        # Cola acotada de mensajes pendientes; la drena el consumidor de la conexion
+        self._frame_queue: Deque[QueuedFrames] = deque()
+        self._queued_frames = 0
+        self._queue_ready = asyncio.Event()
+        self._send_lock = asyncio.Lock()
         self._backpressure = BackpressureMetrics()
-        self._frame_timestamps: List[datetime] = []
-        self._last_frame_time: Optional[datetime] = None
+        self._last_frame_time: Optional[float] = None
+        self.apply_policy(BackpressurePolicyRegistry().default_policy)
 
     def set_redis_client(self, redis_client: RedisClient) -> None:
         self._redis_client = redis_client
-        self.context.set_redis_client(redis_client, self.session_id, self.activity_uuid)
-        self.context.load_from_redis()
+        cooldown_cache = CooldownStateCache()
+        self.context.set_state_store(cooldown_cache, self.session_id, self.activity_uuid)
+        # El cooldown se lee mientras llega el handshake, que es quien lo espera
+        self._context_loaded = asyncio.ensure_future(self._load_context(cooldown_cache))
+
+    async def _load_context(self, cooldown_cache: CooldownStateCache) -> None:
+        self.context.restore_state(await cooldown_cache.load(self.session_id, self.activity_uuid))
+
+    async def wait_context_loaded(self) -> None:
+        if self._context_loaded is not None:
+            await self._context_loaded
+
+    def persist_context(self) -> None:
+        # Al desconectar se escribe sin esperar al flush; si la lectura no termino no hay
+        # nada propio que guardar y se pisaria el estado de Redis con uno vacio
+        if self._context_loaded is not None and not self._context_loaded.done():
+            self._context_loaded.cancel()
+        elif self.is_ready:
+            self.context.save_to_redis(flush=True)
 
     def set_metadata(self, user_id: int, external_activity_id: int, company_id: Optional[str] = None) -> None:
         self.metadata = ActivityMetadata(
@@ -62,75 +106,81 @@ class ConnectionState:
         self.is_ready = True
         self.context.reset_for_activity(external_activity_id)
 
-    def can_accept_frame(self) -> bool:
-        now = datetime.utcnow()
-        
-        if self._backpressure.is_throttled:
-            if self._backpressure.throttle_until and now >= self._backpressure.throttle_until:
-                self._backpressure.is_throttled = False
-                self._backpressure.throttle_until = None
-                print(f"[BACKPRESSURE] [INFO] Throttle terminado para actividad: {self.activity_uuid}")
-            else:
-                return False
-
-        if len(self._frame_buffer) >= self.MAX_BUFFER_SIZE:
-            self._backpressure.frames_dropped += 1
-            self._track_dropped_frame()
-            return False
-
-        cutoff_time = datetime.utcnow()
-        self._frame_timestamps = [
-            ts for ts in self._frame_timestamps 
-            if (cutoff_time - ts).total_seconds() < 1.0
-        ]
-
-        if len(self._frame_timestamps) >= self.MAX_FRAMES_PER_SECOND:
-            self._backpressure.frames_dropped += 1
-            self._track_dropped_frame()
-            return False
-
-        if len(self._frame_buffer) >= self.THROTTLE_THRESHOLD:
-            self._activate_throttle()
-            return False
-
-        return True
+    def apply_policy(self, policy: BackpressurePolicy) -> None:
+        self.policy = policy
+        self._token_bucket = TokenBucket(policy.max_frames_per_second, policy.burst)
 
-    def add_frame_to_buffer(self, frame: Dict) -> bool:
-        if not self.can_accept_frame():
-            return False
-
-        self._frame_buffer.append(frame)
-        self._frame_timestamps.append(datetime.utcnow())
-        self._backpressure.frames_received += 1
-        self._last_frame_time = datetime.utcnow()
-        return True
-
-    def get_next_frame(self) -> Optional[Dict]:
-        if self._frame_buffer:
-            frame = self._frame_buffer.pop(0)
-            self._backpressure.frames_processed += 1
-            return frame
-        return None
+    @property
+    def is_throttled(self) -> bool:
+        return self._backpressure.is_throttled
+
+    def admit_frames(self, count: int = 1) -> int:
+        # Decide cuantos frames de un mensaje entran en la cola; O(1) sin listas de timestamps
+        now = time.monotonic()
+        backpressure = self._backpressure
+
+        if backpressure.is_throttled:
+            if now >= backpressure.throttle_until:
+                backpressure.is_throttled = False
+                backpressure.throttle_until = None
+                backpressure_logger.info("Throttle terminado para actividad: %s", self.activity_uuid)
+            else:
+                self._drop_frames(count)
+                return 0
+
+        if self._queued_frames >= self.policy.throttle_threshold:
+            self._activate_throttle(now)
+            self._drop_frames(count)
+            return 0
+
+        space = max(self.policy.max_queue_size - self._queued_frames, 0)
+        admitted = self._token_bucket.consume(min(count, space), now)
+        if admitted < count:
+            self._drop_frames(count - admitted)
+        if admitted:
+            backpressure.frames_received += admitted
+            self._last_frame_time = now
+        return admitted
+
+    def enqueue_frames(self, item: QueuedFrames) -> None:
+        item.enqueued_at = time.monotonic()
+        self._frame_queue.append(item)
+        self._queued_frames += item.count
+        self._queue_ready.set()
+
+    async def next_frames(self) -> QueuedFrames:
+        while not self._frame_queue:
+            self._queue_ready.clear()
+            await self._queue_ready.wait()
+        item = self._frame_queue.popleft()
+        self._queued_frames -= item.count
+        return item
+
+    def mark_processed(self, count: int) -> None:
+        self._backpressure.frames_processed += count
 
     def get_buffer_size(self) -> int:
-        return len(self._frame_buffer)
+        return self._queued_frames
 
     def get_buffer_utilization(self) -> float:
-        return len(self._frame_buffer) / self.MAX_BUFFER_SIZE
+        return self._queued_frames / self.policy.max_queue_size
 
-    def _activate_throttle(self) -> None:
-        now = datetime.utcnow()
+    def _drop_frames(self, count: int) -> None:
+        self._backpressure.frames_dropped += count
+        self._track_dropped_frame(count)
+
+    def _activate_throttle(self, now: float) -> None:
         self._backpressure.is_throttled = True
         self._backpressure.throttle_events += 1
         self._backpressure.last_throttle_at = now
-        self._backpressure.throttle_until = now + timedelta(seconds=self.THROTTLE_DURATION_SECONDS)
-        
-        print(f"[BACKPRESSURE] [WARNING] Throttle activado para actividad: {self.activity_uuid}, buffer: {len(self._frame_buffer)}")
+        self._backpressure.throttle_until = now + self.policy.throttle_duration_seconds
+
+        backpressure_logger.warning("Throttle activado para actividad: %s, cola: %s", self.activity_uuid, self._queued_frames)
         self._track_throttle_event()
 
-    def _track_dropped_frame(self) -> None:
+    def _track_dropped_frame(self, count: int = 1) -> None:
         if self._redis_client:
-            self._redis_client.track_websocket_metric("dropped", self.activity_uuid)
+            self._redis_client.track_websocket_metric("dropped", self.activity_uuid, count)
 
     def _track_throttle_event(self) -> None:
         if self._redis_client:
@@ -143,7 +193,7 @@ class ConnectionState:
             "frames_dropped": self._backpressure.frames_dropped,
             "throttle_events": self._backpressure.throttle_events,
             "is_throttled": self._backpressure.is_throttled,
-            "buffer_size": len(self._frame_buffer),
+            "buffer_size": self._queued_frames,
             "buffer_utilization": self.get_buffer_utilization()
         }
 
@@ -152,19 +202,24 @@ class ConnectionState:
             "type": "throttle",
             "status": "active",
             "reason": "rate_limit_exceeded",
-            "retry_after_seconds": self.THROTTLE_DURATION_SECONDS,
-            "buffer_size": len(self._frame_buffer),
-            "max_buffer_size": self.MAX_BUFFER_SIZE
+            "retry_after_seconds": self.policy.throttle_duration_seconds,
+            "buffer_size": self._queued_frames,
+            "max_buffer_size": self.policy.max_queue_size
         }
 
+    async def send_json(self, message: Dict) -> None:
+        # El consumidor de frames y los consumidores de RabbitMQ escriben en el mismo socket
+        async with self._send_lock:
+            await self.websocket.send_text(json.dumps(message))
+
     async def send_personal_message(self, message: Dict, activity_uuid: str):
         try:
-            text_message = json.dumps(message)
-            print(f"[CONNECTION_STATE] [DEBUG] Enviando mensaje con keys: {list(message.keys())}")
-            await self.websocket.send_text(text_message)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Enviando mensaje con keys: %s", list(message.keys()))
+            await self.send_json(message)
             return True
         except Exception as e:
-            print(f"[CONNECTION_STATE] [ERROR] Error enviando mensaje WS: {e}")
+            logger.error("Error enviando mensaje WS: %s", e)
             return False
 
 
@@ -175,6 +230,8 @@ class ConnectionManager:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.active_connections: Dict[str, ConnectionState] = {}
+            cls._instance._by_session: Dict[str, Set[str]] = {}
+            cls._instance._heartbeat: Optional[asyncio.Task] = None
             cls._instance.redis_client = RedisClient()
         return cls._instance
 
@@ -183,10 +240,11 @@ class ConnectionManager:
         state = ConnectionState(websocket, session_id, activity_uuid)
         state.set_redis_client(self.redis_client)
         self.active_connections[activity_uuid] = state
+        self._by_session.setdefault(session_id, set()).add(activity_uuid)
 
-        self.redis_client.register_connection(session_id, activity_uuid)
+        await self.redis_client.register_connection(session_id, activity_uuid)
 
-        print(f"[INFO] WebSocket conectado: actividad {activity_uuid} (sesion {session_id})")
+        logger.info("WebSocket conectado: actividad %s (sesion %s)", activity_uuid, session_id)
         return state
 
     def disconnect(self, activity_uuid: str) -> Optional[ConnectionState]:
@@ -195,13 +253,23 @@ class ConnectionManager:
 
             metrics = state.get_backpressure_metrics()
             if metrics["frames_dropped"] > 0:
-                print(f"[BACKPRESSURE] [INFO] Metricas finales para {activity_uuid}: dropped={metrics['frames_dropped']}, throttles={metrics['throttle_events']}")
+                backpressure_logger.info("Metricas finales para %s: dropped=%s, throttles=%s", activity_uuid, metrics['frames_dropped'], metrics['throttle_events'])
 
-            state.context.save_to_redis()
-            self.redis_client.unregister_connection(state.session_id, activity_uuid)
+            InterventionEvaluationScheduler().cancel_activity(activity_uuid)
+            state.persist_context()
 
             del self.active_connections[activity_uuid]
-            print(f"[INFO] WebSocket desconectado: actividad {activity_uuid}")
+            session_activities = self._by_session.get(state.session_id, set())
+            session_activities.discard(activity_uuid)
+            if not session_activities:
+                self._by_session.pop(state.session_id, None)
+
+            self.redis_client.run_nowait(self.redis_client.unregister_connection(
+                state.session_id,
+                activity_uuid,
+                last_for_session=not session_activities
+            ))
+            logger.info("WebSocket desconectado: actividad %s", activity_uuid)
             return state
         return None
 
@@ -218,17 +286,37 @@ class ConnectionManager:
         return False
 
     def get_state_by_session_id(self, session_id: str) -> Optional[ConnectionState]:
-        for state in self.active_connections.values():
-            if state.session_id == session_id:
-                return state
+        for activity_uuid in self._by_session.get(session_id, ()):
+            return self.active_connections[activity_uuid]
         return None
 
     def get_all_states_by_session_id(self, session_id: str) -> List[ConnectionState]:
         return [
-            state for state in self.active_connections.values()
-            if state.session_id == session_id
+            self.active_connections[activity_uuid]
+            for activity_uuid in self._by_session.get(session_id, ())
         ]
 
+    def start_heartbeat(self) -> None:
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._run_heartbeat())
+
+    async def stop_heartbeat(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+
+    async def _run_heartbeat(self) -> None:
+        # Renueva el TTL del registro de todas las conexiones locales; si la replica
+        # cae, sus entradas expiran solas
+        while True:
+            await asyncio.sleep(REGISTRY_HEARTBEAT_SECONDS)
+            connections = [
+                (state.session_id, activity_uuid)
+                for activity_uuid, state in self.active_connections.items()
+            ]
+            await self.redis_client.refresh_connections(connections)
+
     def get_all_connections(self) -> Dict[str, ConnectionState]:
         return self.active_connections
 
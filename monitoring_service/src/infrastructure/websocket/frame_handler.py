@@ -1,24 +1,92 @@
 import json
+import time
 import uuid
 from typing import Dict, Any, Optional
-from sqlalchemy.orm import Session as DBSession
-from src.infrastructure.websocket.connection_manager import ConnectionState
-from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
-from src.application.use_cases.process_biometric_frame import ProcessBiometricFrameUseCase
-from src.application.use_cases.evaluate_intervention_result import EvaluateInterventionResultUseCase
+from src.infrastructure.websocket.connection_manager import ConnectionState, QueuedFrames
+from src.infrastructure.websocket.backpressure import BackpressurePolicyRegistry
+from src.infrastructure.websocket.frame_pipeline import FramePipeline
+from src.infrastructure.websocket.binary_frame_codec import (
+    BINARY_ENCODING,
+    JSON_ENCODING,
+    SUPPORTED_ENCODINGS,
+    FRAME_SIZE,
+    decode_frame,
+    decode_frames,
+    layout_description
+)
+from src.infrastructure.ml.feature_extractor import FeatureExtractor
+from src.infrastructure.metrics.stage_timer import StageTimer
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import MAX_FRAMES_PER_MESSAGE
 from src.application.dtos.biometric_frame_dto import BiometricFrameDTO
 
+logger = get_logger("FRAME_HANDLER")
+
 
 class FrameHandler:
-    def __init__(self, db: DBSession, rabbitmq_client: Optional[RabbitMQClient] = None):
-        self.db = db
-        self.rabbitmq_client = rabbitmq_client or RabbitMQClient()
+    def __init__(self):
+        self.feature_extractor = FeatureExtractor()
+        self.policies = BackpressurePolicyRegistry()
+        self.stage_timer = StageTimer()
+
+    async def consume(self, state: ConnectionState) -> None:
+        # Consumidor de la cola de la conexion: procesa en orden y responde por el socket
+        while True:
+            item = await state.next_frames()
+            self.stage_timer.observe("queue_wait", time.monotonic() - item.enqueued_at)
+            profiler = state.profiler
+            if profiler is not None:
+                profiler.enter()
+            try:
+                result = await self._process_queued(state, item)
+            except Exception as e:
+                logger.error("Error procesando frames de %s: %s", state.activity_uuid, e)
+                result = {
+                    "error": "Error procesando frame",
+                    "code": "PROCESSING_ERROR",
+                    "correlation_id": item.correlation_id
+                }
+            finally:
+                if profiler is not None:
+                    profiler.exit()
+                state.mark_processed(item.count)
+
+            if result:
+                try:
+                    started_at = time.perf_counter()
+                    await state.send_json(result)
+                    self.stage_timer.observe("send", time.perf_counter() - started_at)
+                except Exception as e:
+                    logger.warning("Socket cerrado para %s, se detiene el consumidor: %s", state.activity_uuid, e)
+                    return
+
+    async def _process_queued(self, state: ConnectionState, item: QueuedFrames) -> Optional[Dict[str, Any]]:
+        if item.kind == "frame":
+            return await self._process_frame(state, item.payload, item.correlation_id)
+
+        started_at = time.perf_counter()
+        if item.kind == "binary":
+            features = self.feature_extractor.normalize_raw_row(item.payload)
+            self.stage_timer.observe("extract", time.perf_counter() - started_at)
+            result = await state.pipeline.process_features(features, float(features[15]), item.correlation_id)
+            if result:
+                result["correlation_id"] = item.correlation_id
+            return result
+
+        if item.kind == "binary_block":
+            features = self.feature_extractor.normalize_raw(item.payload)
+        else:
+            features = self.feature_extractor.extract_batch(item.payload)
+        self.stage_timer.observe("extract", time.perf_counter() - started_at)
+        return await self._process_batch(state, features, item)
 
     async def handle(self, state: ConnectionState, raw_message: str) -> Optional[Dict[str, Any]]:
         correlation_id = str(uuid.uuid4())
         
+        started_at = time.perf_counter()
         try:
             data = json.loads(raw_message)
+            self.stage_timer.observe("parse", time.perf_counter() - started_at)
         except json.JSONDecodeError:
             return {
                 "error": "JSON invalido",
@@ -26,9 +94,13 @@ class FrameHandler:
                 "correlation_id": correlation_id
             }
 
+        # Si el cliente manda su correlation_id se usa en la respuesta para emparejarla
+        correlation_id = str(data.get("correlation_id") or correlation_id)
         message_type = data.get("type", "frame")
 
         if message_type == "handshake":
+            # reset_for_activity compara con el estado restaurado de Redis
+            await state.wait_context_loaded()
             return self._handle_handshake(state, data, correlation_id)
         elif message_type == "frame" or "metadata" in data:
             if not state.is_ready:
@@ -38,6 +110,14 @@ class FrameHandler:
                     "correlation_id": correlation_id
                 }
             return await self._handle_frame_with_backpressure(state, data, correlation_id)
+        elif message_type == "frames":
+            if not state.is_ready:
+                return {
+                    "error": "Handshake requerido antes de enviar frames",
+                    "code": "HANDSHAKE_REQUIRED",
+                    "correlation_id": correlation_id
+                }
+            return await self._handle_frames(state, data, correlation_id)
         elif message_type == "ping":
             return {
                 "type": "pong", 
@@ -53,6 +133,123 @@ class FrameHandler:
                 "correlation_id": correlation_id
             }
 
+    async def handle_binary(self, state: ConnectionState, data: bytes) -> Optional[Dict[str, Any]]:
+        correlation_id = str(uuid.uuid4())
+
+        if not state.is_ready:
+            return {
+                "error": "Handshake requerido antes de enviar frames",
+                "code": "HANDSHAKE_REQUIRED",
+                "correlation_id": correlation_id
+            }
+        if state.encoding != BINARY_ENCODING:
+            return {
+                "error": "Codificacion binaria no negociada en el handshake",
+                "code": "BINARY_NOT_NEGOTIATED",
+                "correlation_id": correlation_id
+            }
+
+        if len(data) != FRAME_SIZE:
+            return await self._handle_binary_block(state, data, correlation_id)
+
+        started_at = time.perf_counter()
+        try:
+            _, raw_values = decode_frame(data)
+            self.stage_timer.observe("parse", time.perf_counter() - started_at)
+        except ValueError as e:
+            return {
+                "error": str(e),
+                "code": "INVALID_BINARY_FRAME",
+                "correlation_id": correlation_id
+            }
+
+        if not state.admit_frames(1):
+            return self._backpressure_response(state, correlation_id)
+        state.enqueue_frames(QueuedFrames("binary", raw_values, 1, correlation_id))
+        return None
+
+    async def _handle_binary_block(self, state: ConnectionState, data: bytes, correlation_id: str) -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        try:
+            _, raw_values = decode_frames(data)
+            self.stage_timer.observe("parse", time.perf_counter() - started_at)
+        except ValueError as e:
+            return {
+                "error": str(e),
+                "code": "INVALID_BINARY_FRAME",
+                "correlation_id": correlation_id
+            }
+
+        if len(raw_values) > MAX_FRAMES_PER_MESSAGE:
+            return self._too_many_frames(len(raw_values), correlation_id)
+
+        return self._enqueue_batch(state, "binary_block", raw_values, correlation_id)
+
+    async def _handle_frames(self, state: ConnectionState, data: Dict[str, Any], correlation_id: str) -> Dict[str, Any]:
+        frames = data.get("frames")
+        if not isinstance(frames, list) or not frames:
+            return {
+                "error": "frames debe ser una lista no vacia",
+                "code": "INVALID_FRAMES",
+                "correlation_id": correlation_id
+            }
+        if len(frames) > MAX_FRAMES_PER_MESSAGE:
+            return self._too_many_frames(len(frames), correlation_id)
+
+        return self._enqueue_batch(state, "frames", frames, correlation_id)
+
+    def _enqueue_batch(self, state: ConnectionState, kind: str, payload: Any, correlation_id: str) -> Optional[Dict[str, Any]]:
+        # El lote se admite de una vez; lo que no cabe en la cola o en el bucket se descarta
+        received = len(payload)
+        accepted = state.admit_frames(received)
+        backpressure = self._backpressure_response(state, correlation_id) if accepted < received else None
+
+        if not accepted:
+            return self._frames_ack(received, 0, correlation_id, backpressure)
+
+        state.enqueue_frames(QueuedFrames(
+            kind, payload[:accepted], accepted, correlation_id,
+            received=received, backpressure=backpressure
+        ))
+        return None
+
+    async def _process_batch(self, state: ConnectionState, features, item: QueuedFrames) -> Dict[str, Any]:
+        response = self._frames_ack(item.received, len(features), item.correlation_id, item.backpressure)
+        result = await state.pipeline.process_batch(features, item.correlation_id)
+        response["windows_evaluated"] = result["windows_evaluated"]
+        response["interventions"] = result["interventions"]
+        return response
+
+    def _frames_ack(
+        self,
+        received: int,
+        accepted: int,
+        correlation_id: str,
+        backpressure: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        response = {
+            "type": "frames_ack",
+            "frames_received": received,
+            "frames_accepted": accepted,
+            "frames_dropped": received - accepted,
+            "windows_evaluated": 0,
+            "interventions": [],
+            "correlation_id": correlation_id
+        }
+        if backpressure:
+            response["backpressure"] = backpressure.get("type")
+            if "retry_after_seconds" in backpressure:
+                response["retry_after_seconds"] = backpressure["retry_after_seconds"]
+        return response
+
+    def _too_many_frames(self, count: int, correlation_id: str) -> Dict[str, Any]:
+        return {
+            "error": f"Demasiados frames en un mensaje: {count} (max {MAX_FRAMES_PER_MESSAGE})",
+            "code": "TOO_MANY_FRAMES",
+            "max_frames_per_message": MAX_FRAMES_PER_MESSAGE,
+            "correlation_id": correlation_id
+        }
+
     def _handle_handshake(self, state: ConnectionState, data: Dict[str, Any], correlation_id: str) -> Dict[str, Any]:
         user_id = data.get("user_id")
         external_activity_id = data.get("external_activity_id")
@@ -75,59 +272,60 @@ class FrameHandler:
                 "correlation_id": correlation_id
             }
 
+        encoding = data.get("encoding", JSON_ENCODING)
+        if encoding not in SUPPORTED_ENCODINGS:
+            return {
+                "error": f"Codificacion no soportada: {encoding}",
+                "code": "UNSUPPORTED_ENCODING",
+                "supported_encodings": list(SUPPORTED_ENCODINGS),
+                "correlation_id": correlation_id
+            }
+
         state.set_metadata(user_id, external_activity_id, company_id)
+        state.apply_policy(self.policies.resolve(company_id, data.get("application_id")))
+        state.encoding = encoding
+        state.pipeline = FramePipeline(state)
 
-        print(f"[INFO] Handshake completado para actividad {state.activity_uuid}: user={user_id}, ext_activity={external_activity_id}")
+        logger.info("Handshake completado para actividad %s: user=%s, ext_activity=%s, encoding=%s", state.activity_uuid, user_id, external_activity_id, encoding)
 
-        return {
+        response = {
             "type": "handshake_ack",
             "status": "ready",
             "activity_uuid": state.activity_uuid,
             "session_id": state.session_id,
             "correlation_id": correlation_id,
-            "backpressure_config": {
-                "max_buffer_size": state.MAX_BUFFER_SIZE,
-                "max_frames_per_second": state.MAX_FRAMES_PER_SECOND,
-                "throttle_threshold": state.THROTTLE_THRESHOLD
-            }
+            "encoding": encoding,
+            "max_frames_per_message": MAX_FRAMES_PER_MESSAGE,
+            "backpressure_config": state.policy.to_dict()
         }
+        if encoding == BINARY_ENCODING:
+            response["binary_frame_layout"] = layout_description()
+        return response
 
     async def _handle_frame_with_backpressure(self, state: ConnectionState, data: Dict[str, Any], correlation_id: str) -> Optional[Dict[str, Any]]:
-        if not state.can_accept_frame():
-            if state._backpressure.is_throttled:
-                throttle_msg = state.get_throttle_message()
-                throttle_msg["correlation_id"] = correlation_id
-                return throttle_msg
-            
-            return {
-                "type": "frame_dropped",
-                "reason": "buffer_full",
-                "correlation_id": correlation_id,
-                "buffer_size": state.get_buffer_size(),
-                "max_buffer_size": state.MAX_BUFFER_SIZE
-            }
+        if not state.admit_frames(1):
+            return self._backpressure_response(state, correlation_id)
+
+        state.enqueue_frames(QueuedFrames("frame", data, 1, correlation_id))
+        return None
 
-        state.add_frame_to_buffer(data)
+    def _backpressure_response(self, state: ConnectionState, correlation_id: str) -> Dict[str, Any]:
+        if state.is_throttled:
+            throttle_msg = state.get_throttle_message()
+            throttle_msg["correlation_id"] = correlation_id
+            return throttle_msg
 
-        return await self._process_frame(state, data, correlation_id)
+        return {
+            "type": "frame_dropped",
+            "reason": "buffer_full" if state.get_buffer_size() >= state.policy.max_queue_size else "rate_limited",
+            "correlation_id": correlation_id,
+            "buffer_size": state.get_buffer_size(),
+            "max_buffer_size": state.policy.max_queue_size
+        }
 
     async def _process_frame(self, state: ConnectionState, data: Dict[str, Any], correlation_id: str) -> Optional[Dict[str, Any]]:
         frame = BiometricFrameDTO.from_dict(data)
-
-        use_case = ProcessBiometricFrameUseCase(
-            db=self.db,
-            buffer=state.buffer,
-            context=state.context,
-            activity_uuid=state.activity_uuid,
-            session_id=state.session_id,
-            user_id=state.metadata.user_id,
-            external_activity_id=state.metadata.external_activity_id,
-            correlation_id=correlation_id
-        )
-        result = use_case.execute(frame)
-
-        evaluator = EvaluateInterventionResultUseCase(self.db, self.rabbitmq_client)
-        evaluator.execute(state.buffer, state.session_id, state.activity_uuid)
+        result = await state.pipeline.process(frame, correlation_id)
 
         if result:
             result["correlation_id"] = correlation_id
@@ -0,0 +1,30 @@
+from typing import Dict, Any, Optional
+import numpy as np
+from src.application.dtos.biometric_frame_dto import BiometricFrameDTO
+from src.application.use_cases.process_biometric_frame import ProcessBiometricFrameUseCase
+
+
+class FramePipeline:
+    # Se construye una vez por conexion en el handshake; los componentes
+    # del caso de uso viven lo que dura el WebSocket en lugar de un frame
+    def __init__(self, state):
+        self.state = state
+        self.process_frame_use_case = ProcessBiometricFrameUseCase(
+            buffer=state.buffer,
+            context=state.context,
+            activity_uuid=state.activity_uuid,
+            session_id=state.session_id,
+            user_id=state.metadata.user_id,
+            external_activity_id=state.metadata.external_activity_id,
+            stream_state=state.stream_state
+        )
+
+    async def process(self, frame: BiometricFrameDTO, correlation_id: str) -> Optional[Dict[str, Any]]:
+        return await self.process_frame_use_case.execute(frame, correlation_id)
+
+    async def process_features(self, features: np.ndarray, precision: float, correlation_id: str) -> Optional[Dict[str, Any]]:
+        return await self.process_frame_use_case.execute_features(features, precision, correlation_id)
+
+    async def process_batch(self, features: np.ndarray, correlation_id: str) -> Dict[str, Any]:
+        # La confianza de la emocion principal es la feature 15
+        return await self.process_frame_use_case.execute_batch(features, features[:, 15], correlation_id)
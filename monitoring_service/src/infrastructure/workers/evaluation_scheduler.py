@@ -0,0 +1,213 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple, Any
+from src.application.use_cases.evaluate_intervention_result import EvaluateInterventionResultUseCase
+from src.domain.entities.intervention import Intervention
+from src.domain.value_objects.intervention_result import InterventionResult
+from src.infrastructure.messaging.intervention_evaluation_publisher import InterventionEvaluationPublisher
+from src.infrastructure.metrics.histogram import Histogram
+from src.infrastructure.metrics.stage_timer import StageTimer
+from src.infrastructure.ml.sequence_buffer import SequenceBuffer
+from src.infrastructure.persistence.database import SessionLocal
+from src.infrastructure.persistence.repositories.intervention_repository import InterventionRepository
+from src.infrastructure.workers.persistence_dispatcher import PersistenceDispatcher
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import (
+    RESULT_EVALUATION_DELAY_SECONDS,
+    EVALUATION_SWEEP_INTERVAL_SECONDS,
+    EVALUATION_SWEEP_GRACE_SECONDS
+)
+
+logger = get_logger("EVALUATION_SCHEDULER")
+
+
+@dataclass
+class ScheduledEvaluation:
+    intervention: Intervention
+    buffer: SequenceBuffer
+    activity_uuid: str
+    due_at: float
+    attempts: int = 0
+
+
+class InterventionEvaluationScheduler:
+    MAX_ATTEMPTS = 3
+    RETRY_DELAY_SECONDS = 5.0
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.delay = RESULT_EVALUATION_DELAY_SECONDS
+        self.dispatcher = PersistenceDispatcher()
+        self.evaluator = EvaluateInterventionResultUseCase(InterventionEvaluationPublisher())
+        self._heap: List[Tuple[float, str]] = []
+        self._entries: Dict[str, ScheduledEvaluation] = {}
+        self._by_activity: Dict[str, Set[str]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_due: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sweep_timer: Optional[asyncio.TimerHandle] = None
+
+        self.scheduled = 0
+        self.evaluated = 0
+        self.cancelled = 0
+        self.expired = 0
+        self.batches_submitted = 0
+        self.sweeps = 0
+        self.swept = 0
+        self.lag_histogram = Histogram("evaluation_lag_seconds")
+        self.stage_timer = StageTimer()
+        self._initialized = True
+
+    def start(self) -> None:
+        # Barrido al arrancar y periodico: recoge las pendientes de antes de un reinicio,
+        # de actividades desconectadas y de evaluaciones que agotaron sus reintentos
+        self._loop = asyncio.get_running_loop()
+        self._sweep()
+
+    def _sweep(self) -> None:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.delay + EVALUATION_SWEEP_GRACE_SECONDS)
+        self.dispatcher.submit("expire_evaluations", self._expire_overdue, cutoff)
+        self._sweep_timer = self._loop.call_later(EVALUATION_SWEEP_INTERVAL_SECONDS, self._sweep)
+
+    def _expire_overdue(self, cutoff: datetime) -> None:
+        db = SessionLocal()
+        try:
+            expired = InterventionRepository(db).expire_pending(cutoff, datetime.utcnow())
+        finally:
+            db.close()
+        self.sweeps += 1
+        self.swept += expired
+        if expired:
+            logger.warning("%d intervenciones pendientes sin evaluar cerradas como expired", expired)
+
+    def schedule(self, intervention: Intervention, buffer: SequenceBuffer, activity_uuid: str) -> None:
+        # Se llama desde el event loop; el heap solo se toca desde el loop
+        self._loop = asyncio.get_running_loop()
+        intervention_id = str(intervention.id)
+        entry = ScheduledEvaluation(
+            intervention=intervention,
+            buffer=buffer,
+            activity_uuid=activity_uuid,
+            due_at=self._loop.time() + self.delay
+        )
+        self._entries[intervention_id] = entry
+        self._by_activity.setdefault(activity_uuid, set()).add(intervention_id)
+        heapq.heappush(self._heap, (entry.due_at, intervention_id))
+        self.scheduled += 1
+        self._arm_timer()
+
+    def cancel_activity(self, activity_uuid: str) -> int:
+        # Las entradas del heap se descartan de forma perezosa al vencer
+        intervention_ids = self._by_activity.pop(activity_uuid, set())
+        for intervention_id in intervention_ids:
+            self._entries.pop(intervention_id, None)
+        self.cancelled += len(intervention_ids)
+        return len(intervention_ids)
+
+    def _arm_timer(self) -> None:
+        while self._heap and self._heap[0][1] not in self._entries:
+            heapq.heappop(self._heap)
+
+        if not self._heap:
+            self._cancel_timer()
+            return
+
+        next_due = self._heap[0][0]
+        if self._timer is not None and self._timer_due is not None and self._timer_due <= next_due:
+            return
+
+        self._cancel_timer()
+        self._timer_due = next_due
+        self._timer = self._loop.call_at(next_due, self._fire)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_due = None
+
+    def _fire(self) -> None:
+        self._timer = None
+        self._timer_due = None
+        now = self._loop.time()
+        results: List[Tuple[Intervention, InterventionResult]] = []
+
+        while self._heap and self._heap[0][0] <= now:
+            due_at, intervention_id = heapq.heappop(self._heap)
+            entry = self._entries.get(intervention_id)
+            if entry is None or entry.due_at != due_at:
+                continue
+
+            started_at = time.perf_counter()
+            result = self.evaluator.evaluate(entry.intervention, entry.buffer)
+            self.stage_timer.observe("evaluation", time.perf_counter() - started_at)
+            if result is None:
+                entry.attempts += 1
+                if entry.attempts < self.MAX_ATTEMPTS:
+                    entry.due_at = now + self.RETRY_DELAY_SECONDS
+                    heapq.heappush(self._heap, (entry.due_at, intervention_id))
+                    continue
+                self.expired += 1
+                self._forget(intervention_id, entry)
+                continue
+
+            self.lag_histogram.observe(now - due_at)
+            results.append((entry.intervention, result))
+            self._forget(intervention_id, entry)
+
+        if results:
+            self.evaluated += len(results)
+            self.batches_submitted += 1
+            self.dispatcher.submit("apply_evaluations", self._apply_results, results)
+
+        self._arm_timer()
+
+    def _forget(self, intervention_id: str, entry: ScheduledEvaluation) -> None:
+        self._entries.pop(intervention_id, None)
+        activity_ids = self._by_activity.get(entry.activity_uuid)
+        if activity_ids is not None:
+            activity_ids.discard(intervention_id)
+            if not activity_ids:
+                del self._by_activity[entry.activity_uuid]
+
+    def _apply_results(self, results: List[Tuple[Intervention, InterventionResult]]) -> None:
+        db = SessionLocal()
+        try:
+            self.evaluator.apply_results(db, results)
+        finally:
+            db.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._entries),
+            "activities": len(self._by_activity),
+            "scheduled": self.scheduled,
+            "evaluated": self.evaluated,
+            "cancelled": self.cancelled,
+            "expired": self.expired,
+            "batches_submitted": self.batches_submitted,
+            "sweeps": self.sweeps,
+            "swept": self.swept,
+            "lag_seconds": self.lag_histogram.snapshot()
+        }
+
+    def close(self) -> None:
+        self._cancel_timer()
+        if self._sweep_timer is not None:
+            self._sweep_timer.cancel()
+            self._sweep_timer = None
+        self._heap = []
+        self._entries = {}
+        self._by_activity = {}
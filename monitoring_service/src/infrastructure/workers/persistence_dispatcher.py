@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional
+from src.infrastructure.metrics.histogram import Histogram
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import PERSISTENCE_WORKERS, PERSISTENCE_QUEUE_SIZE
+
+logger = get_logger("PERSISTENCE_DISPATCHER")
+
+
+class PersistenceDispatcher:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.worker_count = PERSISTENCE_WORKERS
+        self._queue: queue.Queue = queue.Queue(maxsize=PERSISTENCE_QUEUE_SIZE)
+        self._workers: List[threading.Thread] = []
+        self._running = False
+        self._closed = False
+        self._metrics_lock = threading.Lock()
+
+        self.jobs_submitted = 0
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.jobs_rejected = 0
+        self.max_queue_depth = 0
+        self.queue_wait_histogram = Histogram("persistence_queue_wait_seconds")
+        self.job_duration_histogram = Histogram("persistence_job_duration_seconds")
+        self._initialized = True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for index in range(self.worker_count):
+                worker = threading.Thread(target=self._work, name=f"persistence-{index}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        logger.info("Iniciado con %s workers (cola max=%s)", self.worker_count, self._queue.maxsize)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(self, job_name: str, job: Callable, *args) -> bool:
+        if self._closed:
+            # Tras close() no se rearrancan los workers; quien envia decide que hacer con el trabajo
+            with self._metrics_lock:
+                self.jobs_rejected += 1
+            return False
+        if not self._running:
+            self.start()
+
+        try:
+            self._queue.put_nowait((job_name, job, args, time.perf_counter()))
+        except queue.Full:
+            with self._metrics_lock:
+                self.jobs_rejected += 1
+            logger.warning("Cola llena, trabajo descartado: %s", job_name)
+            return False
+
+        with self._metrics_lock:
+            self.jobs_submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return True
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            job_name, job, args, enqueued_at = item
+            started_at = time.perf_counter()
+            self.queue_wait_histogram.observe(started_at - enqueued_at)
+            try:
+                job(*args)
+                with self._metrics_lock:
+                    self.jobs_completed += 1
+            except Exception as e:
+                with self._metrics_lock:
+                    self.jobs_failed += 1
+                logger.exception("Error en trabajo %s: %s", job_name, e)
+            finally:
+                self.job_duration_histogram.observe(time.perf_counter() - started_at)
+                self._queue.task_done()
+
+    def get_queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            metrics = {
+                "workers": self.worker_count,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_queue_depth": self.max_queue_depth,
+                "jobs_submitted": self.jobs_submitted,
+                "jobs_completed": self.jobs_completed,
+                "jobs_failed": self.jobs_failed,
+                "jobs_rejected": self.jobs_rejected
+            }
+        metrics["queue_utilization"] = round(metrics["queue_depth"] / metrics["queue_capacity"], 4) if metrics["queue_capacity"] else 0.0
+        metrics["queue_wait_seconds"] = self.queue_wait_histogram.snapshot()
+        metrics["job_duration_seconds"] = self.job_duration_histogram.snapshot()
+        return metrics
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        if not self._running:
+            self._closed = True
+            return
+        deadline = time.monotonic() + (timeout or 0)
+        # Primero se drena con los workers en marcha: un trabajo en curso puede encolar otro
+        # (p. ej. un lote lleno de TrainingSampleSink) y debe ejecutarse antes de los centinelas
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic() if timeout else None
+                if remaining is not None and remaining <= 0:
+                    break
+                self._queue.all_tasks_done.wait(remaining)
+        self._closed = True
+        self._running = False
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=max(0.0, deadline - time.monotonic()) if timeout else None)
+        self._workers = []
+        logger.info("Detenido (pendientes=%s)", self._queue.qsize())
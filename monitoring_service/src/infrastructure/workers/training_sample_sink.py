@@ -0,0 +1,151 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from src.domain.entities.training_sample import TrainingSample
+from src.infrastructure.metrics.histogram import Histogram
+from src.infrastructure.persistence.database import SessionLocal
+from src.infrastructure.persistence.repositories.training_sample_repository import TrainingSampleRepository
+from src.infrastructure.workers.persistence_dispatcher import PersistenceDispatcher
+from src.infrastructure.logger.service_logger import get_logger
+from src.infrastructure.config.settings import (
+    TRAINING_SAMPLE_BATCH_SIZE,
+    TRAINING_SAMPLE_FLUSH_SECONDS,
+    TRAINING_SAMPLE_BUFFER_SIZE
+)
+
+logger = get_logger("TRAINING_SAMPLE_SINK")
+
+
+class TrainingSampleSink:
+    # Acumula muestras de entrenamiento y las escribe en lotes con un solo INSERT;
+    # add() es O(1) y se puede llamar desde el event loop o desde los workers
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.batch_size = TRAINING_SAMPLE_BATCH_SIZE
+        self.flush_seconds = TRAINING_SAMPLE_FLUSH_SECONDS
+        self.max_buffer_size = TRAINING_SAMPLE_BUFFER_SIZE
+        self.dispatcher = PersistenceDispatcher()
+        self._buffer: List[TrainingSample] = []
+        self._buffer_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+        self.samples_added = 0
+        self.samples_written = 0
+        self.samples_dropped = 0
+        self.batches_written = 0
+        self.batches_failed = 0
+        self.batch_size_histogram = Histogram("training_sample_batch_size", buckets=(1, 5, 10, 25, 50, 100, 200, 500, 1000))
+        self.write_duration_histogram = Histogram("training_sample_write_seconds")
+        self._initialized = True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._run, name="training-sample-sink", daemon=True)
+            self._flusher.start()
+        logger.info("Iniciado (lote=%s, flush=%ss, max=%s)", self.batch_size, self.flush_seconds, self.max_buffer_size)
+
+    def add(self, sample: TrainingSample) -> bool:
+        if self._flusher is None:
+            self.start()
+
+        with self._buffer_lock:
+            if len(self._buffer) >= self.max_buffer_size:
+                self.samples_dropped += 1
+                return False
+            self._buffer.append(sample)
+            self.samples_added += 1
+            batch = self._take() if len(self._buffer) >= self.batch_size else None
+
+        if batch:
+            self._submit(batch)
+        return True
+
+    def _take(self) -> List[TrainingSample]:
+        batch, self._buffer = self._buffer, []
+        return batch
+
+    def _run(self) -> None:
+        # Los lotes incompletos salen cada TRAINING_SAMPLE_FLUSH_SECONDS
+        while not self._stop.wait(self.flush_seconds):
+            with self._buffer_lock:
+                batch = self._take()
+            if batch:
+                self._submit(batch)
+
+    def _submit(self, batch: List[TrainingSample]) -> None:
+        if self.dispatcher.closed:
+            # Durante el apagado, con el dispatcher ya cerrado, el lote se escribe en este hilo
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.exception("Error escribiendo lote al cerrar: %s", e)
+            return
+        if not self.dispatcher.submit("write_training_samples", self._write, batch):
+            with self._buffer_lock:
+                self.samples_dropped += len(batch)
+
+    def _write(self, batch: List[TrainingSample]) -> None:
+        started_at = time.perf_counter()
+        db = SessionLocal()
+        try:
+            TrainingSampleRepository(db).create_many(batch)
+        except Exception:
+            with self._buffer_lock:
+                self.batches_failed += 1
+                self.samples_dropped += len(batch)
+            raise
+        finally:
+            db.close()
+
+        self.write_duration_histogram.observe(time.perf_counter() - started_at)
+        self.batch_size_histogram.observe(len(batch))
+        with self._buffer_lock:
+            self.samples_written += len(batch)
+            self.batches_written += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._buffer_lock:
+            metrics = {
+                "buffered": len(self._buffer),
+                "max_buffer_size": self.max_buffer_size,
+                "samples_added": self.samples_added,
+                "samples_written": self.samples_written,
+                "samples_dropped": self.samples_dropped,
+                "batches_written": self.batches_written,
+                "batches_failed": self.batches_failed
+            }
+        metrics["batch_size"] = self.batch_size_histogram.snapshot()
+        metrics["write_seconds"] = self.write_duration_histogram.snapshot()
+        return metrics
+
+    def close(self) -> None:
+        # Se llama despues de cerrar el dispatcher: sus trabajos en curso aun anaden muestras
+        # y el ultimo lote se escribe aqui mismo
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+        if flusher is None:
+            return
+        self._stop.set()
+        flusher.join(timeout=self.flush_seconds + 1)
+
+        with self._buffer_lock:
+            batch = self._take()
+        if batch:
+            self._submit(batch)
+        logger.info("Detenido (ultimo lote=%s)", len(batch))
@@ -1,16 +1,33 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from datetime import datetime
+from typing import Optional
+import asyncio
 import pika
 from src.infrastructure.config.settings import (
     AMQP_URL,
     SERVICE_NAME,
     MYSQL_HOST,
     MYSQL_PORT,
-    MYSQL_DATABASE
+    MYSQL_DATABASE,
+    PROFILING_ENABLED,
+    PROFILING_MAX_SECONDS
 )
 from src.infrastructure.cache.redis_client import RedisClient
+from src.infrastructure.cache.cooldown_cache import CooldownStateCache
 from src.infrastructure.persistence.database import engine
 from src.infrastructure.websocket.connection_manager import ConnectionManager
+from src.infrastructure.ml.inference_scheduler import InferenceScheduler
+from src.infrastructure.ml.model_loader import ModelLoader
+from src.infrastructure.workers.persistence_dispatcher import PersistenceDispatcher
+from src.infrastructure.workers.training_sample_sink import TrainingSampleSink
+from src.infrastructure.messaging.async_publisher import AsyncRabbitMQPublisher
+from src.infrastructure.workers.evaluation_scheduler import InterventionEvaluationScheduler
+from src.infrastructure.messaging.recommendation_router import RecommendationRouter
+from src.infrastructure.metrics.stage_timer import StageTimer
+from src.infrastructure.metrics.connection_profiler import ConnectionProfiler
+from src.infrastructure.metrics import prometheus
+from src.infrastructure.logger.service_logger import dropped_records
 
 router = APIRouter()
 
@@ -44,7 +61,7 @@ def check_redis() -> dict:
     try:
         redis_client = RedisClient()
         if redis_client._is_available():
-            return {"status": "ok", "instance_id": redis_client.get_instance_id()}
+            return {"status": "ok", "backend": redis_client.backend, "instance_id": redis_client.get_instance_id()}
         return {"status": "unavailable", "message": "Redis no configurado"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -155,14 +172,23 @@ def readiness_check():
     }
 
 
+def wants_prometheus(request: Request, format: Optional[str]) -> bool:
+    # ?format= manda; si no, el Accept de Prometheus (text/plain u OpenMetrics).
+    # Sin esos tipos (navegador, curl, clientes JSON) se sigue devolviendo JSON
+    if format:
+        return format == "prometheus"
+    accept = request.headers.get("accept", "")
+    return "text/plain" in accept or "application/openmetrics-text" in accept
+
+
 @router.get("/metrics")
-def metrics():
+async def metrics(request: Request, format: Optional[str] = None):
     manager = ConnectionManager()
     redis_client = RedisClient()
     backpressure = get_backpressure_summary()
-    ws_metrics = redis_client.get_websocket_metrics() if redis_client._is_available() else {}
+    ws_metrics = await redis_client.get_websocket_metrics() if redis_client._is_available() else {}
 
-    return {
+    payload = {
         "service": SERVICE_NAME,
         "timestamp": datetime.utcnow().isoformat(),
         "websocket": {
@@ -172,11 +198,64 @@ def metrics():
             "frames_dropped": ws_metrics.get("dropped", 0)
         },
         "backpressure": backpressure,
+        "model": ModelLoader().get_metrics(),
+        "inference": InferenceScheduler().get_metrics(),
+        "persistence": PersistenceDispatcher().get_metrics(),
+        "training_samples": TrainingSampleSink().get_metrics(),
+        "publisher": AsyncRabbitMQPublisher().get_metrics(),
+        "evaluations": InterventionEvaluationScheduler().get_metrics(),
+        "recommendations": RecommendationRouter().get_metrics(),
+        "cooldown_cache": CooldownStateCache().get_metrics(),
+        "stages": StageTimer().get_metrics(),
+        "logging": {
+            "dropped_records": dropped_records()
+        },
         "instance": {
             "id": redis_client.get_instance_id() if redis_client._is_available() else "unknown"
         }
     }
 
+    if not wants_prometheus(request, format):
+        return payload
+
+    stages = payload.pop("stages")
+    lines = prometheus.render_metrics(payload, "monitoring")
+    lines += prometheus.render_labeled_histograms("monitoring_stage_seconds", "stage", stages)
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=prometheus.CONTENT_TYPE)
+
+
+@router.get("/debug/profile/{activity_uuid}")
+async def profile_connection(
+    activity_uuid: str,
+    seconds: float = 10.0,
+    mode: str = "cprofile",
+    sort: str = "cumulative",
+    limit: int = 40
+):
+    # Perfila durante `seconds` solo los lotes de una conexion; una sesion a la vez
+    if not PROFILING_ENABLED:
+        return JSONResponse(status_code=404, content={"error": "Perfilado deshabilitado (PROFILING_ENABLED=false)"})
+    if mode not in ConnectionProfiler.MODES:
+        return JSONResponse(status_code=400, content={"error": f"Modo no soportado: {mode}", "modes": list(ConnectionProfiler.MODES)})
+
+    manager = ConnectionManager()
+    state = manager.get_state(activity_uuid)
+    if state is None:
+        return JSONResponse(status_code=404, content={"error": f"Conexion no encontrada: {activity_uuid}"})
+    if any(other.profiler is not None for other in manager.get_all_connections().values()):
+        return JSONResponse(status_code=409, content={"error": "Ya hay una sesion de perfilado en curso"})
+
+    profiler = ConnectionProfiler(mode)
+    profiler.start()
+    state.profiler = profiler
+    try:
+        await asyncio.sleep(max(0.0, min(seconds, PROFILING_MAX_SECONDS)))
+    finally:
+        state.profiler = None
+        profiler.stop()
+
+    return PlainTextResponse(profiler.report(sort, limit))
+
 
 @router.get("/metrics/connections")
 def connection_metrics():
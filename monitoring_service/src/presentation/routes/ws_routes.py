@@ -1,31 +1,41 @@
-import json
-import traceback
+import asyncio
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from src.infrastructure.persistence.database import SessionLocal
 from src.infrastructure.websocket.connection_manager import manager
 from src.infrastructure.websocket.frame_handler import FrameHandler
-from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
 from src.infrastructure.messaging.websocket_event_publisher import WebsocketEventPublisher
+from src.infrastructure.messaging.recommendation_router import RecommendationRouter
+from src.infrastructure.logger.service_logger import get_logger
 
 router = APIRouter()
-rabbitmq_client = RabbitMQClient()
-websocket_publisher = WebsocketEventPublisher(rabbitmq_client)
+logger = get_logger("WS_ROUTES")
+websocket_publisher = WebsocketEventPublisher()
+recommendation_router = RecommendationRouter()
 
 
 @router.websocket("/ws/{session_id}/{activity_uuid}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str, activity_uuid: str):
     state = await manager.connect(websocket, session_id, activity_uuid)
-    db = SessionLocal()
+    await recommendation_router.redeliver_pending(state)
+    consumer = None
 
     try:
-        handler = FrameHandler(db, rabbitmq_client)
+        handler = FrameHandler()
+        # La recepcion solo encola; el procesamiento corre en su propia tarea
+        consumer = asyncio.create_task(handler.consume(state))
 
         while True:
-            raw_message = await websocket.receive_text()
-            result = await handler.handle(state, raw_message)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            # Texto JSON para clientes existentes; binario si se negocio en el handshake
+            if message.get("bytes") is not None:
+                result = await handler.handle_binary(state, message["bytes"])
+            else:
+                result = await handler.handle(state, message.get("text") or "")
 
             if result:
-                await websocket.send_text(json.dumps(result))
+                await state.send_json(result)
 
     except WebSocketDisconnect:
         disconnected_state = manager.disconnect(activity_uuid)
@@ -36,9 +46,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, activity_uui
                 reason="client_disconnected"
             )
     except Exception as e:
-        print(f"[ERROR] Error en WebSocket {activity_uuid}: {e}")
-        print(f"[ERROR] Traceback completo:")
-        traceback.print_exc()
+        logger.exception("Error en WebSocket %s: %s", activity_uuid, e)
         disconnected_state = manager.disconnect(activity_uuid)
         if disconnected_state:
             websocket_publisher.publish_websocket_disconnected(
@@ -47,7 +55,8 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, activity_uui
                 reason=f"error: {str(e)}"
             )
     finally:
-        db.close()
+        if consumer is not None:
+            consumer.cancel()
 
 
 @router.get("/ws/connections")
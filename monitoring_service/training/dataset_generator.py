@@ -1,183 +1,176 @@
 import numpy as np
-import json
 import os
-from typing import List, Tuple
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
 
 class DatasetGenerator:
     SEQUENCE_LENGTH = 30
     FEATURE_COUNT = 16
     CONTEXT_COUNT = 6
     SAMPLES_PER_CLASS = 2500
+    # Muestras por clase en cada shard; fija el reparto de semillas, asi que el dataset
+    # solo depende de seed y del tamano, no del numero de procesos
+    SHARD_SIZE = 10000
+
+    # Rangos uniformes por feature de un frame base (low == high: valor fijo)
+    BASE_LOW = np.array([0.3, 0.1, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, -0.1, -0.1, 0.0, 0.25, 1.0, 0.7, 0.6], dtype=np.float32)
+    BASE_HIGH = np.array([0.8, 0.4, 0.1, 0.05, 0.05, 0.03, 0.03, 0.05, 1.0, 0.1, 0.1, 0.0, 0.4, 1.0, 1.0, 0.9], dtype=np.float32)
 
     def __init__(self, output_dir: str = "training/data/synthetic"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
 
-    def generate(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-        sequences = []
-        contexts = []
-        labels = []
-
-        for _ in range(self.SAMPLES_PER_CLASS):
-            seq, ctx = self._generate_no_intervention()
-            sequences.append(seq)
-            contexts.append(ctx)
-            labels.append(0)
-
-        for _ in range(self.SAMPLES_PER_CLASS):
-            seq, ctx = self._generate_vibration()
-            sequences.append(seq)
-            contexts.append(ctx)
-            labels.append(1)
-
-        for _ in range(self.SAMPLES_PER_CLASS):
-            seq, ctx = self._generate_instruction()
-            sequences.append(seq)
-            contexts.append(ctx)
-            labels.append(2)
-
-        for _ in range(self.SAMPLES_PER_CLASS):
-            seq, ctx = self._generate_pause()
-            sequences.append(seq)
-            contexts.append(ctx)
-            labels.append(3)
-
-        sequences = np.array(sequences, dtype=np.float32)
-        contexts = np.array(contexts, dtype=np.float32)
-        labels = np.array(labels, dtype=np.int32)
-
-        indices = np.random.permutation(len(labels))
-        sequences = sequences[indices]
-        contexts = contexts[indices]
-        labels = labels[indices]
+    def generate(
+        self,
+        samples_per_class: Optional[int] = None,
+        seed: Optional[int] = None,
+        workers: int = 1
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        samples_per_class = samples_per_class or self.SAMPLES_PER_CLASS
+        seed_sequence = np.random.SeedSequence(seed)
+        shard_sizes = [
+            min(self.SHARD_SIZE, samples_per_class - start)
+            for start in range(0, samples_per_class, self.SHARD_SIZE)
+        ]
+        shard_seeds = seed_sequence.spawn(len(shard_sizes) + 1)
+
+        total = samples_per_class * 4
+        sequences = np.empty((total, self.SEQUENCE_LENGTH, self.FEATURE_COUNT), dtype=np.float32)
+        contexts = np.empty((total, self.CONTEXT_COUNT), dtype=np.float32)
+        labels = np.empty(total, dtype=np.int32)
+        # Cada shard se escribe directamente en sus posiciones barajadas: sin copia extra del dataset
+        positions = np.random.default_rng(shard_seeds[0]).permutation(total)
+
+        if workers > 1 and len(shard_sizes) > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            shards = executor.map(self._generate_shard, shard_sizes, shard_seeds[1:])
+        else:
+            executor = None
+            shards = map(self._generate_shard, shard_sizes, shard_seeds[1:])
+
+        try:
+            offset = 0
+            for shard_sequences, shard_contexts, shard_labels in shards:
+                target = positions[offset:offset + len(shard_labels)]
+                sequences[target] = shard_sequences
+                contexts[target] = shard_contexts
+                labels[target] = shard_labels
+                offset += len(shard_labels)
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
         return sequences, contexts, labels
 
-    def _generate_base_frame(self) -> np.ndarray:
-        frame = np.zeros(self.FEATURE_COUNT, dtype=np.float32)
-        frame[0] = np.random.uniform(0.3, 0.8)
-        frame[1] = np.random.uniform(0.1, 0.4)
-        frame[2] = np.random.uniform(0.0, 0.1)
-        frame[3] = np.random.uniform(0.0, 0.05)
-        frame[4] = np.random.uniform(0.0, 0.05)
-        frame[5] = np.random.uniform(0.0, 0.03)
-        frame[6] = np.random.uniform(0.0, 0.03)
-        frame[7] = np.random.uniform(0.0, 0.05)
-        frame[8] = 1.0
-        frame[9] = np.random.uniform(-0.1, 0.1)
-        frame[10] = np.random.uniform(-0.1, 0.1)
-        frame[11] = 0.0
-        frame[12] = np.random.uniform(0.25, 0.4)
-        frame[13] = 1.0
-        frame[14] = np.random.uniform(0.7, 1.0)
-        frame[15] = np.random.uniform(0.6, 0.9)
-        return frame
-
-    def _generate_no_intervention(self) -> Tuple[np.ndarray, np.ndarray]:
-        sequence = np.array([self._generate_base_frame() for _ in range(self.SEQUENCE_LENGTH)])
-        noise = np.random.uniform(-0.05, 0.05, sequence.shape)
-        sequence = np.clip(sequence + noise, 0, 1)
-        sequence[:, 8] = 1.0
-        sequence[:, 11] = 0.0
-        sequence[:, 13] = 1.0
-        context = np.array([1.0, 1.0, 1.0, 0.0, 0.0, 0.0], dtype=np.float32)
-        return sequence, context
+    def _generate_shard(self, samples: int, seed: np.random.SeedSequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rng = np.random.default_rng(seed)
+        generators = (self._generate_no_intervention, self._generate_vibration, self._generate_instruction, self._generate_pause)
+        parts = [generate(rng, samples) for generate in generators]
+        sequences = np.concatenate([sequence for sequence, _ in parts])
+        contexts = np.concatenate([context for _, context in parts])
+        labels = np.repeat(np.arange(len(generators), dtype=np.int32), samples)
+        return sequences, contexts, labels
 
-    def _generate_vibration(self) -> Tuple[np.ndarray, np.ndarray]:
-        sequence = np.array([self._generate_base_frame() for _ in range(self.SEQUENCE_LENGTH)])
-        distraction_type = np.random.choice(["not_looking", "drowsy", "no_face"])
-        
-        if distraction_type == "not_looking":
-            distracted_frames = np.random.choice(self.SEQUENCE_LENGTH, size=np.random.randint(5, 12), replace=False)
-            sequence[distracted_frames, 8] = 0.0
-            sequence[distracted_frames, 9] = np.random.uniform(0.3, 0.8, len(distracted_frames))
-            sequence[distracted_frames, 10] = np.random.uniform(0.3, 0.8, len(distracted_frames))
-        elif distraction_type == "drowsy":
-            drowsy_frames = np.random.choice(self.SEQUENCE_LENGTH, size=np.random.randint(5, 12), replace=False)
-            sequence[drowsy_frames, 11] = np.random.uniform(0.3, 0.8, len(drowsy_frames))
-            sequence[drowsy_frames, 12] = np.random.uniform(0.1, 0.2, len(drowsy_frames))
-        else:
-            no_face_frames = np.random.choice(self.SEQUENCE_LENGTH, size=np.random.randint(5, 10), replace=False)
-            sequence[no_face_frames, 13] = 0.0
-
-        context = np.array([
-            np.random.uniform(0.5, 1.0),
-            np.random.uniform(0.5, 1.0),
-            np.random.uniform(0.5, 1.0),
-            np.random.uniform(0.0, 0.2),
-            0.0,
-            0.0
-        ], dtype=np.float32)
+    def _uniform(self, rng: np.random.Generator, low, high, size) -> np.ndarray:
+        # float32 directo: la mitad de memoria que rng.uniform en float64
+        return low + (np.asarray(high, dtype=np.float32) - low) * rng.random(size, dtype=np.float32)
+
+    def _generate_base_frames(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return self._uniform(rng, self.BASE_LOW, self.BASE_HIGH, (n, self.SEQUENCE_LENGTH, self.FEATURE_COUNT))
+
+    def _generate_contexts(self, rng: np.random.Generator, n: int, bounds: Sequence[Tuple[float, float]]) -> np.ndarray:
+        low = np.array([bound[0] for bound in bounds], dtype=np.float32)
+        high = np.array([bound[1] for bound in bounds], dtype=np.float32)
+        return self._uniform(rng, low, high, (n, self.CONTEXT_COUNT))
+
+    def _random_frame_mask(self, rng: np.random.Generator, counts: np.ndarray) -> np.ndarray:
+        # counts[i] frames distintos al azar por secuencia: los de menor rango en una permutacion aleatoria
+        ranks = rng.random((len(counts), self.SEQUENCE_LENGTH)).argsort(axis=1).argsort(axis=1)
+        return ranks < counts[:, None]
+
+    def _set_where(self, sequence: np.ndarray, mask: np.ndarray, feature: int, values) -> None:
+        sequence[..., feature] = np.where(mask, values, sequence[..., feature])
+
+    def _generate_no_intervention(self, rng: np.random.Generator, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        sequence = self._generate_base_frames(rng, n)
+        sequence += self._uniform(rng, -0.05, 0.05, sequence.shape)
+        np.clip(sequence, 0, 1, out=sequence)
+        sequence[..., 8] = 1.0
+        sequence[..., 11] = 0.0
+        sequence[..., 13] = 1.0
+        context = np.tile(np.array([1.0, 1.0, 1.0, 0.0, 0.0, 0.0], dtype=np.float32), (n, 1))
         return sequence, context
 
-    def _generate_instruction(self) -> Tuple[np.ndarray, np.ndarray]:
-        sequence = np.array([self._generate_base_frame() for _ in range(self.SEQUENCE_LENGTH)])
-        frustration_start = np.random.randint(5, 15)
-        
-        for i in range(frustration_start, self.SEQUENCE_LENGTH):
-            progress = (i - frustration_start) / (self.SEQUENCE_LENGTH - frustration_start)
-            sequence[i, 0] = max(0.1, sequence[i, 0] - progress * 0.5)
-            sequence[i, 3] = min(0.8, progress * 0.6 + np.random.uniform(0, 0.2))
-            sequence[i, 4] = min(0.5, progress * 0.3 + np.random.uniform(0, 0.1))
-            sequence[i, 5] = min(0.4, progress * 0.2 + np.random.uniform(0, 0.1))
-            sequence[i, 7] = min(0.5, progress * 0.3 + np.random.uniform(0, 0.1))
-            sequence[i, 14] = max(0.0, 1.0 - progress * 0.8)
-
-        context = np.array([
-            np.random.uniform(0.3, 1.0),
-            np.random.uniform(0.5, 1.0),
-            np.random.uniform(0.5, 1.0),
-            np.random.uniform(0.0, 0.3),
-            0.0,
-            0.0
-        ], dtype=np.float32)
-        return sequence, context
+    def _generate_vibration(self, rng: np.random.Generator, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        sequence = self._generate_base_frames(rng, n)
+        # 0 = not_looking, 1 = drowsy, 2 = no_face
+        distraction_type = rng.integers(0, 3, n)
+        counts = np.where(distraction_type == 2, rng.integers(5, 10, n), rng.integers(5, 12, n))
+        mask = self._random_frame_mask(rng, counts)
+        shape = mask.shape
 
-    def _generate_pause(self) -> Tuple[np.ndarray, np.ndarray]:
-        pause_type = np.random.choice(["persistent_frustration", "persistent_distraction", "persistent_drowsiness"])
-        
-        if pause_type == "persistent_frustration":
-            sequence, _ = self._generate_instruction()
-            for i in range(self.SEQUENCE_LENGTH):
-                sequence[i, 3] = min(0.9, sequence[i, 3] + 0.2)
-                sequence[i, 4] = min(0.6, sequence[i, 4] + 0.1)
-            context = np.array([
-                np.random.uniform(0.2, 0.5),
-                np.random.uniform(0.1, 0.3),
-                np.random.uniform(0.5, 1.0),
-                np.random.uniform(0.1, 0.3),
-                np.random.uniform(0.1, 0.3),
-                0.0
-            ], dtype=np.float32)
-        elif pause_type == "persistent_distraction":
-            sequence, _ = self._generate_vibration()
-            distracted_frames = np.random.choice(self.SEQUENCE_LENGTH, size=np.random.randint(15, 25), replace=False)
-            sequence[distracted_frames, 8] = 0.0
-            sequence[distracted_frames, 13] = np.random.choice([0.0, 1.0], len(distracted_frames))
-            context = np.array([
-                np.random.uniform(0.1, 0.3),
-                np.random.uniform(0.5, 1.0),
-                np.random.uniform(0.5, 1.0),
-                np.random.uniform(0.2, 0.5),
-                0.0,
-                0.0
-            ], dtype=np.float32)
-        else:
-            sequence, _ = self._generate_vibration()
-            drowsy_frames = np.random.choice(self.SEQUENCE_LENGTH, size=np.random.randint(15, 25), replace=False)
-            sequence[drowsy_frames, 11] = np.random.uniform(0.5, 1.0, len(drowsy_frames))
-            sequence[drowsy_frames, 12] = np.random.uniform(0.05, 0.15, len(drowsy_frames))
-            context = np.array([
-                np.random.uniform(0.1, 0.3),
-                np.random.uniform(0.5, 1.0),
-                np.random.uniform(0.5, 1.0),
-                np.random.uniform(0.2, 0.5),
-                0.0,
-                0.0
-            ], dtype=np.float32)
+        not_looking = mask & (distraction_type == 0)[:, None]
+        self._set_where(sequence, not_looking, 8, 0.0)
+        self._set_where(sequence, not_looking, 9, self._uniform(rng, 0.3, 0.8, shape))
+        self._set_where(sequence, not_looking, 10, self._uniform(rng, 0.3, 0.8, shape))
+
+        drowsy = mask & (distraction_type == 1)[:, None]
+        self._set_where(sequence, drowsy, 11, self._uniform(rng, 0.3, 0.8, shape))
+        self._set_where(sequence, drowsy, 12, self._uniform(rng, 0.1, 0.2, shape))
+
+        self._set_where(sequence, mask & (distraction_type == 2)[:, None], 13, 0.0)
 
+        context = self._generate_contexts(rng, n, [(0.5, 1.0), (0.5, 1.0), (0.5, 1.0), (0.0, 0.2), (0.0, 0.0), (0.0, 0.0)])
         return sequence, context
 
+    def _generate_instruction(self, rng: np.random.Generator, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        sequence = self._generate_base_frames(rng, n)
+        frustration_start = rng.integers(5, 15, n)[:, None]
+        frames = np.arange(self.SEQUENCE_LENGTH)[None, :]
+        active = frames >= frustration_start
+        progress = ((frames - frustration_start) / (self.SEQUENCE_LENGTH - frustration_start)).astype(np.float32)
+        shape = active.shape
+
+        self._set_where(sequence, active, 0, np.maximum(0.1, sequence[..., 0] - progress * 0.5))
+        self._set_where(sequence, active, 3, np.minimum(0.8, progress * 0.6 + self._uniform(rng, 0.0, 0.2, shape)))
+        self._set_where(sequence, active, 4, np.minimum(0.5, progress * 0.3 + self._uniform(rng, 0.0, 0.1, shape)))
+        self._set_where(sequence, active, 5, np.minimum(0.4, progress * 0.2 + self._uniform(rng, 0.0, 0.1, shape)))
+        self._set_where(sequence, active, 7, np.minimum(0.5, progress * 0.3 + self._uniform(rng, 0.0, 0.1, shape)))
+        self._set_where(sequence, active, 14, np.maximum(0.0, 1.0 - progress * 0.8))
+
+        context = self._generate_contexts(rng, n, [(0.3, 1.0), (0.5, 1.0), (0.5, 1.0), (0.0, 0.3), (0.0, 0.0), (0.0, 0.0)])
+        return sequence, context
+
+    def _generate_pause(self, rng: np.random.Generator, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        # 0 = persistent_frustration, 1 = persistent_distraction, 2 = persistent_drowsiness
+        pause_type = rng.integers(0, 3, n)
+        sizes = np.bincount(pause_type, minlength=3)
+        sequences: List[np.ndarray] = []
+        contexts: List[np.ndarray] = []
+
+        frustration, _ = self._generate_instruction(rng, sizes[0])
+        frustration[..., 3] = np.minimum(0.9, frustration[..., 3] + 0.2)
+        frustration[..., 4] = np.minimum(0.6, frustration[..., 4] + 0.1)
+        sequences.append(frustration)
+        contexts.append(self._generate_contexts(rng, sizes[0], [(0.2, 0.5), (0.1, 0.3), (0.5, 1.0), (0.1, 0.3), (0.1, 0.3), (0.0, 0.0)]))
+
+        distraction, _ = self._generate_vibration(rng, sizes[1])
+        mask = self._random_frame_mask(rng, rng.integers(15, 25, sizes[1]))
+        self._set_where(distraction, mask, 8, 0.0)
+        self._set_where(distraction, mask, 13, rng.integers(0, 2, mask.shape).astype(np.float32))
+        sequences.append(distraction)
+        contexts.append(self._generate_contexts(rng, sizes[1], [(0.1, 0.3), (0.5, 1.0), (0.5, 1.0), (0.2, 0.5), (0.0, 0.0), (0.0, 0.0)]))
+
+        drowsiness, _ = self._generate_vibration(rng, sizes[2])
+        mask = self._random_frame_mask(rng, rng.integers(15, 25, sizes[2]))
+        self._set_where(drowsiness, mask, 11, self._uniform(rng, 0.5, 1.0, mask.shape))
+        self._set_where(drowsiness, mask, 12, self._uniform(rng, 0.05, 0.15, mask.shape))
+        sequences.append(drowsiness)
+        contexts.append(self._generate_contexts(rng, sizes[2], [(0.1, 0.3), (0.5, 1.0), (0.5, 1.0), (0.2, 0.5), (0.0, 0.0), (0.0, 0.0)]))
+
+        return np.concatenate(sequences), np.concatenate(contexts)
+
     def save(self, sequences: np.ndarray, contexts: np.ndarray, labels: np.ndarray) -> None:
         np.save(os.path.join(self.output_dir, "sequences.npy"), sequences)
         np.save(os.path.join(self.output_dir, "contexts.npy"), contexts)
@@ -190,6 +183,13 @@ class DatasetGenerator:
 
 
 if __name__ == "__main__":
-    generator = DatasetGenerator()
-    sequences, contexts, labels = generator.generate()
-    generator.save(sequences, contexts, labels)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Genera el dataset sintetico de entrenamiento")
+    parser.add_argument("--samples-per-class", type=int, default=DatasetGenerator.SAMPLES_PER_CLASS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1, help="Procesos para generar shards en paralelo")
+    parser.add_argument("--output-dir", default="training/data/synthetic")
+    args = parser.parse_args()
+
+    generator = DatasetGenerator(output_dir=args.output_dir)
+    sequences, contexts, labels = generator.generate(args.samples_per_class, args.seed, args.workers)
+    generator.save(sequences, contexts, labels)
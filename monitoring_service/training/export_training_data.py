@@ -1,65 +1,238 @@
 import os
 import json
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
-from sqlalchemy.orm import Session
+from numpy.lib.format import open_memmap, read_magic, read_array_header_1_0, read_array_header_2_0, dtype_to_descr
+from src.domain.value_objects.intervention_type import InterventionType
+from src.infrastructure.config.settings import SEQUENCE_LENGTH
 from src.infrastructure.persistence.database import SessionLocal
+from src.infrastructure.persistence.models.training_sample_model import WINDOW_FEATURES
 from src.infrastructure.persistence.repositories.training_sample_repository import TrainingSampleRepository
 
+
 class TrainingDataExporter:
-    def __init__(self, output_dir: str = "training/data/production"):
+    # Exporta por paginas de chunk_size filas directamente a .npy mapeados en memoria;
+    # la memoria usada no depende del numero de muestras y un export cortado se reanuda
+    # desde el ultimo id escrito
+    CONTEXT_COUNT = 6
+    CHECKPOINT_FILE = "export_checkpoint.json"
+    SAMPLE_IDS_FILE = "sample_ids.txt"
+
+    def __init__(self, output_dir: str = "training/data/production", chunk_size: int = 1000):
         self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.label_table = InterventionType.label_table()
+        self.window_bytes = SEQUENCE_LENGTH * WINDOW_FEATURES * 4
         os.makedirs(output_dir, exist_ok=True)
 
-    def export(self, source: str = "production", limit: int = 10000):
+    def export(self, source: str = "realtime", limit: Optional[int] = None, resume: bool = True, mark_used: bool = True):
         db = SessionLocal()
         try:
             repo = TrainingSampleRepository(db)
-            samples = repo.get_for_training(source, limit)
+            checkpoint = self._load_checkpoint(source) if resume else None
 
-            if not samples:
-                print("[WARN] No hay muestras disponibles para exportar")
-                return
+            if checkpoint is None:
+                capacity = repo.count_for_training(source)
+                if limit is not None:
+                    capacity = min(capacity, limit)
+                if capacity == 0:
+                    print("[WARN] No hay muestras disponibles para exportar")
+                    return
+                checkpoint = {
+                    "source": source,
+                    "capacity": capacity,
+                    "phase": "export",
+                    "last_id": None,
+                    "written": 0,
+                    "skipped": 0,
+                    "ids_offset": 0
+                }
+                arrays = self._create_arrays(capacity)
+                self._save_checkpoint(checkpoint)
+            else:
+                print(f"[INFO] Reanudando export: {checkpoint['written']}/{checkpoint['capacity']} muestras, fase {checkpoint['phase']}")
+                arrays = self._open_arrays() if checkpoint["phase"] == "export" else None
 
-            sequences = []
-            contexts = []
-            labels = []
-            sample_ids = []
+            if checkpoint["phase"] == "export":
+                self._export_pages(repo, checkpoint, arrays)
+                del arrays
+                self._finalize(checkpoint)
+                checkpoint["phase"] = "mark"
+                self._save_checkpoint(checkpoint)
 
-            for sample in samples:
-                window_data = sample.window_data.get("sequence", [])
-                context_data = sample.context_data.get("context", [])
+            if mark_used:
+                self._mark_used(repo)
+                print("[INFO] Muestras marcadas como usadas")
+            os.remove(self._path(self.CHECKPOINT_FILE))
+        finally:
+            db.close()
 
-                if len(window_data) == 30 and len(context_data) == 6:
-                    sequences.append(window_data)
-                    contexts.append(context_data)
-                    labels.append(sample.label)
-                    sample_ids.append(str(sample.id))
+    def _export_pages(self, repo: TrainingSampleRepository, checkpoint: Dict[str, Any], arrays: Tuple[np.memmap, ...]) -> None:
+        sequences, contexts, labels = arrays
+        capacity = checkpoint["capacity"]
 
-            if not sequences:
-                print("[WARN] No hay muestras validas para exportar")
-                return
+        # El fichero de ids se recorta a lo confirmado en el checkpoint por si el corte fue a mitad de pagina
+        mode = "r+b" if os.path.exists(self._path(self.SAMPLE_IDS_FILE)) and checkpoint["written"] else "wb"
+        with open(self._path(self.SAMPLE_IDS_FILE), mode) as ids_file:
+            ids_file.truncate(checkpoint["ids_offset"])
+            ids_file.seek(checkpoint["ids_offset"])
+
+            while checkpoint["written"] < capacity:
+                rows = repo.get_training_page(checkpoint["source"], checkpoint["last_id"], self.chunk_size)
+                if not rows:
+                    break
+
+                sample_ids, skipped = self._write_rows(rows, checkpoint["written"], capacity, sequences, contexts, labels)
+                if sample_ids:
+                    ids_file.write(("\n".join(sample_ids) + "\n").encode())
+
+                for array in arrays:
+                    array.flush()
+                ids_file.flush()
+
+                checkpoint["written"] += len(sample_ids)
+                checkpoint["skipped"] += skipped
+                checkpoint["last_id"] = rows[-1].id
+                checkpoint["ids_offset"] = ids_file.tell()
+                self._save_checkpoint(checkpoint)
+                print(f"[INFO] Exportadas {checkpoint['written']}/{capacity} muestras (descartadas {checkpoint['skipped']})")
+
+    def _write_rows(
+        self,
+        rows: List[Any],
+        start: int,
+        capacity: int,
+        sequences: np.memmap,
+        contexts: np.memmap,
+        labels: np.memmap
+    ) -> Tuple[List[str], int]:
+        # Cada fila se decodifica directamente sobre su posicion del memmap
+        sample_ids = []
+        skipped = 0
+        index = start
+        for row in rows:
+            if index >= capacity:
+                break
+            label = self.label_table.get(str(row.label).strip().lower())
+            window = self._decode_window(row)
+            context = self._decode_context(row.context_data)
+            if label is None or window is None or context is None:
+                skipped += 1
+                continue
+
+            sequences[index] = window
+            contexts[index] = context
+            labels[index] = label
+            sample_ids.append(row.id)
+            index += 1
+        return sample_ids, skipped
 
-            sequences = np.array(sequences, dtype=np.float32)
-            contexts = np.array(contexts, dtype=np.float32)
-            labels = np.array(labels, dtype=np.int32)
+    def _decode_window(self, row: Any) -> Optional[np.ndarray]:
+        if row.window_blob is not None:
+            if len(row.window_blob) != self.window_bytes:
+                return None
+            return TrainingSampleRepository.decode_window(row.window_blob)
 
-            np.save(os.path.join(self.output_dir, "sequences.npy"), sequences)
-            np.save(os.path.join(self.output_dir, "contexts.npy"), contexts)
-            np.save(os.path.join(self.output_dir, "labels.npy"), labels)
+        # Filas anteriores a window_blob: lista JSON o {"sequence": [...]}
+        window_data = row.window_data
+        if isinstance(window_data, dict):
+            window_data = window_data.get("sequence")
+        if window_data is None:
+            return None
+        window = np.asarray(window_data, dtype=np.float32)
+        return window if window.shape == (SEQUENCE_LENGTH, WINDOW_FEATURES) else None
 
-            with open(os.path.join(self.output_dir, "sample_ids.json"), "w") as f:
-                json.dump(sample_ids, f)
+    def _decode_context(self, context_data: Any) -> Optional[np.ndarray]:
+        if isinstance(context_data, dict):
+            context_data = context_data.get("context")
+        if context_data is None or len(context_data) != self.CONTEXT_COUNT:
+            return None
+        return np.asarray(context_data, dtype=np.float32)
 
-            print(f"[INFO] Exportadas {len(labels)} muestras a {self.output_dir}")
-            print(f"[INFO] Distribucion de clases: {np.bincount(labels)}")
+    def _create_arrays(self, capacity: int) -> Tuple[np.memmap, ...]:
+        return (
+            open_memmap(self._path("sequences.npy"), mode="w+", dtype=np.float32, shape=(capacity, SEQUENCE_LENGTH, WINDOW_FEATURES)),
+            open_memmap(self._path("contexts.npy"), mode="w+", dtype=np.float32, shape=(capacity, self.CONTEXT_COUNT)),
+            open_memmap(self._path("labels.npy"), mode="w+", dtype=np.int32, shape=(capacity,))
+        )
 
+    def _open_arrays(self) -> Tuple[np.memmap, ...]:
+        return tuple(open_memmap(self._path(name), mode="r+") for name in ("sequences.npy", "contexts.npy", "labels.npy"))
+
+    def _finalize(self, checkpoint: Dict[str, Any]) -> None:
+        # Las filas descartadas dejan hueco al final; se recortan los .npy sin copiar los datos
+        written = checkpoint["written"]
+        for name in ("sequences.npy", "contexts.npy", "labels.npy"):
+            self._truncate_npy(self._path(name), written)
+
+        with open(self._path("labels.json"), "w") as f:
+            json.dump({intervention_type.to_string(): intervention_type.value for intervention_type in InterventionType}, f, indent=2)
+
+        labels = np.load(self._path("labels.npy"), mmap_mode="r")
+        print(f"[INFO] Exportadas {written} muestras a {self.output_dir} (descartadas {checkpoint['skipped']})")
+        print(f"[INFO] Distribucion de clases: {np.bincount(labels, minlength=len(InterventionType))}")
+
+    def _truncate_npy(self, path: str, rows: int) -> None:
+        # Reescribe la cabecera con la nueva forma dentro del mismo espacio (numpy la deja
+        # con relleno) y corta el fichero; los datos en orden C no se mueven
+        with open(path, "r+b") as f:
+            version = read_magic(f)
+            header_start = f.tell() + (2 if version == (1, 0) else 4)
+            shape, fortran_order, dtype = (read_array_header_1_0 if version == (1, 0) else read_array_header_2_0)(f)
+            data_offset = f.tell()
+            if shape[0] == rows:
+                return
+
+            new_shape = (rows,) + tuple(shape[1:])
+            header = "{'descr': %r, 'fortran_order': %r, 'shape': %r, }" % (dtype_to_descr(dtype), fortran_order, new_shape)
+            f.seek(header_start)
+            f.write(header.ljust(data_offset - header_start - 1).encode("latin1") + b"\n")
+            f.truncate(data_offset + rows * int(np.prod(new_shape[1:], dtype=np.int64)) * dtype.itemsize)
+
+    def _mark_used(self, repo: TrainingSampleRepository) -> None:
+        # Un UPDATE por pagina para no construir un IN con millones de ids
+        sample_ids = []
+        with open(self._path(self.SAMPLE_IDS_FILE)) as f:
+            for line in f:
+                sample_ids.append(line.strip())
+                if len(sample_ids) >= self.chunk_size:
+                    repo.mark_as_used(sample_ids)
+                    sample_ids = []
+        if sample_ids:
             repo.mark_as_used(sample_ids)
-            print("[INFO] Muestras marcadas como usadas")
 
-        finally:
-            db.close()
+    def _load_checkpoint(self, source: str) -> Optional[Dict[str, Any]]:
+        path = self._path(self.CHECKPOINT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("source") != source:
+            print(f"[WARN] Checkpoint de otra fuente ({checkpoint.get('source')}), se empieza de cero")
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        # Escritura atomica: un corte nunca deja un checkpoint a medias
+        path = self._path(self.CHECKPOINT_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(path + ".tmp", path)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.output_dir, name)
 
 
 if __name__ == "__main__":
-    exporter = TrainingDataExporter()
-    exporter.export()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Exporta muestras de entrenamiento de la BD a .npy")
+    parser.add_argument("--source", default="realtime")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--output-dir", default="training/data/production")
+    parser.add_argument("--restart", action="store_true", help="Ignora el checkpoint y empieza de cero")
+    parser.add_argument("--no-mark-used", action="store_true", help="No marca las muestras como usadas")
+    args = parser.parse_args()
+
+    exporter = TrainingDataExporter(output_dir=args.output_dir, chunk_size=args.chunk_size)
+    exporter.export(source=args.source, limit=args.limit, resume=not args.restart, mark_used=not args.no_mark_used)
@@ -26,17 +26,17 @@ class InterventionModelTrainer:
         sequence_input = layers.Input(shape=(self.SEQUENCE_LENGTH, self.FEATURE_COUNT), name="sequence_input")
         context_input = layers.Input(shape=(self.CONTEXT_COUNT,), name="context_input")
 
-        x = layers.GRU(64, return_sequences=True)(sequence_input)
+        x = layers.GRU(64, return_sequences=True, name="gru_1")(sequence_input)
         x = layers.Dropout(0.3)(x)
-        x = layers.GRU(32)(x)
+        x = layers.GRU(32, name="gru_2")(x)
         x = layers.Dropout(0.3)(x)
 
-        context_dense = layers.Dense(16, activation="relu")(context_input)
+        context_dense = layers.Dense(16, activation="relu", name="context_dense")(context_input)
 
         combined = layers.Concatenate()([x, context_dense])
-        combined = layers.Dense(32, activation="relu")(combined)
+        combined = layers.Dense(32, activation="relu", name="combined_dense")(combined)
         combined = layers.Dropout(0.3)(combined)
-        output = layers.Dense(self.NUM_CLASSES, activation="softmax")(combined)
+        output = layers.Dense(self.NUM_CLASSES, activation="softmax", name="output")(combined)
 
         model = Model(inputs=[sequence_input, context_input], outputs=output)
         model.compile(
@@ -84,8 +84,64 @@ class InterventionModelTrainer:
         print(f"[INFO] Test Loss: {loss:.4f}")
         print(f"[INFO] Test Accuracy: {accuracy:.4f}")
 
+        self.export_onnx(model)
+        self.export_tflite(model)
+        self.export_numpy_weights(model)
+
         return model, history
 
+    def export_numpy_weights(self, model: Model) -> bool:
+        weights = {}
+        for layer_name in ["gru_1", "gru_2"]:
+            kernel, recurrent_kernel, bias = model.get_layer(layer_name).get_weights()
+            weights[f"{layer_name}_kernel"] = kernel
+            weights[f"{layer_name}_recurrent_kernel"] = recurrent_kernel
+            weights[f"{layer_name}_bias"] = bias.reshape(2, -1)
+
+        for layer_name in ["context_dense", "combined_dense", "output"]:
+            kernel, bias = model.get_layer(layer_name).get_weights()
+            weights[f"{layer_name}_kernel"] = kernel
+            weights[f"{layer_name}_bias"] = bias
+
+        output_path = os.path.join(self.model_dir, "intervention_model.npz")
+        np.savez(output_path, **weights)
+        print(f"[INFO] Pesos NumPy exportados en {output_path}")
+        return True
+
+    def export_onnx(self, model: Model) -> bool:
+        try:
+            import tensorflow as tf
+            import tf2onnx
+        except ImportError:
+            print("[WARN] tf2onnx no instalado, se omite la exportacion ONNX")
+            return False
+
+        output_path = os.path.join(self.model_dir, "intervention_model.onnx")
+        input_signature = [
+            tf.TensorSpec((None, self.SEQUENCE_LENGTH, self.FEATURE_COUNT), tf.float32, name="sequence_input"),
+            tf.TensorSpec((None, self.CONTEXT_COUNT), tf.float32, name="context_input")
+        ]
+        tf2onnx.convert.from_keras(model, input_signature=input_signature, opset=13, output_path=output_path)
+        print(f"[INFO] Modelo ONNX exportado en {output_path}")
+        return True
+
+    def export_tflite(self, model: Model) -> bool:
+        import tensorflow as tf
+
+        output_path = os.path.join(self.model_dir, "intervention_model.tflite")
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+        try:
+            tflite_model = converter.convert()
+        except Exception as e:
+            print(f"[WARN] No se pudo exportar el modelo TFLite solo con operaciones builtin: {e}")
+            return False
+
+        with open(output_path, "wb") as f:
+            f.write(tflite_model)
+        print(f"[INFO] Modelo TFLite exportado en {output_path}")
+        return True
+
 
 if __name__ == "__main__":
     trainer = InterventionModelTrainer()
@@ -0,0 +1,142 @@
+import os
+import sys
+import numpy as np
+from src.infrastructure.ml.inference_backends import create_backend
+from src.infrastructure.ml.numpy_gru import GRUStreamState
+from src.infrastructure.config.settings import STREAMING_RESYNC_INTERVAL
+
+class BackendParityChecker:
+    ARTIFACTS = {
+        "keras": "intervention_model.keras",
+        "onnxruntime": "intervention_model.onnx",
+        "tflite": "intervention_model.tflite",
+        "numpy": "intervention_model.npz"
+    }
+
+    def __init__(
+        self,
+        model_dir: str = "models",
+        data_dir: str = "training/data/synthetic",
+        reference: str = "keras",
+        tolerance: float = 1e-4,
+        sample_count: int = 512,
+        max_stream_disagreement: float = 0.05
+    ):
+        self.model_dir = model_dir
+        self.data_dir = data_dir
+        self.reference = reference
+        self.tolerance = tolerance
+        self.sample_count = sample_count
+        self.max_stream_disagreement = max_stream_disagreement
+
+    def load_inputs(self):
+        sequences_path = os.path.join(self.data_dir, "sequences.npy")
+        contexts_path = os.path.join(self.data_dir, "contexts.npy")
+        if os.path.exists(sequences_path) and os.path.exists(contexts_path):
+            sequences = np.load(sequences_path, mmap_mode="r")[:self.sample_count]
+            contexts = np.load(contexts_path, mmap_mode="r")[:self.sample_count]
+            return np.ascontiguousarray(sequences, dtype=np.float32), np.ascontiguousarray(contexts, dtype=np.float32)
+
+        rng = np.random.default_rng(42)
+        sequences = rng.random((self.sample_count, 30, 16), dtype=np.float32)
+        contexts = rng.random((self.sample_count, 6), dtype=np.float32)
+        return sequences, contexts
+
+    def load_backends(self) -> dict:
+        backends = {}
+        for name, filename in self.ARTIFACTS.items():
+            path = os.path.join(self.model_dir, filename)
+            if not os.path.exists(path):
+                print(f"[WARN] Artefacto no encontrado para {name}: {path}")
+                continue
+            try:
+                backend = create_backend(name)
+                backend.load(path)
+                backends[name] = backend
+            except ImportError as e:
+                print(f"[WARN] Runtime no disponible para {name}: {e}")
+        return backends
+
+    def run(self) -> bool:
+        backends = self.load_backends()
+        if not backends:
+            print("[ERROR] Ningun backend disponible para comparar")
+            return False
+        if self.reference not in backends:
+            # Sin TensorFlow instalado se compara contra el primer backend disponible
+            fallback = next(iter(backends))
+            print(f"[WARN] Backend de referencia {self.reference} no disponible, se usa {fallback}")
+            self.reference = fallback
+
+        sequences, contexts = self.load_inputs()
+        reference_output = backends[self.reference].predict_proba(sequences, contexts)
+        reference_classes = np.argmax(reference_output, axis=1)
+
+        all_ok = True
+        for name, backend in backends.items():
+            if name == self.reference:
+                continue
+
+            # Se evalua en lotes de distinto tamano para cubrir el cambio de forma
+            outputs = np.concatenate([
+                backend.predict_proba(sequences[:1], contexts[:1]),
+                backend.predict_proba(sequences[1:], contexts[1:])
+            ])
+            max_diff = float(np.max(np.abs(outputs - reference_output)))
+            agreement = float(np.mean(np.argmax(outputs, axis=1) == reference_classes))
+            ok = max_diff <= self.tolerance and agreement == 1.0
+            all_ok = all_ok and ok
+
+            status = "OK" if ok else "FALLO"
+            print(f"[{status}] {name} vs {self.reference}: max_diff={max_diff:.2e}, acuerdo_clases={agreement:.4f}")
+
+        if "numpy" in backends:
+            all_ok = self.check_streaming_drift(backends["numpy"].model, sequences, contexts) and all_ok
+
+        return all_ok
+
+    def check_streaming_drift(
+        self,
+        model,
+        sequences: np.ndarray,
+        contexts: np.ndarray,
+        resync_interval: int = STREAMING_RESYNC_INTERVAL
+    ) -> bool:
+        # Concatena las ventanas en un flujo continuo y compara la inferencia
+        # incremental contra la ventana completa en cada frame
+        stream = sequences.reshape(-1, sequences.shape[-1])[:self.sample_count * 2]
+        window = sequences.shape[1]
+        state = GRUStreamState()
+        max_diff = 0.0
+        disagreements = 0
+        evaluated = 0
+
+        for index, frame in enumerate(stream):
+            model.advance(state, frame)
+            if index + 1 < window:
+                continue
+
+            sequence = stream[index + 1 - window:index + 1]
+            if state.steps != window and state.steps_since_sync >= resync_interval:
+                model.sync(state, sequence)
+
+            context = contexts[index % len(contexts)]
+            streamed = model.predict_stream(state, context)
+            windowed = model.predict_proba(sequence[None], context[None])[0]
+            max_diff = max(max_diff, float(np.max(np.abs(streamed - windowed))))
+            disagreements += int(np.argmax(streamed) != np.argmax(windowed))
+            evaluated += 1
+
+        # La deriva entre re-sincronizaciones es inherente al modo streaming; se acota por la
+        # fraccion de frames en que cambia la clase respecto a la ventana completa
+        rate = disagreements / evaluated if evaluated else 0.0
+        ok = rate <= self.max_stream_disagreement
+        status = "OK" if ok else "FALLO"
+        print(f"[{status}] Inferencia incremental (resync={resync_interval}): max_diff={max_diff:.4f}, "
+              f"desacuerdos={disagreements}/{evaluated} ({rate:.2%}, limite {self.max_stream_disagreement:.0%})")
+        return ok
+
+
+if __name__ == "__main__":
+    checker = BackendParityChecker()
+    sys.exit(0 if checker.run() else 1)
@@ -23,6 +23,7 @@ from src.infrastructure.messaging.cache_invalidation_consumer import CacheInvali
 from src.infrastructure.messaging.intervention_evaluation_consumer import InterventionEvaluationConsumer
 from src.infrastructure.messaging.queue_validator import validate_service_queues
 from src.infrastructure.cache.redis_client import RedisClient
+from src.infrastructure.logger.service_logger import configure_logging, shutdown_logging
 from src.presentation.routes.health_routes import router as health_router
 from src.presentation.routes.content_routes import router as content_router
 
@@ -123,6 +124,7 @@ def validate_rabbitmq_and_queues() -> bool:
 async def lifespan(app: FastAPI):
     global rabbitmq_client, redis_client, intervention_consumer, cache_invalidation_consumer, evaluation_consumer
 
+    configure_logging()
     print(f"[MAIN] [INFO] Iniciando {SERVICE_NAME}...")
 
     print(f"[MAIN] [INFO] Validando configuracion...")
@@ -159,6 +161,7 @@ async def lifespan(app: FastAPI):
 
     if rabbitmq_client:
         rabbitmq_client.close()
+    shutdown_logging()
     print(f"[MAIN] [INFO] {SERVICE_NAME} detenido")
 
 
@@ -46,4 +46,9 @@ GEMINI_TIMEOUT = int(os.getenv("GEMINI_TIMEOUT", 10))
 
 CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")
 CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
-CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
\ No newline at end of file
+CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
+
+# Logging por cola (QueueHandler/QueueListener); DEBUG desactivado por defecto y limitado por componente
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_DEBUG_RATE_PER_SECOND = float(os.getenv("LOG_DEBUG_RATE_PER_SECOND", 10))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
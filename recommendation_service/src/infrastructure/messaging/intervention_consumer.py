@@ -9,6 +9,7 @@ from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
 from src.infrastructure.messaging.activity_details_client import ActivityDetailsClient
 from src.infrastructure.messaging.session_config_client import SessionConfigClient
 from src.infrastructure.cache.redis_client import RedisClient
+from src.infrastructure.logger.service_logger import get_logger
 from src.infrastructure.config.settings import (
     MONITORING_EVENTS_QUEUE,
     RECOMMENDATIONS_QUEUE,
@@ -24,6 +25,9 @@ from src.application.use_cases.process_intervention import ProcessInterventionUs
 from src.application.dtos.monitoring_event_dto import MonitoringEventDTO
 
 
+logger = get_logger("INTERVENTION_CONSUMER")
+
+
 class InterventionConsumer:
     def __init__(self):
         self.redis_client = RedisClient()
@@ -40,7 +44,7 @@ class InterventionConsumer:
         self._running = True
         thread = threading.Thread(target=self._consume_events, daemon=True)
         thread.start()
-        print(f"[INTERVENTION_CONSUMER] [INFO] Consumer iniciado con {INTERVENTION_CONSUMER_WORKERS} workers y prefetch={PREFETCH_COUNT}")
+        logger.info("Consumer iniciado con %s workers y prefetch=%s", INTERVENTION_CONSUMER_WORKERS, PREFETCH_COUNT)
 
     def _consume_events(self) -> None:
         while self._running:
@@ -58,11 +62,11 @@ class InterventionConsumer:
                     auto_ack=False
                 )
 
-                print(f"[INTERVENTION_CONSUMER] [INFO] Escuchando en cola: {MONITORING_EVENTS_QUEUE}")
+                logger.info("Escuchando en cola: %s", MONITORING_EVENTS_QUEUE)
                 self._channel.start_consuming()
 
             except Exception as e:
-                print(f"[INTERVENTION_CONSUMER] [ERROR] Error en consumer: {str(e)}")
+                logger.error("Error en consumer: %s", e)
                 if self._running:
                     threading.Timer(5.0, self._consume_events).start()
                     break
@@ -83,7 +87,7 @@ class InterventionConsumer:
             
             event = MonitoringEventDTO.from_dict(message)
 
-            print(f"[INTERVENTION_CONSUMER] [INFO] Procesando evento para sesion: {event.session_id}, correlation_id: {correlation_id}")
+            logger.debug("Procesando evento para sesion: %s, correlation_id: %s", event.session_id, correlation_id)
 
             content_repository = ContentRepositoryImpl(db)
             use_case = ProcessInterventionUseCase(
@@ -106,7 +110,7 @@ class InterventionConsumer:
                     correlation_id=correlation_id
                 )
                 if success:
-                    print(f"[INTERVENTION_CONSUMER] [INFO] Recomendacion publicada, correlation_id: {correlation_id}")
+                    logger.debug("Recomendacion publicada, correlation_id: %s", correlation_id)
                     self._log(
                         f"Recomendacion publicada para sesion: {event.session_id}",
                         correlation_id=correlation_id
@@ -115,7 +119,7 @@ class InterventionConsumer:
             self._safe_ack(ch, method.delivery_tag)
 
         except Exception as e:
-            print(f"[INTERVENTION_CONSUMER] [ERROR] Error procesando mensaje: {str(e)}")
+            logger.exception("Error procesando mensaje: %s", e)
             self._log(
                 f"Error procesando evento: {str(e)}",
                 level="ERROR",
@@ -130,14 +134,14 @@ class InterventionConsumer:
             if ch and ch.is_open:
                 ch.basic_ack(delivery_tag=delivery_tag)
         except Exception as e:
-            print(f"[INTERVENTION_CONSUMER] [ERROR] Error en ACK: {str(e)}")
+            logger.error("Error en ACK: %s", e)
 
     def _safe_nack(self, ch, delivery_tag) -> None:
         try:
             if ch and ch.is_open:
                 ch.basic_nack(delivery_tag=delivery_tag, requeue=True)
         except Exception as e:
-            print(f"[INTERVENTION_CONSUMER] [ERROR] Error en NACK: {str(e)}")
+            logger.error("Error en NACK: %s", e)
 
     def _log(self, message: str, level: str = "INFO", correlation_id: Optional[str] = None) -> None:
         try: